@@ -0,0 +1,88 @@
+'''
+Clumped bundle encoding time for large batches of elements.
+
+Compares NetAddr.send_clumped_bundles, that encodes each element once and
+packs the datagrams into bundles, with the previous size estimation and
+clumping of the elements before building each bundle. Datagrams are sent
+to a local socket that is not read. Run as
+``python benchmarks/bench_bundle.py [repetitions]`` from the repository
+root.
+
+'''
+
+import socket
+import sys
+import time
+
+import sc3
+sc3.init('rt')
+
+from sc3.base.netaddr import NetAddr
+
+
+class EstimatingNetAddr(NetAddr):
+    '''Previous implementation, sizes are estimated before encoding.'''
+
+    def send_clumped_bundles(self, time, *elements):
+        if self._calc_bndl_dgram_size(elements) > self._MAX_UDP_DGRAM_SIZE:
+            for item in self._estimated_clumps(elements):
+                if time is not None:
+                    time += 1e-9
+                self.send_bundle(time, *item)
+        else:
+            self.send_bundle(time, *elements)
+
+    def _estimated_clumps(self, elements, size=8192):
+        elist = []
+        for e in elements:
+            if isinstance(e[0], str):
+                elist.append((self._calc_msg_dgram_size(e) + 4, e))
+            else:
+                elist.append((self._calc_bndl_dgram_size(e[1:]) + 4, e))
+        res = []
+        clump = []
+        acc_size = 16
+        for s, e in elist:
+            if acc_size + s >= size:
+                res.append(clump)
+                clump = []
+                acc_size = 16
+            acc_size += s
+            clump.append(e)
+        if clump:
+            res.append(clump)
+        return res
+
+
+def measure(addr, elements, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        addr.send_clumped_bundles(None, *elements)
+    return (time.perf_counter() - t0) / n
+
+
+def main_bench(n):
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 16)
+    target = sink.getsockname()
+    batches = {
+        'b_setn x64': [
+            ['/b_setn', 0, i * 512, 512, *[0.5] * 512] for i in range(64)],
+        'n_set x5000': [
+            ['/n_set', 1000 + i, 'freq', 440.0, 'amp', 0.1]
+            for i in range(5000)],
+        'd_recv x32': [
+            ['/d_recv', bytes(4000), ['/s_new', 'default', -1]]
+            for _ in range(32)],
+    }
+    print('milliseconds per batch')
+    for name, elements in batches.items():
+        old = measure(EstimatingNetAddr(*target), elements, n) * 1000
+        new = measure(NetAddr(*target), elements, n) * 1000
+        print(f'{name:>12}: estimated {old:8.3f}  encoded once {new:8.3f}')
+    sink.close()
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,79 @@
+'''
+Client side request/reply throughput and latency against MockServer.
+
+Measures the round trip time of ``main.sync`` and the throughput of
+concurrent ``ControlBus.get`` and ``Buffer.getn`` requests answered by the
+in-process server stand-in, no audio server is needed. Run as
+``python benchmarks/bench_mockserver.py [requests]`` from the repository
+root.
+
+'''
+
+import statistics
+import sys
+import threading
+import time
+
+import sc3
+sc3.init('rt')
+
+from sc3.base.main import main
+from sc3.synth.server import Server
+from sc3.synth.bus import ControlBus
+from sc3.synth.buffer import Buffer
+from sc3.synth.testing import MockServer
+
+
+def measure_sync(server, n):
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        main.sync(server, 1)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), max(times)
+
+
+def measure_requests(n, request, window=100):
+    # Requests are sent in windows to not overflow the socket buffers.
+    done = threading.Event()
+    count = 0
+
+    def action(*_):
+        nonlocal count
+        count += 1
+        if count % window == 0 or count == n:
+            done.set()
+
+    t0 = time.perf_counter()
+    for start in range(0, n, window):
+        done.clear()
+        for i in range(start, min(start + window, n)):
+            request(i, action)
+        done.wait(1)
+    return count / (time.perf_counter() - t0)
+
+
+def main_bench(n):
+    with MockServer(record=False) as mock:
+        server = Server('mock', mock.addr)
+        registered = threading.Event()
+        server.register(lambda _: registered.set())
+        registered.wait(2)
+        median, worst = measure_sync(server, n)
+        print(f'sync round trip: median {median * 1e6:.1f} us, '
+              f'max {worst * 1e6:.1f} us')
+        buses = [ControlBus(1, server) for _ in range(64)]
+        rate = measure_requests(
+            n, lambda i, action: buses[i % 64].get(action))
+        print(f'ControlBus.get: {rate:.0f} replies/s')
+        buffer = Buffer(4096, 1, server)
+        main.sync(server, 1)
+        rate = measure_requests(
+            n, lambda i, action: buffer.getn((i % 64) * 64, 64, action))
+        print(f'Buffer.getn x64: {rate:.0f} replies/s')
+        print(f'server received {mock.received}, sent {mock.sent}')
+        server.unregister()
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,46 @@
+'''
+Compare OscMessageBuilder with the cached struct message encoder.
+
+Run as ``python benchmarks/bench_osc_encode.py`` from the repository root.
+
+'''
+
+import timeit
+
+from sc3.base import _osclib as oli
+
+
+MESSAGES = {
+    'n_set': ['/n_set', 1000, 'freq', 440.0, 'amp', 0.1],
+    's_new': ['/s_new', 'default', -1, 0, 1, 'freq', 220.0, 'pan', -0.5],
+    'numeric': ['/c_set', 0, 0.5, 1, 0.25, 2, 0.125],
+    'b_setn': ['/b_setn', 0, 0, 64, *[i / 64 for i in range(64)]],
+}
+
+
+def builder(msg):
+    b = oli.OscMessageBuilder(msg[0])
+    for arg in msg[1:]:
+        b.add_arg(arg)
+    return b.build().dgram
+
+
+def encoder(msg):
+    return oli.encode_message(msg[0], msg[1:])
+
+
+def main(number=20000):
+    print(f"{'message':>10} {'builder (us)':>13} {'encoder (us)':>13} "
+          f"{'speedup':>8} {'msgs/s':>10}")
+    for name, msg in MESSAGES.items():
+        assert builder(msg) == encoder(msg)
+        old = min(timeit.repeat(
+            lambda: builder(msg), number=number, repeat=3)) / number
+        new = min(timeit.repeat(
+            lambda: encoder(msg), number=number, repeat=3)) / number
+        print(f'{name:>10} {old * 1e6:>13.2f} {new * 1e6:>13.2f} '
+              f'{old / new:>8.1f} {1 / new:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
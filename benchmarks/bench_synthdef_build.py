@@ -0,0 +1,71 @@
+'''
+SynthDef build time for large multichannel expanded graphs.
+
+Compares the previous graph rewrite, that scanned all the children and
+their inputs on each ugen replacement and rebuilt the topological sort
+adjacency after optimization, with replacements through the use lists
+(descendants) of the replaced ugen. Each channel adds oscillators and
+arithmetic that the optimizer rewrites as MulAdd, Sum3 and subtractions.
+Run as ``python benchmarks/bench_synthdef_build.py [channels]`` from the
+repository root.
+
+'''
+
+import sys
+import time
+
+import sc3
+sc3.init('nrt', 'WARNING')
+
+from sc3.synth.synthdef import SynthDef
+from sc3.synth.ugens import SinOsc, Saw, LFSaw, LFNoise1, Out, Mix
+
+
+class ScanningSynthDef(SynthDef):
+    '''Previous implementation, replacements scan the whole graph.'''
+
+    def _replace_ugen(self, a, b):
+        b._width_first_antecedents = a._width_first_antecedents
+        b._descendants = a._descendants
+        b._synth_index = a._synth_index
+        self._children[a._synth_index] = b
+        for item in self._children:
+            if item is not None:
+                for i, input in enumerate(item.inputs):
+                    if input is a:
+                        aux = list(item.inputs)
+                        aux[i] = b
+                        item._inputs = tuple(aux)
+
+    def _topological_sort(self):
+        self._adjacency_stale = True
+        super()._topological_sort()
+
+
+def make_graph(channels):
+    def graph(freq=440, amp=0.1):
+        freqs = [freq * (i + 1) for i in range(channels)]
+        sig = SinOsc.ar(freqs) * LFNoise1.kr([0.1] * channels) * amp
+        sig = sig + Saw.ar(freqs) * 0.1
+        sig = sig - (-LFSaw.ar(freqs))
+        Out.ar(0, Mix.new(sig))
+    return graph
+
+
+def main_bench(channels):
+    sizes = sorted({channels // 8, channels // 4, channels // 2, channels})
+    for n in sizes:
+        graph = make_graph(n)
+        results = []
+        for cls in (ScanningSynthDef, SynthDef):
+            t0 = time.perf_counter()
+            sdef = cls('big', graph)
+            elapsed = time.perf_counter() - t0
+            results.append(bytes(sdef.as_bytes()))
+            print(f'{n:6} channels {len(sdef._children):7} ugens '
+                  f'{cls.__name__:>17}: {elapsed * 1000:9.1f} ms')
+        assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,68 @@
+'''
+SynthDef serialization time for large multichannel expanded graphs.
+
+Compares the previous writer, that packed each integer and float of the
+definition with its own struct call and stream write into a BytesIO, with
+the bulk writer that assembles constants and controls as float arrays and
+packs the ugen specs through precompiled structs into a single bytearray.
+Run as ``python benchmarks/bench_synthdef_write.py [channels]`` from the
+repository root.
+
+'''
+
+import io
+import sys
+import time
+
+import sc3
+sc3.init('nrt', 'WARNING')
+
+from sc3.synth.synthdef import SynthDef
+from sc3.synth.ugens import SinOsc, Saw, LFNoise1, Pan2, Out, Mix
+from sc3.synth import _fmtrw as frw
+
+
+def stream_write(lst):
+    stream = io.BytesIO()
+    stream.write(b'SCgf')
+    frw.write_i32(stream, 2)
+    frw.write_i16(stream, len(lst))
+    for synthdef in lst:
+        synthdef._write_def(stream)
+    return stream.getvalue()
+
+
+def bulk_write(lst):
+    stream = io.BytesIO()
+    SynthDef._write_def_list(lst, stream)
+    return stream.getvalue()
+
+
+def make_graph(channels):
+    def graph(freq=440, amp=0.1):
+        freqs = [freq * (i + 1) for i in range(channels)]
+        sig = SinOsc.ar(freqs, [i / channels for i in range(channels)])
+        sig = sig * LFNoise1.kr([0.1 + i for i in range(channels)]) * amp
+        sig = Pan2.ar(sig + Saw.ar(freqs) * 0.1, [0.5] * channels)
+        Out.ar(0, Mix.new(sig))
+    return graph
+
+
+def main_bench(channels, repeat=5):
+    sizes = sorted({channels // 8, channels // 4, channels // 2, channels})
+    for n in sizes:
+        lst = [SynthDef('big', make_graph(n))]
+        results = []
+        for func in (stream_write, bulk_write):
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                data = func(lst)
+            elapsed = (time.perf_counter() - t0) / repeat
+            results.append(data)
+            print(f'{n:6} channels {len(lst[0]._children):7} ugens '
+                  f'{func.__name__:>12}: {elapsed * 1000:9.2f} ms')
+        assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,96 @@
+'''
+Compare TaskQueue against the previous nsmallest based peek implementation.
+
+Run as ``python benchmarks/bench_taskq.py [max_exponent]`` from the
+repository root, the default is 10^3 to 10^5 entries (10^6 takes long for
+the old implementation).
+
+'''
+
+import heapq
+import random
+import sys
+import timeit
+
+from sc3.base._taskq import TaskQueue
+
+
+class NsmallestTaskQueue(TaskQueue):
+    '''Previous peek/iter implementation, O(n) per peek.'''
+
+    def peek(self, smallest=True):
+        if self._queue:
+            if smallest:
+                prio, count, task = heapq.nsmallest(
+                    1, self._queue, key=self._small_key)[0]
+            else:
+                prio, count, task = heapq.nlargest(
+                    1, self._queue, key=self._large_key)[0]
+            if task is not self._REMOVED:
+                return (prio, task)
+        raise KeyError('peek from an empty task queue')
+
+    def _small_key(self, item):
+        if item[2] is type(self)._REMOVED:
+            return [float('inf')] * 2
+        else:
+            return item[:2]
+
+    def _large_key(self, item):
+        if item[2] is type(self)._REMOVED:
+            return [float('-inf')] * 2
+        else:
+            return item[:2]
+
+    def __iter__(self):
+        queue = heapq.nsmallest(len(self._queue), self._queue)
+        for prio, count, task in queue:
+            if task is not type(self)._REMOVED:
+                yield (prio, task)
+
+
+class Task():
+    pass
+
+
+def fill(cls, n):
+    q = cls()
+    rnd = random.Random(n)
+    tasks = [Task() for _ in range(n)]
+    for t in tasks:
+        q.add(rnd.random() * n, t)
+    return q, tasks
+
+
+def clock_cycle(q, ops):
+    # What the clocks do per wakeup: peek, pop, reschedule and peek again.
+    for _ in range(ops):
+        prio, task = q.pop()
+        q.add(prio + 1.0, task)
+        q.peek()
+
+
+def bench(cls, n, ops):
+    q, tasks = fill(cls, n)
+    for t in tasks[::10]:
+        q.remove(t)
+    cycle = min(timeit.repeat(lambda: clock_cycle(q, ops), number=1, repeat=3))
+    largest = min(timeit.repeat(lambda: q.peek(False), number=1, repeat=3))
+    iteration = min(timeit.repeat(lambda: list(q), number=1, repeat=3))
+    return cycle / ops, largest, iteration
+
+
+def main(max_exp=5):
+    ops = 100
+    print(f"{'n':>9} {'impl':>10} {'cycle (us)':>12} "
+          f"{'peek(False) (ms)':>17} {'iter (ms)':>10}")
+    for exp in range(3, max_exp + 1):
+        n = 10 ** exp
+        for name, cls in (('old', NsmallestTaskQueue), ('new', TaskQueue)):
+            cycle, largest, iteration = bench(cls, n, ops)
+            print(f'{n:>9} {name:>10} {cycle * 1e6:>12.2f} '
+                  f'{largest * 1e3:>17.3f} {iteration * 1e3:>10.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,146 @@
+'''
+TCP round trip throughput against a local echo stand-in for the server.
+
+Compares OscTcpInterface coalesced writes with the previous two ``send``
+calls per message, as messages per second written by the senders and
+echoed back through the responders, and the median round trip time of
+single messages. Run as ``python benchmarks/bench_tcp.py [messages]``
+from the repository root.
+
+'''
+
+import socket
+import sys
+import threading
+import time
+
+import sc3
+sc3.init('rt')
+
+from sc3.base.main import main
+from sc3.base.netaddr import NetAddr
+from sc3.base.responders import OscFunc
+from sc3.base import _oscinterface as osci
+
+
+class TwoSendsTcpInterface(osci.OscTcpInterface):
+    '''
+    Previous writer, one send for the size and one for the message. A lock
+    was added because concurrent senders interleave frames otherwise.
+    '''
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+
+    def _send(self, msg, _=None):
+        with self._send_lock:
+            self._socket.send(msg.size.to_bytes(4, 'big'))
+            self._socket.send(msg.dgram)
+
+
+def echo_server():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+
+    def serve():
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=echo, args=(conn,), daemon=True).start()
+
+    def echo(conn):
+        while data := conn.recv(65536):
+            conn.sendall(data)
+        conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()
+
+
+def connect(target, interface_class, port):
+    addr = NetAddr(*target)
+    addr._osc_interface = interface_class(port, 100)
+    addr._osc_interface.bind()
+    addr._osc_interface.connect(addr._target)
+    return addr
+
+
+def throughput(target, interface_class, msg, n, senders, port):
+    addr = connect(target, interface_class, port)
+    count = 0
+    done = threading.Event()
+
+    def func(*_):
+        nonlocal count
+        count += 1
+        if count == n * senders:
+            done.set()
+
+    f = OscFunc(func, msg[0])
+
+    def send():
+        for _ in range(n):
+            addr.send_msg(*msg)
+
+    threads = [threading.Thread(target=send) for _ in range(senders)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sent = time.perf_counter() - t0
+    done.wait(60)
+    elapsed = time.perf_counter() - t0
+    f.free()
+    addr.disconnect()
+    return n * senders / sent, count / elapsed
+
+
+def latency(target, interface_class, msg, n, port):
+    addr = connect(target, interface_class, port)
+    done = threading.Event()
+    f = OscFunc(lambda *_: done.set(), msg[0])
+    times = []
+    for _ in range(n):
+        done.clear()
+        t0 = time.perf_counter()
+        addr.send_msg(*msg)
+        done.wait(1)
+        times.append(time.perf_counter() - t0)
+    f.free()
+    addr.disconnect()
+    return sorted(times)[n // 2]
+
+
+def main_bench(n):
+    target = echo_server()
+    messages = {
+        'small': ['/n_set', 1000, 'freq', 440.0],
+        'b_setn 512': ['/b_setn', 0, 0, 512, *[0.5] * 512],
+    }
+    classes = (TwoSendsTcpInterface, osci.OscTcpInterface)
+    port = NetAddr.lang_port() + 10
+    print(f'{n} messages per sender, sent and echoed messages/s')
+    for name, msg in messages.items():
+        for senders in (1, 4):
+            res = []
+            for cls in classes:
+                res.append(throughput(target, cls, msg, n, senders, port))
+                port += 1
+            print(
+                f'{name:>10} x{senders}: '
+                f'two sends {res[0][0]:8.0f} {res[0][1]:8.0f}  '
+                f'coalesced {res[1][0]:8.0f} {res[1][1]:8.0f}')
+    print('median round trip time, ms')
+    for name, msg in messages.items():
+        res = []
+        for cls in classes:
+            res.append(latency(target, cls, msg, 100, port) * 1000)
+            port += 1
+        print(
+            f'{name:>10}: two sends {res[0]:8.3f}  coalesced {res[1]:8.3f}')
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,68 @@
+'''
+Buffer upload time with a roundtrip per chunk and with BulkTransfer.
+
+Uploads a list of samples to a MockServer that delays its replies by a
+fixed latency, first as Buffer.send_list did before, one '/b_setn' of
+1626 values followed by a '/sync' roundtrip, and then with the paced
+transfer engine. Run as ``python benchmarks/bench_transfer.py [samples]``
+from the repository root.
+
+'''
+
+import sys
+import threading
+import time
+
+import sc3
+sc3.init('rt')
+
+from sc3.base.main import main
+from sc3.base.stream import Routine
+from sc3.synth.server import Server
+from sc3.synth.testing import MockServer
+from sc3.synth._transfer import BulkTransfer
+
+
+def roundtrip_upload(server, values):
+    done = threading.Event()
+
+    def stream_func():
+        for pos in range(0, len(values), 1626):
+            chunk = values[pos:pos + 1626]
+            server.addr.send_msg('/b_setn', 0, pos, len(chunk), *chunk)
+            yield from server.sync()
+        done.set()
+
+    Routine.run(stream_func)
+    done.wait(60)
+
+
+def paced_upload(server, values):
+    done = threading.Event()
+    BulkTransfer(
+        server.addr, '/b_setn', [0], values,
+        action=lambda _: done.set()).start()
+    done.wait(60)
+
+
+def main_bench(n):
+    values = [i / n for i in range(n)]
+    for latency in (0.0, 0.001):
+        with MockServer(latency=latency, record=False) as mock:
+            server = Server(f'mock{latency}', mock.addr)
+            registered = threading.Event()
+            server.register(lambda _: registered.set())
+            registered.wait(2)
+            server.addr.send_msg('/b_alloc', 0, n)
+            main.sync(server, 1)
+            print(f'{n} samples, reply latency {latency * 1000:.1f} ms')
+            for func in (roundtrip_upload, paced_upload):
+                t0 = time.perf_counter()
+                func(server, values)
+                elapsed = time.perf_counter() - t0
+                print(f'{func.__name__:>18}: {elapsed * 1000:9.1f} ms')
+            server.unregister()
+
+
+if __name__ == '__main__':
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
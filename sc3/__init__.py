@@ -9,6 +9,7 @@ LIB_MODE = 'rt'
 LIB_PORT = 57120
 LIB_PORT_RANGE = 10
 LIB_SETUP_FILE = None
+LIB_OSC_BACKEND = 'selector'  # Or 'asyncio'.
 
 
 ### Configure logger ###
@@ -0,0 +1,138 @@
+"""Bounded queue of incoming events for the SystemClock thread."""
+
+import collections
+import threading
+
+
+__all__ = ['InboundQueue']
+
+
+class InboundQueue():
+    '''
+    Queue between network threads and the SystemClock thread.
+
+    Entries are ``(func, args)`` tuples put by producer threads in batches
+    and evaluated by the clock thread at the top of each scheduler loop
+    iteration, without going through the clock's task queue. Appending to
+    and popping from the underlying deque doesn't require the library lock,
+    only one notification of the clock per batch does.
+
+    When `capacity` is reached new entries are handled according to
+    `policy`:
+
+    - ``'drop_oldest'``: the oldest pending entries are discarded.
+    - ``'block'``: producers wait until the clock drains the queue.
+    - ``'count'``: nothing is discarded, entries beyond capacity are
+      counted as overflows.
+
+    Counters are updated without locking and are approximate if there are
+    concurrent producers.
+
+    '''
+
+    POLICIES = ('drop_oldest', 'block', 'count')
+
+    def __init__(self, capacity=4096, policy='drop_oldest'):
+        self._queue = collections.deque()
+        self._not_full = threading.Condition(threading.Lock())
+        self._closed = False
+        self.capacity = capacity
+        self.policy = policy
+        self.reset()
+
+    @property
+    def policy(self):
+        '''Overflow policy, one of `POLICIES`.'''
+        return self._policy
+
+    @policy.setter
+    def policy(self, value):
+        if value not in self.POLICIES:
+            raise ValueError(f"invalid inbound queue policy '{value}'")
+        self._policy = value
+
+    def reset(self):
+        '''Clear counters.'''
+        self._received = 0
+        self._drops = 0
+        self._overflows = 0
+        self._max_depth = 0
+
+    @property
+    def depth(self):
+        '''Number of pending entries.'''
+        return len(self._queue)
+
+    @property
+    def max_depth(self):
+        '''Maximum number of pending entries since last reset.'''
+        return self._max_depth
+
+    @property
+    def received(self):
+        '''Number of entries put since last reset.'''
+        return self._received
+
+    @property
+    def drops(self):
+        '''Number of discarded entries since last reset.'''
+        return self._drops
+
+    @property
+    def overflows(self):
+        '''Number of entries put beyond capacity since last reset.'''
+        return self._overflows
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __bool__(self):
+        return bool(self._queue)
+
+    def _put(self, entries, notify):
+        # notify wakes up the consumer before blocking.
+        queue = self._queue
+        for entry in entries:
+            if len(queue) >= self.capacity:
+                self._overflows += 1
+                if self._policy == 'drop_oldest':
+                    try:
+                        queue.popleft()
+                        self._drops += 1
+                    except IndexError:
+                        pass  # Drained meanwhile.
+                elif self._policy == 'block':
+                    notify()
+                    with self._not_full:
+                        while len(queue) >= self.capacity\
+                        and not self._closed:
+                            self._not_full.wait(0.1)
+                    if self._closed:
+                        self._drops += 1
+                        continue
+            queue.append(entry)
+        self._received += len(entries)
+        if len(queue) > self._max_depth:
+            self._max_depth = len(queue)
+
+    def _drain(self, max_count=None):
+        # Pop the entries pending at call time, at most max_count.
+        queue = self._queue
+        count = len(queue)
+        if max_count is not None:
+            count = min(count, max_count)
+        entries = []
+        try:
+            for _ in range(count):
+                entries.append(queue.popleft())
+        except IndexError:
+            pass  # Dropped by a producer.
+        if entries and self._policy == 'block':
+            with self._not_full:
+                self._not_full.notify_all()
+        return entries
+
+    def _close(self):
+        with self._not_full:
+            self._closed = True
+            self._not_full.notify_all()
@@ -0,0 +1,299 @@
+"""Capture and replay of OSC traffic."""
+
+import collections
+import logging
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+
+from . import main as _libsc3
+
+
+__all__ = ['OscCapture', 'OscRingCapture', 'read_capture', 'replay']
+
+
+_logger = logging.getLogger(__name__)
+
+
+IN = 0
+OUT = 1
+
+_FILE_MAGIC = b'SC3OSCF1'
+_RING_MAGIC = b'SC3OSCR1'
+
+# Record header: time, direction, host size, port, datagram size.
+_RECORD = struct.Struct('<dBBHI')
+# Ring header after magic: segment size, number of segments.
+_RING_HEADER = struct.Struct('<8sII')
+# Segment header: sequence number (0 is unused), used bytes.
+_SEGMENT_HEADER = struct.Struct('<QI4x')
+
+
+CaptureRecord = collections.namedtuple(
+    typename='CaptureRecord',
+    field_names=('time', 'direction', 'addr', 'dgram'))
+
+
+def _pack_record(time, direction, addr, dgram):
+    host = str(addr[0]).encode()[:255] if addr else b''
+    port = addr[1] if addr else 0
+    return b''.join((
+        _RECORD.pack(time, direction, len(host), port, len(dgram)),
+        host, dgram))
+
+
+def _unpack_records(data, start, end):
+    index = start
+    while end - index >= _RECORD.size:
+        time, direction, host_size, port, size = _RECORD.unpack_from(
+            data, index)
+        index += _RECORD.size
+        host = bytes(data[index:index + host_size]).decode()
+        index += host_size
+        dgram = bytes(data[index:index + size])
+        index += size
+        yield CaptureRecord(time, direction, (host, port), dgram)
+
+
+class OscCapture():
+    '''
+    Append-only capture file of OSC datagrams.
+
+    Each record stores the elapsed time, the direction (``IN`` or
+    ``OUT``), the remote address and the datagram. Records are buffered
+    and written in order of arrival from any thread.
+
+    Parameters
+    ----------
+    path: str | pathlib.Path
+        Capture file, it's truncated if exists.
+    buffer_size: int
+        Bytes buffered before writing to disk.
+
+    '''
+
+    def __init__(self, path, buffer_size=65536):
+        self._file = open(path, 'wb', buffering=buffer_size)
+        self._file.write(_FILE_MAGIC)
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def write(self, direction, addr, dgram, time=None):
+        '''Append one datagram.'''
+        if time is None:
+            time = _libsc3.main.elapsed_time()
+        record = _pack_record(time, direction, addr, dgram)
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.write(record)
+            except OSError as e:
+                # Capture must not interrupt sending or receiving.
+                _logger.error(f'OSC capture disabled: {str(e)}')
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+                return
+            self.records += 1
+
+    def flush(self):
+        '''Write buffered records to disk.'''
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        '''Flush and close the file.'''
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class OscRingCapture():
+    '''
+    Fixed size capture of the most recent OSC datagrams in a memory
+    mapped file, intended to be always on.
+
+    The file is divided in segments written in turn, when all are full the
+    oldest segment is discarded. The content is readable from the file by
+    `read_capture` at any time, also after a crash of the process.
+
+    Parameters
+    ----------
+    path: str | pathlib.Path
+        Capture file, it's overwritten if exists.
+    size: int
+        Approximate file size in bytes.
+    segments: int
+        Number of segments, at least two.
+
+    '''
+
+    def __init__(self, path, size=16 * 1024 * 1024, segments=16):
+        segments = max(2, segments)
+        self._segment_size = max(
+            size // segments, _SEGMENT_HEADER.size + _RECORD.size + 1024)
+        self._segments = segments
+        total = _RING_HEADER.size + self._segment_size * segments
+        with open(path, 'wb') as file:
+            file.truncate(total)
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), total)
+        _RING_HEADER.pack_into(
+            self._map, 0, _RING_MAGIC, self._segment_size, segments)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._current = -1
+        self._used = 0
+        self._next_segment()
+        self.records = 0
+
+    def _segment_offset(self, index):
+        return _RING_HEADER.size + index * self._segment_size
+
+    def _next_segment(self):
+        self._seq += 1
+        self._current = (self._current + 1) % self._segments
+        self._used = 0
+        _SEGMENT_HEADER.pack_into(
+            self._map, self._segment_offset(self._current), self._seq, 0)
+
+    def write(self, direction, addr, dgram, time=None):
+        '''Write one datagram, larger datagrams than a segment are
+        truncated.'''
+        if time is None:
+            time = _libsc3.main.elapsed_time()
+        capacity = self._segment_size - _SEGMENT_HEADER.size
+        record = _pack_record(time, direction, addr, dgram)
+        if len(record) > capacity:
+            excess = len(record) - capacity
+            record = _pack_record(time, direction, addr, dgram[:-excess])
+        with self._lock:
+            if self._map is None:
+                return
+            try:
+                if self._used + len(record) > capacity:
+                    self._next_segment()
+                offset = self._segment_offset(self._current)
+                start = offset + _SEGMENT_HEADER.size + self._used
+                self._map[start:start + len(record)] = record
+                self._used += len(record)
+                # Size is updated after the data for readers of the file.
+                _SEGMENT_HEADER.pack_into(
+                    self._map, offset, self._seq, self._used)
+            except (OSError, ValueError) as e:
+                # Capture must not interrupt sending or receiving.
+                _logger.error(f'OSC capture disabled: {str(e)}')
+                self._map.close()
+                self._map = None
+                self._file.close()
+                return
+            self.records += 1
+
+    def flush(self):
+        '''Write the mapped memory to disk.'''
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def close(self):
+        '''Flush and unmap the file.'''
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._map = None
+                self._file.close()
+
+
+def read_capture(path):
+    '''Return the records of a capture file in order.
+
+    Parameters
+    ----------
+    path: str | pathlib.Path
+        A file written by `OscCapture` or `OscRingCapture`.
+
+    Returns
+    -------
+    list
+        A list of ``CaptureRecord(time, direction, addr, dgram)``.
+    '''
+
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic = data[:8]
+    if magic == _FILE_MAGIC:
+        return list(_unpack_records(data, 8, len(data)))
+    if magic != _RING_MAGIC:
+        raise ValueError(f'{path} is not an OSC capture file')
+    _, segment_size, segments = _RING_HEADER.unpack_from(data, 0)
+    used = []
+    for i in range(segments):
+        offset = _RING_HEADER.size + i * segment_size
+        seq, size = _SEGMENT_HEADER.unpack_from(data, offset)
+        if seq:
+            used.append((seq, offset + _SEGMENT_HEADER.size, size))
+    res = []
+    for _, start, size in sorted(used):
+        res.extend(_unpack_records(data, start, start + size))
+    return res
+
+
+def replay(source, target, speed=1.0, direction=OUT, proto='udp'):
+    '''Send the datagrams of a capture to a target.
+
+    Parameters
+    ----------
+    source: str | pathlib.Path | list
+        A capture file or a list of records.
+    target: tuple
+        Address as (hostname, port).
+    speed: float
+        Time scale of the original intervals, 1 replays at original speed,
+        2 twice as fast. If None or 0 datagrams are sent as fast as
+        possible.
+    direction: int
+        Records of this direction are sent, ``OUT`` are the messages sent
+        by the library and ``IN`` the received ones.
+    proto: str
+        Either ``'udp'`` or ``'tcp'``, TCP datagrams are framed with their
+        size as in OSC 1.0 streams.
+
+    Returns
+    -------
+    int
+        Number of datagrams sent.
+    '''
+
+    if isinstance(source, (str, os.PathLike)):
+        source = read_capture(source)
+    records = [r for r in source if r.direction == direction]
+    if proto == 'tcp':
+        sock = socket.create_connection(target)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        t0 = time.perf_counter()
+        first = records[0].time if records else 0.0
+        for record in records:
+            if speed:
+                delay = (record.time - first) / speed
+                delay -= time.perf_counter() - t0
+                if delay > 0:
+                    time.sleep(delay)
+            if proto == 'tcp':
+                sock.sendall(struct.pack('>i', len(record.dgram)))
+                sock.sendall(record.dgram)
+            else:
+                sock.sendto(record.dgram, target)
+    finally:
+        sock.close()
+    return len(records)
@@ -5,6 +5,8 @@ import threading
 import errno
 import struct
 import socket
+import selectors
+import asyncio
 import time
 import subprocess
 import sys
@@ -17,25 +19,133 @@ from . import _taskq as tsq
 from . import main as _libsc3
 from . import netaddr as nad
 from . import _osclib as oli
+from . import _osccapture as cpt
 from . import functions as fn
 from . import platform as plf
 
 
-__all__ = ['OscUdpInterface', 'OscTcpInterface', 'OscNrtInterface']
+__all__ = [
+    'OscUdpInterface', 'OscTcpInterface', 'OscAsyncioInterface',
+    'OscAsyncioTcpInterface', 'OscNrtInterface']
 
 
 _logger = logging.getLogger(__name__)
 
 
+# Non blocking reads from blocking sockets, Windows reads once per wakeup.
+_MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
+# OSC 1.0 stream frame size prefix.
+_FRAME_SIZE = struct.Struct('>i')
+
+
+class _OscIoLoop():
+    # Single thread that multiplexes the sockets of all network interfaces.
+    # All readable sockets are drained each wakeup and their messages are
+    # dispatched as one batch. Interfaces implement _on_readable(batch).
+
+    max_reads = 256
+    '''Maximum number of reads per socket and wakeup.'''
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def _get(cls):
+        with cls._instance_lock:
+            if cls._instance is None or not cls._instance._running:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'{type(self).__name__} id: {id(self)}',
+            daemon=True)
+        self._thread.start()
+        _libsc3.main._atexitq.add(
+            _libsc3.main._atexitprio.NETWORKING + 2, self._stop)
+
+    def register(self, interface):
+        with self._lock:
+            self._selector.register(
+                interface._socket, selectors.EVENT_READ, interface)
+        self._wakeup()
+
+    def unregister(self, interface):
+        with self._lock:
+            try:
+                self._selector.unregister(interface._socket)
+            except (KeyError, ValueError):
+                return
+        self._wakeup()
+
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send(b'\x00')
+        except OSError:
+            pass  # Already signaled or stopped.
+
+    def _stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(1)
+
+    def _run(self):
+        while self._running:
+            try:
+                events = self._selector.select()
+            except (OSError, ValueError):
+                # A socket was closed while selecting, registration
+                # changes are always followed by a wakeup.
+                continue
+            batch = []
+            for key, _ in events:
+                if key.data is None:
+                    try:
+                        while self._wakeup_r.recv(512):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                if self._selector.get_map().get(key.fileobj) is not key:
+                    continue  # Unregistered after select.
+                try:
+                    key.data._on_readable(batch)
+                except Exception:
+                    # The loop is shared by all interfaces.
+                    _logger.error(
+                        f'{str(key.data)}: exception while reading',
+                        exc_info=sys.exc_info())
+            if batch:
+                OscInterface._batch_dispatch(batch)
+        self._selector.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+
+
 class OscInterface(ABC):
     _recv_functions = set()
     _local_endpoints = dict()
+    _NET_ADDR_CACHE_SIZE = 1024
+    _capture = None
 
     def __init__(self, port=None, port_range=1):
         self._port = port
         self._port_range = port_range if port_range > 0 else 1
         self._socket = None
         self._proto = None
+        self._net_addr_cache = dict()
 
     @property
     def port(self):
@@ -62,6 +172,9 @@ class OscInterface(ABC):
             time: Time of arrival measured from `main.elapsed_time()`.
             addr: A NetAddr object with sender's address.
             port: Local port as int.
+        If func has a `matches_address(address)` method, messages whose
+        address doesn't match are discarded before decoding their arguments
+        when no other registered func accepts them either.
         '''
         cls._recv_functions.add(func)
 
@@ -70,43 +183,104 @@ class OscInterface(ABC):
         '''Unregister func callback.'''
         cls._recv_functions.discard(func)
 
+    @classmethod
+    def start_capture(cls, path, ring_size=None, segments=16):
+        '''
+        Record the datagrams sent and received by all the interfaces.
+        If ring_size is None datagrams are appended to the file, otherwise
+        the file is a memory mapped ring of about ring_size bytes that
+        keeps the most recent traffic. The file is read by
+        `_osccapture.read_capture` and sent again by `_osccapture.replay`.
+        Return the capture object, a previous capture is closed.
+        '''
+        OscInterface.stop_capture()
+        if ring_size is None:
+            capture = cpt.OscCapture(path)
+        else:
+            capture = cpt.OscRingCapture(path, ring_size, segments)
+        OscInterface._capture = capture
+        _libsc3.main._atexitq.add(
+            _libsc3.main._atexitprio.NETWORKING + 3, OscInterface.stop_capture)
+        return capture
+
+    @classmethod
+    def stop_capture(cls):
+        '''Stop recording and close the capture file.'''
+        capture = OscInterface._capture
+        if capture is None:
+            return
+        OscInterface._capture = None
+        capture.close()
+        _libsc3.main._atexitq.remove(OscInterface.stop_capture)
+
     def _msg_dispatch(self, addr, time, *msg):
         '''
         This method routes all incoming OSC messages to responders.
 
         Args:
             addr: A tuple (sender_ip:str, sender_port:int).
-            time: OSC timetag as 64bits unsigned integer.
+            time: Time of arrival measured from `main.elapsed_time()`.
             *msg: OSC message as address followed by values.
         '''
-        addr = nad.NetAddr(addr[0], addr[1])
-        addr._osc_interface = self
+        self._batch_dispatch([(self._recv_dispatch, (addr, time, list(msg)))])
 
-        def sched_func():
-            for func in type(self)._recv_functions.copy():
-                func(list(msg), time, addr, self.port)
+    @staticmethod
+    def _batch_dispatch(batch):
+        # Route a list of (func, args) incoming messages to responders
+        # through the SystemClock inbound queue, logical time is updated.
+        clk.SystemClock._inbound_put(batch)
 
-        clk.SystemClock.sched(0, sched_func)  # Updates logical time.
+    def _recv_dispatch(self, addr, time, msg):
+        # NetAddr objects are cached by sender.
+        try:
+            net_addr = self._net_addr_cache[addr]
+        except KeyError:
+            if len(self._net_addr_cache) >= self._NET_ADDR_CACHE_SIZE:
+                self._net_addr_cache.clear()
+            net_addr = nad.NetAddr(addr[0], addr[1])
+            net_addr._osc_interface = self
+            self._net_addr_cache[addr] = net_addr
+        for func in type(self)._recv_functions.copy():
+            func(list(msg), time, net_addr, self.port)
 
-    def _handle_request(self, data, address):
+    @classmethod
+    def _accepts(cls, address):
+        for func in cls._recv_functions.copy():
+            matches = getattr(func, 'matches_address', None)
+            if matches is None or matches(address):
+                return True
+        return False
+
+    def _parse_request(self, data, address, elapsed_time, batch):
+        # Append the accepted messages of a packet to batch.
+        if self._capture is not None:
+            self._capture.write(cpt.IN, address, data, elapsed_time)
         try:
-            elapsed_time = _libsc3.main.elapsed_time()
             packet = oli.OscPacket(data)
             for timed_msg in packet.messages:
+                message = timed_msg.message
+                if not self._accepts(message.address):
+                    continue  # Arguments are not decoded.
                 if timed_msg.time is None or timed_msg.time == oli.IMMEDIATELY:
                     time = elapsed_time
                 else:
                     time = clk.SystemClock.osc_to_elapsed_time(timed_msg.time)
-                self._msg_dispatch(
-                    address, time,
-                    *[timed_msg.message.address,
-                    *timed_msg.message.params])
+                batch.append((
+                    self._recv_dispatch,
+                    (address, time, [message.address, *message])))
         except:
             _logger.error(
                 'Exception happened during processing '
                 f'request from {address}',
                 exc_info=sys.exc_info())
 
+    def _handle_request(self, data, address):
+        batch = []
+        self._parse_request(
+            data, address, _libsc3.main.elapsed_time(), batch)
+        if batch:
+            self._batch_dispatch(batch)
+
     def send_msg(self, target, *args):
         '''
         args are values to create one message.
@@ -137,35 +311,47 @@ class OscInterface(ABC):
 
     def _build_msg(self, send_time, arg_list):
         # ['/path', arg1, arg2, ..., argN]
-        msg_builder = oli.OscMessageBuilder(arg_list[0])
-        for arg in arg_list[1:]:
+        dgram = oli.encode_numeric_message(arg_list[0], arg_list[1:])
+        if dgram is None:
+            dgram = oli.encode_message(
+                arg_list[0], self._msg_args(send_time, arg_list[1:]))
+        return oli.OscMessage(dgram, False)
+
+    def _msg_args(self, send_time, arg_list):
+        # Convert sc3 special cases, '[' and ']' delimit nested arrays.
+        args = []
+        stack = [args]
+        for arg in arg_list:
             if arg is None:
-                msg_builder.add_arg(0)
+                stack[-1].append(0)
             elif isinstance(arg, bool):
-                msg_builder.add_arg(int(arg))
+                stack[-1].append(int(arg))
             elif isinstance(arg, list):
                 if not arg:
-                    msg_builder.add_arg(0)
+                    stack[-1].append(0)
                 elif isinstance(arg[0], str):
-                    msg_builder.add_arg(
-                        self._build_msg(send_time, arg).dgram)
+                    stack[-1].append(self._build_msg(send_time, arg).dgram)
                 elif isinstance(arg[0], (int, float, type(None)))\
                 and len(arg) > 1 and isinstance(arg[1], list):
-                    msg_builder.add_arg(
-                        self._build_bundle(send_time, arg).dgram)
+                    stack[-1].append(self._build_bundle(send_time, arg).dgram)
                 else:
                     raise ValueError(
                         'lists within messages must be valid '
                         f'OSC messages or bundles: {arg}')
             elif arg == '[':
-                msg_builder.args.append(
-                    (msg_builder.ARG_TYPE_ARRAY_START, None))
+                stack.append([])
+                stack[-2].append(stack[-1])
             elif arg == ']':
-                msg_builder.args.append(
-                    (msg_builder.ARG_TYPE_ARRAY_STOP, None))
+                if len(stack) < 2:
+                    raise oli.OscMessageBuildError(
+                        'unexpected closing bracket in message arguments')
+                stack.pop()
             else:
-                msg_builder.add_arg(arg)  # Infiere correctamente el resto de los tipos.
-        return msg_builder.build()
+                stack[-1].append(arg)  # Infiere correctamente el resto de los tipos.
+        if len(stack) != 1:
+            raise oli.OscMessageBuildError(
+                'missing closing bracket in message arguments')
+        return args
 
     def _build_bundle(self, send_time, arg_list):
         # [time, ['/path', arg1, arg2, ..., argN], [...], ...]
@@ -232,9 +418,6 @@ class OscInterface(ABC):
         bind_addr = self._socket.getsockname()
         if self._socket.type == socket.SOCK_STREAM:
             self._socket.shutdown(socket.SHUT_RDWR)
-        else:
-            # SOCK_DGRAM recvfrom unblock for Linux.
-            self._socket.sendto(b'', bind_addr)
         self._socket.close()
         del type(self)._local_endpoints[bind_addr]
 
@@ -286,7 +469,7 @@ class OscUdpInterface(OscInterface):
     def __init__(self, port, port_range=1):
         super().__init__(port, port_range)
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self._udp_thread = None
+        self._io_loop = None
         self._running = False
         self._proto = 'udp'
 
@@ -294,31 +477,34 @@ class OscUdpInterface(OscInterface):
         if self._running:
             return
         self.bind()
-        self._udp_thread = threading.Thread(
-            target=self._udp_run, name=str(self))
-        self._udp_thread.daemon = True
-        self._udp_thread.start()
+        self._running = True
+        self._io_loop = _OscIoLoop._get()
+        self._io_loop.register(self)
         _libsc3.main._atexitq.add(
             _libsc3.main._atexitprio.NETWORKING + 1, self.stop)
 
-    def _udp_run(self):
-        bind_addr = self._socket.getsockname()
-        self._running = True
-        while self._running:
+    def _on_readable(self, batch):
+        # Called from the I/O thread.
+        elapsed_time = _libsc3.main.elapsed_time()
+        for _ in range(_OscIoLoop.max_reads):
             try:
-                data, address = self._socket.recvfrom(65536)
-                if not data and address == bind_addr:
-                    break
-                self._handle_request(data, address)
+                data, address = self._socket.recvfrom(65536, _MSG_DONTWAIT)
+            except BlockingIOError:
+                break
             except OSError as e:
                 if self._running:
                     _logger.error(f'{str(self)}: {str(e)}')
                 break
+            self._parse_request(data, address, elapsed_time, batch)
+            if not _MSG_DONTWAIT:
+                break
 
     def stop(self):
         if not self._running:
             return
         self._running = False
+        self._io_loop.unregister(self)
+        self._io_loop = None
         self.unbind()
         _libsc3.main._atexitq.remove(self.stop)
 
@@ -326,52 +512,92 @@ class OscUdpInterface(OscInterface):
         return self._running
 
     def _send(self, msg, target):  # override
+        if self._capture is not None:
+            self._capture.write(cpt.OUT, target, msg.dgram)
         self._socket.sendto(msg.dgram, target)
 
 
 class OscTcpInterface(OscInterface):
     '''
     OSC client over TCP. OscTcpInterface instances aren't reusable.
+
+    Outgoing messages are framed into a buffer that is written with one
+    `sendall` call. Messages sent from other threads while a write is in
+    progress are coalesced into the next write.
     '''
 
+    _RECV_SIZE = 65536
+
     def __init__(self, port, port_range=1):
         super().__init__(port, port_range)
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._tcp_thread = None
-        self._run_thread = False
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._io_loop = None
+        self._recv_buffer = bytearray()
+        self._send_buffer = bytearray()
+        self._send_lock = threading.Lock()
+        self._sending = False
+        self._peer_addr = None
         self._is_connected = False
         self._proto = 'tcp'
 
     def connect(self, target):
         self._socket.connect(target)  # Exception on failure.
+        self._peer_addr = self._socket.getpeername()
         self._is_connected = True  # Not thread safe.
-        self._tcp_thread = threading.Thread(
-            target=self._tcp_run, name=str(self))
-        self._tcp_thread.daemon = True
-        self._tcp_thread.start()
+        self._io_loop = _OscIoLoop._get()
+        self._io_loop.register(self)
         _libsc3.main._atexitq.add(
             _libsc3.main._atexitprio.NETWORKING, self.disconnect)
 
-    def _tcp_run(self):
-        self._run_thread = True
-        while self._run_thread:
+    def _on_readable(self, batch):
+        # Called from the I/O thread. Messages are framed by a 32 bit size
+        # prefix, as in OSC 1.0 streams, and can span many reads.
+        buffer = self._recv_buffer
+        for _ in range(_OscIoLoop.max_reads):
             try:
-                data = self._socket.recv(4)
-                if not data:
-                    self._is_connected = False
-                    break
-                size = struct.unpack('>i', data)[0]
-                data = self._socket.recv(size)
-                if not data:
-                    self._is_connected = False
-                    break
-                self._handle_request(data, self._socket.getpeername())
+                data = self._socket.recv(self._RECV_SIZE, _MSG_DONTWAIT)
+            except BlockingIOError:
+                break
             except OSError as e:
-                if self._run_thread:  # Log for not intentional disconnects.
+                if self._is_connected:  # Log for not intentional disconnects.
                     _logger.error(f'{str(self)}: {str(e)}')
+                data = None
+            if not data:
                 self._is_connected = False
+                self._io_loop.unregister(self)
+                break
+            buffer += data
+            if not _MSG_DONTWAIT:
                 break
+        self._split_frames(batch)
+
+    def _split_frames(self, batch):
+        # Parse the complete frames of the receive buffer into batch.
+        buffer = self._recv_buffer
+        elapsed_time = _libsc3.main.elapsed_time()
+        view = memoryview(buffer)
+        length = len(buffer)
+        index = 0
+        try:
+            while length - index >= 4:
+                size = _FRAME_SIZE.unpack_from(buffer, index)[0]
+                if size < 0:
+                    _logger.error(f'{str(self)}: invalid frame size {size}')
+                    index = length
+                    break
+                end = index + 4 + size
+                if end > length:
+                    break
+                self._parse_request(
+                    view[index + 4:end].tobytes(), self._peer_addr,
+                    elapsed_time, batch)
+                index = end
+        finally:
+            view.release()
+        if index:
+            del buffer[:index]  # Once per wakeup.
 
     def try_connect(self, target, timeout=3, on_complete=None, on_failure=None):
         def tcp_connect_func():
@@ -395,9 +621,10 @@ class OscTcpInterface(OscInterface):
         stm.Routine.run(tcp_connect_func, clk.AppClock)
 
     def disconnect(self):
-        self._run_thread = False
-        self._tcp_thread = None
         self._is_connected = False  # Is sync.
+        if self._io_loop is not None:
+            self._io_loop.unregister(self)
+            self._io_loop = None
         self.unbind()
         _libsc3.main._atexitq.remove(self.disconnect)
 
@@ -406,8 +633,298 @@ class OscTcpInterface(OscInterface):
         return self._is_connected
 
     def _send(self, msg, _=None):  # override
-        self._socket.send(msg.size.to_bytes(4, 'big'))
-        self._socket.send(msg.dgram)
+        dgram = msg.dgram
+        if self._capture is not None:
+            self._capture.write(cpt.OUT, self._peer_addr, dgram)
+        with self._send_lock:
+            self._send_buffer += _FRAME_SIZE.pack(len(dgram))
+            self._send_buffer += dgram
+            if self._sending:
+                return  # Coalesced by the writing thread.
+            self._sending = True
+        self._flush()
+
+    def _flush(self):
+        try:
+            while True:
+                with self._send_lock:
+                    data = self._send_buffer
+                    if not data:
+                        self._sending = False
+                        return
+                    self._send_buffer = bytearray()
+                self._socket.sendall(data)
+        except:
+            with self._send_lock:
+                dropped = self._send_buffer
+                self._send_buffer = bytearray()
+                self._sending = False
+            if dropped:
+                # Frames queued by other threads while sending, the error
+                # is raised only in this thread.
+                frames = 0
+                index = 0
+                while index < len(dropped):
+                    index += _FRAME_SIZE.size + _FRAME_SIZE.unpack_from(
+                        dropped, index)[0]
+                    frames += 1
+                _logger.error(
+                    f'{str(self)}: dropped {frames} queued messages '
+                    f'({len(dropped)} bytes)')
+            raise
+
+
+### asyncio Interfaces ###
+
+class _AsyncioLoop():
+    # Event loop running forever in its own thread for the asyncio
+    # interfaces. Calls from other threads never wait for the loop, the
+    # loop thread dispatches to the SystemClock that may be holding the
+    # library lock.
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def _get(cls):
+        with cls._instance_lock:
+            if cls._instance is None or not cls._instance._running:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'{type(self).__name__} id: {id(self)}',
+            daemon=True)
+        self._thread.start()
+        _libsc3.main._atexitq.add(
+            _libsc3.main._atexitprio.NETWORKING + 2, self._stop)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def _in_loop_thread(self):
+        return threading.current_thread() is self._thread
+
+    def _call_soon(self, func, *args):
+        try:
+            if self._in_loop_thread():
+                self.loop.call_soon(func, *args)
+            else:
+                self.loop.call_soon_threadsafe(func, *args)
+        except RuntimeError:
+            pass  # Loop closed at exit.
+
+    def _create_task(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def _stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._call_soon(self.loop.stop)
+        if not self._in_loop_thread():
+            self._thread.join(1)
+
+
+class _OscAsyncioProtocol(asyncio.BaseProtocol):
+    # Incoming messages of a loop iteration are dispatched as one batch.
+
+    def __init__(self, interface):
+        self._interface = interface
+        self._batch = []
+        self._flush_pending = False
+
+    def _schedule_flush(self):
+        if not self._flush_pending:
+            self._flush_pending = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_pending = False
+        batch = self._batch
+        self._batch = []
+        if batch:
+            OscInterface._batch_dispatch(batch)
+
+
+class _OscDatagramProtocol(_OscAsyncioProtocol, asyncio.DatagramProtocol):
+    def datagram_received(self, data, address):
+        self._interface._parse_request(
+            data, address, _libsc3.main.elapsed_time(), self._batch)
+        self._schedule_flush()
+
+    def error_received(self, exc):
+        _logger.error(f'{str(self._interface)}: {str(exc)}')
+
+
+class _OscStreamProtocol(_OscAsyncioProtocol, asyncio.Protocol):
+    def connection_made(self, transport):
+        self._interface._connection_made(transport)
+
+    def data_received(self, data):
+        self._interface._recv_buffer += data
+        self._interface._split_frames(self._batch)
+        self._schedule_flush()
+
+    def connection_lost(self, exc):
+        if exc is not None and self._interface._is_connected:
+            _logger.error(f'{str(self._interface)}: {str(exc)}')
+        self._interface._is_connected = False
+
+
+class OscAsyncioTcpInterface(OscTcpInterface):
+    '''
+    OSC client over TCP using an asyncio transport.
+
+    The socket is connected synchronously and then handed to the event
+    loop of the asyncio interfaces. Outgoing frames are coalesced until the
+    next loop iteration and written by the transport.
+    '''
+
+    def __init__(self, port, port_range=1):
+        super().__init__(port, port_range)
+        self._aio_loop = None
+        self._transport = None
+
+    def connect(self, target):  # override
+        self._socket.connect(target)  # Exception on failure.
+        self._peer_addr = self._socket.getpeername()
+        self._is_connected = True
+        self._aio_loop = _AsyncioLoop._get()
+        self._aio_loop._create_task(self._aio_loop.loop.create_connection(
+            lambda: _OscStreamProtocol(self), sock=self._socket))
+        _libsc3.main._atexitq.add(
+            _libsc3.main._atexitprio.NETWORKING, self.disconnect)
+
+    def _connection_made(self, transport):
+        with self._send_lock:
+            self._transport = transport
+            self._sending = True
+        self._write()
+
+    def disconnect(self):  # override
+        self._is_connected = False
+        try:
+            bind_addr = self._socket.getsockname()
+        except OSError:
+            bind_addr = None
+        if self._aio_loop is not None:
+            self._aio_loop._call_soon(self._close)
+            self._aio_loop = None
+        else:
+            self._socket.close()
+        type(self)._local_endpoints.pop(bind_addr, None)
+        _libsc3.main._atexitq.remove(self.disconnect)
+
+    def _close(self):
+        with self._send_lock:
+            transport = self._transport
+            self._transport = None
+        if transport is None:
+            self._socket.close()
+        else:
+            transport.close()
+
+    def _send(self, msg, _=None):  # override
+        dgram = msg.dgram
+        if self._capture is not None:
+            self._capture.write(cpt.OUT, self._peer_addr, dgram)
+        with self._send_lock:
+            self._send_buffer += _FRAME_SIZE.pack(len(dgram))
+            self._send_buffer += dgram
+            if self._sending or self._transport is None:
+                return  # Written by the next scheduled write.
+            self._sending = True
+        self._aio_loop._call_soon(self._write)
+
+    def _write(self):
+        # Called from the loop thread.
+        with self._send_lock:
+            self._sending = False
+            transport = self._transport
+            if transport is None or not self._send_buffer:
+                return
+            data = self._send_buffer
+            self._send_buffer = bytearray()
+        transport.write(data)
+
+
+class OscAsyncioInterface(OscUdpInterface):
+    '''
+    OSC over UDP server using an asyncio datagram transport.
+
+    The transport runs in an event loop of its own thread that is shared
+    by all asyncio interfaces. It is used as the library interface by
+    setting ``sc3.LIB_OSC_BACKEND = 'asyncio'`` before ``sc3.init()``.
+    Coroutines running in any event loop can await replies from the
+    server, see `Server.async_sync`, `Bus.aget` and `Buffer.agetn`.
+    '''
+
+    _tcp_interface_class = OscAsyncioTcpInterface
+
+    def __init__(self, port, port_range=1):
+        super().__init__(port, port_range)
+        self._aio_loop = None
+        self._transport = None
+
+    def start(self):  # override
+        if self._running:
+            return
+        self.bind()
+        self._running = True
+        self._aio_loop = _AsyncioLoop._get()
+        self._aio_loop._create_task(self._create_endpoint())
+        _libsc3.main._atexitq.add(
+            _libsc3.main._atexitprio.NETWORKING + 1, self.stop)
+
+    async def _create_endpoint(self):
+        transport, _ = await self._aio_loop.loop.create_datagram_endpoint(
+            lambda: _OscDatagramProtocol(self), sock=self._socket)
+        self._transport = transport
+        if not self._running:
+            self._close()
+
+    def stop(self):  # override
+        if not self._running:
+            return
+        self._running = False
+        bind_addr = self._socket.getsockname()
+        self._aio_loop._call_soon(self._close)
+        self._aio_loop = None
+        type(self)._local_endpoints.pop(bind_addr, None)
+        _libsc3.main._atexitq.remove(self.stop)
+
+    def _close(self):
+        # Called from the loop thread.
+        if self._transport is None:
+            self._socket.close()
+        else:
+            self._transport.close()
+            self._transport = None
+
+    def _send(self, msg, target):  # override
+        # Datagrams are written directly when the socket buffer has room,
+        # as the transport does, without waiting for the loop.
+        if self._capture is not None:
+            self._capture.write(cpt.OUT, target, msg.dgram)
+        try:
+            self._socket.sendto(msg.dgram, target)
+        except BlockingIOError:
+            if self._aio_loop is not None:
+                self._aio_loop._call_soon(
+                    self._send_later, msg.dgram, target)
+
+    def _send_later(self, dgram, target):
+        if self._transport is not None:
+            self._transport.sendto(dgram, target)
 
 
 class OscNrtInterface(OscInterface):
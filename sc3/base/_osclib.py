@@ -35,6 +35,7 @@ For more information, please refer to <http://unlicense.org/>
 import struct
 import logging
 import collections
+import functools
 from typing import Union, Tuple, Any, Iterator, List
 
 
@@ -94,6 +95,16 @@ _TIMETAG_DGRAM_LEN = 8
 _STRING_DGRAM_PAD = 4
 _BLOB_DGRAM_PAD = 4
 
+_INT_STRUCT = struct.Struct('>i')
+_TIMETAG_STRUCT = struct.Struct('>Q')
+_MIDI_STRUCT = struct.Struct('>4B')
+_ARG_STRUCTS = {
+    'i': _INT_STRUCT,
+    'f': struct.Struct('>f'),
+    'd': struct.Struct('>d'),
+    't': _TIMETAG_STRUCT,
+    'r': struct.Struct('>I')}
+
 
 ### OSC Types ###
 
@@ -420,59 +431,116 @@ def get_midi(dgram: bytes, start_index: int) -> Tuple[Tuple[int, int, int, int],
         raise OscTypeParseError('Could not parse datagram') from e
 
 
+### In Place Parsing ###
+
+
+def _as_buffer(dgram):
+    # Parsing needs find and startswith, memoryview objects are
+    # only copied when parsed as packets, e.g. blobs with bundles.
+    if isinstance(dgram, memoryview):
+        return dgram.tobytes()
+    return dgram
+
+
+def _range_bytes(dgram, start, end):
+    if start == 0 and end == len(dgram):
+        return dgram
+    return dgram[start:end]
+
+
+def _parse_string(dgram, index: int, end: int) -> Tuple[str, int]:
+    # Same as get_string within dgram[index:end] without slicing.
+    null = dgram.find(b'\x00', index, end)
+    if null < 0:
+        raise OscMessageParseError('Datagram is too short')
+    next_index = index + ((null - index + _STRING_DGRAM_PAD) & ~3)
+    if next_index > end:
+        raise OscMessageParseError('Datagram is too short')
+    try:
+        return dgram[index:null].decode('utf-8'), next_index
+    except UnicodeDecodeError as e:
+        raise OscMessageParseError('Could not parse datagram') from e
+
+
 ### OSC Bundle ###
 
 
 class OscBundle(object):
     """Bundles elements that should be triggered at the same time.
 
-    An element can be another OscBundle or an OscMessage.
+    An element can be another OscBundle or an OscMessage. Elements are
+    parsed in place as ranges of the outermost datagram, no sub datagrams
+    are copied.
     """
 
-    def __init__(self, dgram: bytes):
+    def __init__(self, dgram: bytes, start: int=0, end: int=None,
+                 parse: bool=True):
         """Initializes the OscBundle with the given datagram.
 
         Args:
           dgram: a UDP datagram representing an OscBundle.
+          start: index of the bundle within dgram.
+          end: end index of the bundle within dgram, defaults to its length.
+          parse: if False contents are parsed on first access, used for
+            built bundles that are only sent.
         Raises:
           ParseError: if the datagram could not be parsed into an OscBundle.
         """
+        self._dgram = _as_buffer(dgram)
+        self._start = start
+        self._end = len(self._dgram) if end is None else end
         # Interesting stuff starts after the initial b"#bundle\x00".
-        self._dgram = dgram
-        index = len(_BUNDLE_PREFIX_DGRAM)
-        try:
-            self._timetag, index = get_timetag(self._dgram, index)
-        except OscTypeParseError as e:
+        index = start + len(_BUNDLE_PREFIX_DGRAM)
+        if index + _TIMETAG_DGRAM_LEN > self._end:
             raise OscBundleParseError(
-                'Could not get the timetag from datagram') from e
+                'Could not get the timetag from datagram')
+        self._timetag = _TIMETAG_STRUCT.unpack_from(self._dgram, index)[0]
         # Get the contents as a list of OscBundle and OscMessage.
-        self._contents = self._parse_contents(index)
+        if parse:
+            self._m_contents = self._parse_contents(
+                index + _TIMETAG_DGRAM_LEN)
+        else:
+            self._m_contents = None
+
+    @property
+    def _contents(self):
+        if self._m_contents is None:
+            self._m_contents = self._parse_contents(
+                self._start + len(_BUNDLE_PREFIX_DGRAM) + _TIMETAG_DGRAM_LEN)
+        return self._m_contents
 
     # Return type is actually List[OscBundle], but that would require import annotations from __future__, which is
     # python 3.7+ only.
     def _parse_contents(self, index: int) -> Any:
         contents = []
+        dgram = self._dgram
+        end = self._end
         try:
             # An OSC Bundle Element consists of its size and its contents.
             # The size is an int32 representing the number of 8-bit bytes in the
             # contents, and will always be a multiple of 4. The contents are either
             # an OSC Message or an OSC Bundle.
-            while self._dgram[index:]:
+            while index < end:
                 # Get the sub content size.
-                content_size, index = get_int(self._dgram, index)
-                # Get the datagram for the sub content.
-                content_dgram = self._dgram[index:index + content_size]
-                # Increment our position index up to the next possible content.
-                index += content_size
+                if index + _INT_DGRAM_LEN > end:
+                    raise OscBundleParseError('Datagram is too short')
+                content_size = _INT_STRUCT.unpack_from(dgram, index)[0]
+                index += _INT_DGRAM_LEN
+                content_end = index + content_size
+                if content_size < 0 or content_end > end:
+                    raise OscBundleParseError('Datagram is too short')
                 # Parse the content into an OSC message or bundle.
-                if OscBundle.dgram_is_bundle(content_dgram):
-                    contents.append(OscBundle(content_dgram))
-                elif OscMessage.dgram_is_message(content_dgram):
-                    contents.append(OscMessage(content_dgram))
+                if dgram.startswith(_BUNDLE_PREFIX_DGRAM, index, content_end):
+                    contents.append(OscBundle(dgram, index, content_end))
+                elif dgram.startswith(b'/', index, content_end):
+                    contents.append(OscMessage(dgram, True, index, content_end))
                 else:
-                    _logger.warning('Could not identify content type '
-                                    f'of dgram {content_dgram}')
-        except (OscTypeParseError, OscMessageParseError, IndexError) as e:
+                    _logger.warning(
+                        'Could not identify content type '
+                        f'of dgram {bytes(dgram[index:content_end])}')
+                # Increment our position index up to the next possible content.
+                index = content_end
+        except OscMessageParseError as e:
             raise OscBundleParseError(
                 "Could not parse a content datagram") from e
 
@@ -496,12 +564,12 @@ class OscBundle(object):
     @property
     def size(self) -> int:
         """Returns the length of the datagram for this bundle."""
-        return len(self._dgram)
+        return self._end - self._start
 
     @property
     def dgram(self) -> bytes:
         """Returns the datagram from which this bundle was built."""
-        return self._dgram
+        return _range_bytes(self._dgram, self._start, self._end)
 
     def content(self, index) -> Any:
         """Returns the bundle's content 0-indexed."""
@@ -539,21 +607,15 @@ class OscBundleBuilder(object):
         Raises:
           - BuildError: if we could not build the bundle.
         """
-        dgram = _BUNDLE_PREFIX_DGRAM
-        try:
-            dgram += write_timetag(self._timetag)
-            for content in self._contents:
-                if type(content) is OscMessage or type(content) is OscBundle:
-                    size = content.size
-                    dgram += write_int(size)
-                    dgram += content.dgram
-                else:
-                    raise OscBundleBuildError(
-                        'Content must be either OscBundle or OscMessage '
-                        f'found {type(content).__name__}')
-            return OscBundle(dgram)
-        except OscTypeBuildError as e:
-            raise OscBundleBuildError('Could not build the bundle') from e
+        for content in self._contents:
+            if type(content) is not OscMessage\
+            and type(content) is not OscBundle:
+                raise OscBundleBuildError(
+                    'Content must be either OscBundle or OscMessage '
+                    f'found {type(content).__name__}')
+        dgram = encode_bundle(
+            self._timetag, [content.dgram for content in self._contents])
+        return OscBundle(dgram, parse=False)
 
 
 ### OSC Message ###
@@ -564,76 +626,113 @@ class OscMessage(object):
 
     An OSC message consists of an OSC Address Pattern followed by an OSC
     Type Tag String followed by zero or more OSC Arguments.
-    """
 
-    def __init__(self, dgram: bytes) -> None:
-        self._dgram = dgram
-        self._parameters = []
-        self._parse_datagram()
+    Parsing is lazy, the address is decoded on creation, so messages can
+    be discarded by address, and the arguments when first accessed. Blob
+    arguments are memoryview slices of the datagram.
+    """
 
-    def _parse_datagram(self) -> None:
-        try:
-            self._address_regexp, index = get_string(self._dgram, 0)
-            if not self._dgram[index:]:
-                # No params is legit, just return now.
-                return
-
-            # Get the parameters types.
-            type_tag, index = get_string(self._dgram, index)
-            if type_tag.startswith(','):
-                type_tag = type_tag[1:]
-
-            params = []
-            param_stack = [params]
-            # Parse each parameter given its type.
-            for param in type_tag:
-                if param == "i":  # Integer.
-                    val, index = get_int(self._dgram, index)
-                elif param == "f":  # Float.
-                    val, index = get_float(self._dgram, index)
-                elif param == "d":  # Double.
-                    val, index = get_double(self._dgram, index)
-                elif param == "s":  # String.
-                    val, index = get_string(self._dgram, index)
-                elif param == "b":  # Blob.
-                    val, index = get_blob(self._dgram, index)
-                elif param == "r":  # RGBA.
-                    val, index = get_rgba(self._dgram, index)
-                elif param == "m":  # MIDI.
-                    val, index = get_midi(self._dgram, index)
-                elif param == "t":  # osc time tag:
-                    val, index = get_timetag(self._dgram, index)
-                elif param == "T":  # True.
-                    val = True
-                elif param == "F":  # False.
-                    val = False
-                elif param == "[":  # Array start.
-                    array = []
-                    param_stack[-1].append(array)
-                    param_stack.append(array)
-                elif param == "]":  # Array stop.
-                    if len(param_stack) < 2:
-                        raise OscMessageParseError(
-                            'Unexpected closing bracket '
-                            f'in type tag: {type_tag}')
-                    param_stack.pop()
-                # TODO: Support more exotic types as described in the specification.
-                else:
-                    _logger.warning(f'Unhandled parameter type: {param}')
-                    continue
-                if param not in "[]":
-                    param_stack[-1].append(val)
-            if len(param_stack) != 1:
-                raise OscMessageParseError(
-                    f'Missing closing bracket in type tag: {type_tag}')
+    def __init__(self, dgram: bytes, parse: bool=True,
+                 start: int=0, end: int=None) -> None:
+        # Built messages are not parsed until accessed.
+        self._dgram = _as_buffer(dgram)
+        self._start = start
+        self._end = len(self._dgram) if end is None else end
+        self._address_regexp = None
+        self._args_index = None
+        self._parameters = None
+        if parse:
+            self._parse_address()
+
+    def _parse_address(self) -> None:
+        self._address_regexp, self._args_index = _parse_string(
+            self._dgram, self._start, self._end)
+
+    def _parse_arguments(self) -> None:
+        if self._args_index is None:
+            self._parse_address()
+        dgram = self._dgram
+        index = self._args_index
+        end = self._end
+        params = []
+        if index >= end:
+            # No params is legit, just return now.
             self._parameters = params
-        except OscTypeParseError as e:
+            return
+
+        # Get the parameters types.
+        type_tag, index = _parse_string(dgram, index, end)
+        if type_tag.startswith(','):
+            type_tag = type_tag[1:]
+
+        view = None
+        param_stack = [params]
+        # Parse each parameter given its type.
+        for param in type_tag:
+            unpacker = _ARG_STRUCTS.get(param)
+            if unpacker is not None:  # Integer, float, double, time tag, RGBA.
+                next_index = index + unpacker.size
+                if next_index <= end:
+                    val = unpacker.unpack_from(dgram, index)[0]
+                elif param == "f":
+                    # Noticed that Reaktor doesn't send the last bunch of \x00
+                    # needed to make the float representation complete in some
+                    # cases, thus we pad here to account for that.
+                    val = unpacker.unpack(
+                        bytes(dgram[index:end]).ljust(_FLOAT_DGRAM_LEN, b'\x00'))[0]
+                else:
+                    raise OscMessageParseError('Datagram is too short')
+                index = next_index
+            elif param == "s":  # String.
+                val, index = _parse_string(dgram, index, end)
+            elif param == "b":  # Blob.
+                if index + _INT_DGRAM_LEN > end:
+                    raise OscMessageParseError('Datagram is too short')
+                size = _INT_STRUCT.unpack_from(dgram, index)[0]
+                index += _INT_DGRAM_LEN
+                if size < 0 or index + size > end:
+                    raise OscMessageParseError('Datagram is too short')
+                if view is None:
+                    view = memoryview(dgram)
+                val = view[index:index + size]
+                # Make the size a multiple of 32 bits.
+                index += size + (-size % _BLOB_DGRAM_PAD)
+            elif param == "m":  # MIDI.
+                if index + _INT_DGRAM_LEN > end:
+                    raise OscMessageParseError('Datagram is too short')
+                val = _MIDI_STRUCT.unpack_from(dgram, index)
+                index += _INT_DGRAM_LEN
+            elif param == "T":  # True.
+                val = True
+            elif param == "F":  # False.
+                val = False
+            elif param == "[":  # Array start.
+                array = []
+                param_stack[-1].append(array)
+                param_stack.append(array)
+                continue
+            elif param == "]":  # Array stop.
+                if len(param_stack) < 2:
+                    raise OscMessageParseError(
+                        'Unexpected closing bracket '
+                        f'in type tag: {type_tag}')
+                param_stack.pop()
+                continue
+            # TODO: Support more exotic types as described in the specification.
+            else:
+                _logger.warning(f'Unhandled parameter type: {param}')
+                continue
+            param_stack[-1].append(val)
+        if len(param_stack) != 1:
             raise OscMessageParseError(
-                'Found incorrect datagram, ignoring it') from e
+                f'Missing closing bracket in type tag: {type_tag}')
+        self._parameters = params
 
     @property
     def address(self) -> str:
         """Returns the OSC address regular expression."""
+        if self._args_index is None:
+            self._parse_address()
         return self._address_regexp
 
     @staticmethod
@@ -644,12 +743,12 @@ class OscMessage(object):
     @property
     def size(self) -> int:
         """Returns the length of the datagram for this message."""
-        return len(self._dgram)
+        return self._end - self._start
 
     @property
     def dgram(self) -> bytes:
         """Returns the datagram from which this message was built."""
-        return self._dgram
+        return _range_bytes(self._dgram, self._start, self._end)
 
     @property
     def params(self) -> List[Any]:
@@ -658,6 +757,8 @@ class OscMessage(object):
 
     def __iter__(self) -> Iterator[float]:
         """Returns an iterator over the parameters of this message."""
+        if self._parameters is None:
+            self._parse_arguments()
         return iter(self._parameters)
 
 
@@ -828,6 +929,164 @@ class OscMessageBuilder(object):
             raise OscMessageBuildError(f'Could not build the message') from e
 
 
+### OSC Message Encoder ###
+
+
+# Encoding functions produce the same datagrams as OscMessageBuilder but
+# pack all arguments at once with a struct.Struct compiled and cached by
+# message signature.
+
+_NUMERIC_TYPES = {int: ('i', 'i'), float: ('f', 'f')}
+
+
+@functools.lru_cache(maxsize=1024)
+def _numeric_struct(address, types):
+    tags = ','
+    fmt = ''
+    for t in types:
+        try:
+            tag, code = _NUMERIC_TYPES[t]
+        except KeyError:
+            return None
+        tags += tag
+        fmt += code
+    header = _header_dgram(address, tags)
+    return struct.Struct(f'>{len(header)}s{fmt}'), header
+
+
+@functools.lru_cache(maxsize=1024)
+def _address_dgram(address):
+    return write_string(address)
+
+
+def _header_dgram(address, tags):
+    if not address:
+        raise OscMessageBuildError('OSC addresses cannot be empty')
+    try:
+        return _address_dgram(address) + write_string(tags)
+    except OscTypeBuildError as e:
+        raise OscMessageBuildError('Could not build the message') from e
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_struct(fmt):
+    return struct.Struct(fmt)
+
+
+def _encode_args(args, tags, fmt, values):
+    for arg in args:
+        t = type(arg)
+        if t is int or t is float:
+            tags.append(_NUMERIC_TYPES[t][0])
+            fmt.append(_NUMERIC_TYPES[t][1])
+            values.append(arg)
+        elif t is str or isinstance(arg, str):
+            try:
+                arg = arg.encode('utf-8')
+            except UnicodeEncodeError as e:
+                raise OscMessageBuildError(
+                    'Could not build the message') from e
+            tags.append('s')
+            # Struct pads with nulls to 4 bytes or adds four.
+            fmt.append(f'{len(arg) + 4 - (len(arg) & 3)}s')
+            values.append(arg)
+        elif isinstance(arg, (bytes, bytearray, memoryview)):
+            if not arg:
+                raise OscMessageBuildError(
+                    'Could not build the message, '
+                    'blob value cannot be empty')
+            arg = bytes(arg)
+            tags.append('b')
+            fmt.append(f'i{len(arg) + (-len(arg) & 3)}s')
+            values.append(len(arg))
+            values.append(arg)
+        elif arg is True:
+            tags.append('T')
+        elif arg is False:
+            tags.append('F')
+        elif isinstance(arg, int):
+            tags.append('i')
+            fmt.append('i')
+            values.append(arg)
+        elif isinstance(arg, float):
+            tags.append('f')
+            fmt.append('f')
+            values.append(arg)
+        elif isinstance(arg, tuple) and len(arg) == 4:
+            tags.append('m')
+            fmt.append('I')
+            values.append(sum(
+                (v & 0xFF) << 8 * (3 - pos) for pos, v in enumerate(arg)))
+        elif isinstance(arg, list):
+            tags.append('[')
+            _encode_args(arg, tags, fmt, values)
+            tags.append(']')
+        elif arg is None:
+            tags.append('N')
+        else:
+            raise ValueError(
+                f'Infered arg_value type is not supported: {type(arg)}')
+
+
+def encode_numeric_message(address: str, args) -> Union[bytes, None]:
+    """Return the datagram of a message whose arguments are all int or
+    float, or None if the arguments are of other types.
+
+    Raises:
+      - BuildError: if the message could not be build.
+    """
+    entry = _numeric_struct(address, tuple(map(type, args)))
+    if entry is None:
+        return None
+    try:
+        return entry[0].pack(entry[1], *args)
+    except struct.error as e:
+        raise OscMessageBuildError('Could not build the message') from e
+
+
+def encode_message(address: str, args) -> bytes:
+    """Return the datagram of a message from its address and arguments.
+
+    Argument types are infered as in OscMessageBuilder, lists are encoded
+    as OSC arrays.
+
+    Raises:
+      - BuildError: if the message could not be build.
+    """
+    dgram = encode_numeric_message(address, args)
+    if dgram is not None:
+        return dgram
+    tags = [',']
+    fmt = ['>', None]
+    values = [None]
+    _encode_args(args, tags, fmt, values)
+    values[0] = _header_dgram(address, ''.join(tags))
+    fmt[1] = f'{len(values[0])}s'
+    try:
+        return _compile_struct(''.join(fmt)).pack(*values)
+    except struct.error as e:
+        raise OscMessageBuildError('Could not build the message') from e
+
+
+def encode_bundle(timetag: int, contents) -> bytes:
+    """Return the datagram of a bundle from the datagrams of its contents.
+
+    Contents are already encoded messages or bundles, each one is prefixed
+    with its size.
+
+    Raises:
+      - BuildError: if the bundle could not be build.
+    """
+    try:
+        parts = [_BUNDLE_PREFIX_DGRAM, _TIMETAG_STRUCT.pack(timetag)]
+    except struct.error as e:
+        raise OscBundleBuildError('Could not build the bundle') from e
+    for content in contents:
+        parts.append(_INT_STRUCT.pack(len(content)))
+        parts.append(content)
+    return b''.join(parts)
+
+
 ### OSC Packet ###
 
 
@@ -838,6 +1097,7 @@ TimedMessage = collections.namedtuple(
 
 class OscPacket():
     def __init__(self, dgram: bytes):
+        dgram = _as_buffer(dgram)
         if OscBundle.dgram_is_bundle(dgram):
             self._messages = self._get_bundle_messages(OscBundle(dgram))
             self._messages = sorted(self._messages, key=lambda x: x.time or 0)
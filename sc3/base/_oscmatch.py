@@ -1,3 +1,4 @@
+import functools
 import re
 
 
@@ -151,3 +152,130 @@ def osc_match_pattern(pattern, address):
     except StopIteration:
         # pattern mal formado en algunos casos
         return False
+
+
+### Option 3 ###
+
+# Patterns are compiled once by path segment, wildcards can't match '/'.
+# Literal segments are kept as strings to be looked up by hashing.
+
+_PATTERN_CHARS = frozenset('*?[]{}')
+_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _compile_segment(segment):
+    if _PATTERN_CHARS.isdisjoint(segment):
+        return segment
+    try:
+        return re.compile(
+            re.sub(_rewrite_pattern, _rewrite_func, segment)).fullmatch
+    except re.error:
+        return _no_match  # Malformed pattern.
+
+
+def _no_match(_):
+    return None
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def compile_pattern(pattern):
+    '''Return the compiled segments of an address pattern as a tuple,
+    literal segments are strings and the others match functions.'''
+    return tuple(_compile_segment(s) for s in pattern.split('/'))
+
+
+def osc_match(pattern, address):
+    '''Match a whole address against a pattern using compiled segments.'''
+    compiled = compile_pattern(pattern)
+    segments = address.split('/')
+    if len(compiled) != len(segments):
+        return False
+    for item, segment in zip(compiled, segments):
+        if type(item) is str:
+            if item != segment:
+                return False
+        elif item(segment) is None:
+            return False
+    return True
+
+
+class AddressTrie():
+    '''
+    Set of literal addresses indexed by path segment.
+
+    Patterns are resolved walking only the branches whose segments match,
+    literal pattern segments are looked up directly.
+    '''
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self):
+        self._root = [dict(), False]  # [children, terminal]
+        self._size = 0
+
+    def add(self, address):
+        node = self._root
+        for segment in address.split('/'):
+            children = node[0]
+            try:
+                node = children[segment]
+            except KeyError:
+                node = children[segment] = [dict(), False]
+        if not node[1]:
+            node[1] = True
+            self._size += 1
+
+    def remove(self, address):
+        path = [self._root]
+        segments = address.split('/')
+        for segment in segments:
+            node = path[-1][0].get(segment)
+            if node is None:
+                return
+            path.append(node)
+        if not path[-1][1]:
+            return
+        path[-1][1] = False
+        self._size -= 1
+        # Prune empty branches.
+        for i in range(len(segments), 0, -1):
+            node = path[i]
+            if node[0] or node[1]:
+                break
+            del path[i - 1][0][segments[i - 1]]
+
+    def __contains__(self, address):
+        node = self._root
+        for segment in address.split('/'):
+            node = node[0].get(segment)
+            if node is None:
+                return False
+        return node[1]
+
+    def __len__(self):
+        return self._size
+
+    def match(self, pattern):
+        '''Return an iterator over the addresses matched by pattern.'''
+        return self._match(self._root, compile_pattern(pattern), 0, [])
+
+    def _match(self, node, compiled, index, prefix):
+        if index == len(compiled):
+            if node[1]:
+                yield '/'.join(prefix)
+            return
+        item = compiled[index]
+        if type(item) is str:
+            child = node[0].get(item)
+            if child is not None:
+                prefix.append(item)
+                yield from self._match(child, compiled, index + 1, prefix)
+                prefix.pop()
+        else:
+            for segment, child in list(node[0].items()):
+                if item(segment) is not None:
+                    prefix.append(segment)
+                    yield from self._match(
+                        child, compiled, index + 1, prefix)
+                    prefix.pop()
@@ -0,0 +1,145 @@
+"""Aggregation and fan-out of outgoing messages."""
+
+import logging
+import threading
+import queue
+
+from . import main as _libsc3
+
+
+__all__ = ['OutboundBundler', 'FanOutSender']
+
+
+_logger = logging.getLogger(__name__)
+
+
+# Bundlers with pending content, ordered by first use.
+_pending = dict()
+_pending_lock = threading.Lock()
+
+
+def flush():
+    # Called by the clocks at the end of each awake call.
+    if not _pending:
+        return
+    with _pending_lock:
+        bundlers = list(_pending)
+        _pending.clear()
+    for bundler in bundlers:
+        try:
+            bundler.flush()
+        except Exception:
+            # Always recover, the clock thread must not die.
+            _logger.error(
+                'flushing outbound bundles to %s',
+                bundler._addr, exc_info=1)
+
+
+class OutboundBundler():
+    '''
+    Collector of the messages sent to a NetAddr during an awake call.
+
+    Elements are grouped by timetag, the logical time of the sender plus
+    latency, and each group is sent as one bundle when the awake call
+    returns. Elements keep their relative order within a group and groups
+    are sent in order of creation.
+
+    '''
+
+    def __init__(self, addr):
+        self._addr = addr
+        self._groups = dict()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        '''Clear counters.'''
+        self._elements = 0
+        self._datagrams = 0
+
+    @property
+    def elements(self):
+        '''Number of elements collected since last reset.'''
+        return self._elements
+
+    @property
+    def datagrams(self):
+        '''Number of datagrams sent since last reset.'''
+        return self._datagrams
+
+    def add(self, send_time, time, elements):
+        if time is not None and time < 0:
+            time = None  # Immediately.
+        with self._lock:
+            if not self._groups:
+                with _pending_lock:
+                    _pending[self] = None
+            self._groups.setdefault((send_time, time), []).extend(elements)
+            self._elements += len(elements)
+
+    def flush(self):
+        '''Send pending groups.'''
+        with self._lock:
+            groups = self._groups
+            self._groups = dict()
+        for (send_time, time), elements in groups.items():
+            self._datagrams += self._addr._send_group(
+                send_time, time, elements)
+
+
+class FanOutSender():
+    '''
+    Thread that writes encoded packets to many targets.
+
+    Packets are written in order of arrival by the interface of each
+    target, the caller doesn't wait for the system calls.
+
+    '''
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        '''Return the running sender, create it if needed.'''
+        with cls._instance_lock:
+            if cls._instance is None or not cls._instance._running:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'{type(self).__name__} id: {id(self)}',
+            daemon=True)
+        self._thread.start()
+        # Before the interfaces are closed.
+        _libsc3.main._atexitq.add(
+            _libsc3.main._atexitprio.NETWORKING - 1, self._stop)
+
+    def put(self, msg, destinations):
+        '''Write msg to a list of (interface, target) tuples.'''
+        self._queue.put((msg, destinations))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            msg, destinations = item
+            for iface, target in destinations:
+                try:
+                    iface._send(msg, target)
+                except Exception:
+                    _logger.error(
+                        'sending to %s from %s', target,
+                        type(self).__name__, exc_info=1)
+
+    def _stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        self._thread.join(1)
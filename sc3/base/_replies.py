@@ -0,0 +1,302 @@
+"""Correlation of request replies with callbacks, conditions and futures."""
+
+import asyncio
+import collections
+import heapq
+import itertools
+import logging
+import threading
+
+from . import main as _libsc3
+from . import systemactions as sac
+from . import stream as stm
+from . import clock as clk
+from . import responders as rpd
+
+
+__all__ = ['ReplyTable']
+
+
+_logger = logging.getLogger(__name__)
+
+
+class _Request():
+    __slots__ = (
+        'table', 'path', 'key', 'func', 'on_timeout', 'on_discard', 'done')
+
+    def __init__(self, table, path, key, func, on_timeout):
+        self.table = table
+        self.path = path
+        self.key = key
+        self.func = func
+        self.on_timeout = on_timeout
+        self.on_discard = None
+        self.done = False
+
+    def cancel(self):
+        '''Remove the request if it is still pending.'''
+        return self.table._remove(self)
+
+
+class ReplyTable():
+    '''
+    Table of pending replies from one target address.
+
+    Each reply path has one permanent responder for the target that
+    resolves the pending requests by key, the first arguments of the
+    reply (e.g. the id of ``'/synced'`` or the bufnum and index of
+    ``'/b_set'``). Requests with the same key are resolved in order of
+    arrival. Replies are received in the SystemClock thread, functions and
+    conditions are evaluated there and futures are resolved thread safely
+    in the event loop of the awaiting coroutine.
+
+    Timeouts of all tables are kept in a heap served by a single task
+    scheduled in SystemClock. As the responders created by OscFunc,
+    pending requests are discarded on CmdPeriod.
+
+    '''
+
+    _tables = dict()
+    _tables_lock = threading.Lock()
+    _timeouts = []
+    _timer_time = None
+    _timeouts_lock = threading.Lock()
+    _counter = itertools.count()
+
+    def __init__(self, addr):
+        self._addr = addr
+        self._lock = threading.Lock()
+        self._responders = dict()
+        self._pending = dict()
+
+    @classmethod
+    def get(cls, addr):
+        '''Return the table of a NetAddr target.'''
+        with cls._tables_lock:
+            if not cls._tables:
+                sac.CmdPeriod.add(cls._cmd_period)
+            try:
+                return cls._tables[addr._target]
+            except KeyError:
+                table = cls._tables[addr._target] = cls(addr)
+                return table
+
+    def add(self, path, key, func, timeout=None, on_timeout=None):
+        '''Add a request to be resolved by the next reply matching path and
+        key.
+
+        Parameters
+        ----------
+        path: str
+            OSC address of the reply.
+        key: list
+            Values of the first arguments of the reply that identify the
+            request.
+        func: function | Condition
+            A function evaluated with the reply as an OscFunc's function,
+            it must accept the ``msg, time, addr, recv_port`` arguments,
+            or a Condition that is signaled with ``test`` set to True.
+        timeout: float
+            Optional time in seconds to wait for the reply.
+        on_timeout: function
+            Optional function evaluated in SystemClock if the reply
+            doesn't arrive before timeout.
+
+        Returns
+        -------
+        object
+            The request, its ``cancel`` method removes it if still pending.
+        '''
+
+        if isinstance(func, stm.Condition):
+            func = self._condition_func(func)
+        elif not callable(func):
+            raise TypeError(f'func must be callable or Condition: {func}')
+        key = tuple(key)
+        request = _Request(self, path, key, func, on_timeout)
+        with self._lock:
+            self._make_responder(path, len(key))
+            self._pending.setdefault(
+                (path, key), collections.deque()).append(request)
+        if timeout is not None:
+            type(self)._add_timeout(request, timeout)
+        return request
+
+    def expect(self, path, key, timeout=None):
+        '''Return a future for the next reply matching path and key.
+
+        Must be called from within a running event loop. The result of the
+        future is the reply message as a list. If timeout is not None and
+        expires the future raises asyncio.TimeoutError.
+
+        '''
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(msg, *_):
+            self._call_soon(loop, self._set_result, future, msg)
+
+        def expire():
+            self._call_soon(
+                loop, self._set_exception, future, asyncio.TimeoutError)
+
+        request = self.add(path, key, resolve, timeout, expire)
+        request.on_discard = lambda: self._call_soon(loop, future.cancel)
+
+        def done_callback(future):
+            if future.cancelled():
+                request.cancel()
+
+        future.add_done_callback(done_callback)
+        return future
+
+    @staticmethod
+    def _condition_func(condition):
+        def signal(*_):
+            condition.test = True
+            condition.signal()
+
+        return signal
+
+    @staticmethod
+    def _call_soon(loop, func, *args):
+        try:
+            loop.call_soon_threadsafe(func, *args)
+        except RuntimeError:
+            pass  # Loop closed.
+
+    @staticmethod
+    def _set_result(future, msg):
+        if not future.done():
+            future.set_result(msg)
+
+    @staticmethod
+    def _set_exception(future, exception):
+        if not future.done():
+            future.set_exception(exception)
+
+    def _make_responder(self, path, key_size):
+        # Call with acquired lock. A path can be used with keys of
+        # different sizes, each reply is looked up for every size.
+        if path in self._responders:
+            self._responders[path][1].add(key_size)
+            return
+        key_sizes = {key_size}
+
+        def resp_func(msg, time, addr, recv_port):
+            for size in tuple(key_sizes):
+                self._resolve(
+                    path, tuple(msg[1:1 + size]), msg, time, addr, recv_port)
+
+        responder = rpd.OscFunc(resp_func, path, self._addr)
+        responder.permanent = True
+        self._responders[path] = (responder, key_sizes)
+
+    def _resolve(self, path, key, msg, time, addr, recv_port):
+        with self._lock:
+            try:
+                pending = self._pending.get((path, key))
+            except TypeError:
+                return  # Unhashable argument.
+            if not pending:
+                return
+            request = pending.popleft()
+            request.done = True
+            if not pending:
+                del self._pending[(path, key)]
+        request.func(msg, time, addr, recv_port)
+
+    def _remove(self, request):
+        with self._lock:
+            if request.done:
+                return False
+            request.done = True
+            pending = self._pending[(request.path, request.key)]
+            pending.remove(request)
+            if not pending:
+                del self._pending[(request.path, request.key)]
+            return True
+
+    @classmethod
+    def _add_timeout(cls, request, timeout):
+        if _libsc3.main is not _libsc3.RtMain:
+            return  # No replies in NRT.
+        now = _libsc3.main.elapsed_time()
+        deadline = now + timeout
+        with cls._timeouts_lock:
+            heapq.heappush(
+                cls._timeouts, (deadline, next(cls._counter), request))
+            # A timer time in the past is either about to run or its task
+            # was removed (e.g. SystemClock.clear()), a repeated expire
+            # task just reschedules the timer.
+            if cls._timer_time is not None and cls._timer_time < now:
+                cls._timer_time = None
+            if cls._timer_time is not None and cls._timer_time <= deadline:
+                return
+            cls._timer_time = deadline
+        clk.SystemClock.sched_abs(deadline, lambda: cls._expire())
+
+    @classmethod
+    def _expire(cls):
+        # Evaluated in SystemClock, is the only scheduled task for all
+        # the timeouts, it's rescheduled to the next deadline.
+        now = max(
+            _libsc3.main.elapsed_time(), _libsc3.main.current_tt._seconds)
+        expired = []
+        with cls._timeouts_lock:
+            heap = cls._timeouts
+            while heap and (heap[0][0] <= now or heap[0][2].done):
+                expired.append(heapq.heappop(heap)[2])
+            if cls._timer_time is not None and cls._timer_time <= now:
+                cls._timer_time = None
+            if heap and (cls._timer_time is None
+                         or heap[0][0] < cls._timer_time):
+                cls._timer_time = heap[0][0]
+                clk.SystemClock.sched_abs(heap[0][0], lambda: cls._expire())
+        for request in expired:
+            if request.table._remove(request) and request.on_timeout:
+                try:
+                    request.on_timeout()
+                except Exception:
+                    _logger.error(
+                        'in timeout function of %s %s',
+                        request.path, request.key, exc_info=1)
+
+    @classmethod
+    def _cmd_period(cls):
+        # SystemClock was cleared, the timer task is gone.
+        with cls._timeouts_lock:
+            cls._timeouts.clear()
+            cls._timer_time = None
+        with cls._tables_lock:
+            tables = list(cls._tables.values())
+        for table in tables:
+            table._clear()
+
+    def _clear(self):
+        with self._lock:
+            pending = [r for p in self._pending.values() for r in p]
+            self._pending.clear()
+            for request in pending:
+                request.done = True
+        for request in pending:
+            if request.on_discard:
+                request.on_discard()
+
+    @property
+    def num_pending(self):
+        '''Number of requests waiting for a reply.'''
+        with self._lock:
+            return sum(len(p) for p in self._pending.values())
+
+    def free(self):
+        '''Free responders and discard pending requests.'''
+        with self._lock:
+            for responder, _ in self._responders.values():
+                responder.free()
+            self._responders.clear()
+        self._clear()
+        with type(self)._tables_lock:
+            if type(self)._tables.get(self._addr._target) is self:
+                del type(self)._tables[self._addr._target]
@@ -1,4 +1,3 @@
-
 import heapq
 import itertools
 
@@ -12,10 +11,17 @@ class TaskQueue():
     documentation. heapq module in itself use the same principles as
     SuperCollider's clocks implementation. TaskQueue is not thread safe.
 
+    Removed entries are marked and discarded lazily when they reach the
+    top of the heap, `peek` is O(1) amortized and `add`/`pop` O(log n).
+    If removed entries outnumber the valid ones the heap is compacted
+    in place.
+
     '''
 
     class _REMOVED(): pass
 
+    _COMPACT_MIN_SIZE = 64
+
     def __init__(self):
         self._init()
 
@@ -24,6 +30,7 @@ class TaskQueue():
         self._entry_finder = {}
         self._counter = itertools.count()
         self._removed_counter = 0
+        self._largest = None
 
     def add(self, prio, task):
         '''Add a new task or update the prio of an existing task.'''
@@ -33,15 +40,37 @@ class TaskQueue():
         entry = [prio, count, task]
         self._entry_finder[task] = entry
         heapq.heappush(self._queue, entry)
+        if self._largest is not None and entry > self._largest:
+            self._largest = entry
 
     def remove(self, task):
         '''Remove an existing task. Does nothing if not found.'''
         try:
             entry = self._entry_finder.pop(task)
-            entry[-1] = type(self)._REMOVED
-            self._removed_counter += 1
         except KeyError:
             return
+        entry[-1] = type(self)._REMOVED
+        self._removed_counter += 1
+        if entry is self._largest:
+            self._largest = None
+        if self._removed_counter > len(self._queue) // 2\
+        and len(self._queue) >= self._COMPACT_MIN_SIZE:
+            self._compact()
+
+    def _compact(self):
+        # In place, references to self._queue remain valid.
+        removed = type(self)._REMOVED
+        self._queue[:] = [e for e in self._queue if e[2] is not removed]
+        heapq.heapify(self._queue)
+        self._removed_counter = 0
+
+    def _discard_top(self):
+        # Pop removed entries from the top of the heap.
+        queue = self._queue
+        removed = type(self)._REMOVED
+        while queue and queue[0][2] is removed:
+            heapq.heappop(queue)
+            self._removed_counter -= 1
 
     def pop(self):
         '''
@@ -50,13 +79,13 @@ class TaskQueue():
 
         '''
 
-        while self._queue:
-            prio, count, task = heapq.heappop(self._queue)
-            if task is not type(self)._REMOVED:
-                del self._entry_finder[task]
-                return (prio, task)
-            else:
-                self._removed_counter -= 1
+        self._discard_top()
+        if self._queue:
+            entry = heapq.heappop(self._queue)
+            del self._entry_finder[entry[2]]
+            if entry is self._largest:
+                self._largest = None
+            return (entry[0], entry[2])
         raise KeyError('pop from an empty task queue')
 
     def peek(self, smallest=True):
@@ -66,42 +95,48 @@ class TaskQueue():
 
         '''
 
-        if self._queue:
-            if smallest:
-                prio, count, task = heapq.nsmallest(
-                    1, self._queue, key=self._small_key)[0]
-            else:
-                prio, count, task = heapq.nlargest(
-                    1, self._queue, key=self._large_key)[0]
-            if task is not self._REMOVED:
-                return (prio, task)
+        if smallest:
+            self._discard_top()
+            if self._queue:
+                entry = self._queue[0]
+                return (entry[0], entry[2])
+        elif self._entry_finder:
+            if self._largest is None:
+                self._largest = self._find_largest()
+            return (self._largest[0], self._largest[2])
         raise KeyError('peek from an empty task queue')
 
-    def _small_key(self, item):
-        if item[2] is type(self)._REMOVED:
-            return [float('inf')] * 2
-        else:
-            return item[:2]
-
-    def _large_key(self, item):
-        if item[2] is type(self)._REMOVED:
-            return [float('-inf')] * 2
-        else:
-            return item[:2]
+    def _find_largest(self):
+        # The largest entry of a heap is always a leaf, unless
+        # leaves are removed entries still waiting to be discarded.
+        queue = self._queue
+        if self._removed_counter == 0:
+            return max(itertools.islice(queue, len(queue) // 2, None))
+        removed = type(self)._REMOVED
+        return max(e for e in queue if e[2] is not removed)
 
     def empty(self):
         '''Return True if queue is empty.'''
-        return (len(self._queue) - self._removed_counter) == 0
+        return not self._entry_finder
 
     def clear(self):
         '''Reset the queue to initial state (remove all tasks).'''
         self._init()
 
+    def __len__(self):
+        return len(self._entry_finder)
+
     def __iter__(self):
-        # FIXME: Returns a generator but creates the whole list first.
-        queue = heapq.nsmallest(len(self._queue), self._queue)
-        for prio, count, task in queue:
-            if task is not type(self)._REMOVED:
+        # Ascending order, entries' counters are unique, tasks aren't compared.
+        removed = type(self)._REMOVED
+        for prio, count, task in sorted(self._queue):
+            if task is not removed:
+                yield (prio, task)
+
+    def __reversed__(self):
+        removed = type(self)._REMOVED
+        for prio, count, task in sorted(self._queue, reverse=True):
+            if task is not removed:
                 yield (prio, task)
 
     # def __copy__(self):
@@ -0,0 +1,145 @@
+"""Monotonic time base with slewed mapping to wall clock time."""
+
+import time
+import threading
+
+
+__all__ = ['TimeBase']
+
+
+_NS = 1_000_000_000
+_NTP_OFFSET_NS = 2208988800 * _NS  # 1900 to 1970, 17 leap years.
+
+
+class TimeBase():
+    '''
+    Physical time source for real time mode.
+
+    Elapsed time is measured with ``time.monotonic_ns()``, the same clock
+    used by threading timeouts, so it's not affected by system time
+    adjustments. OSC timetags are derived from elapsed time through a
+    piecewise linear mapping to wall clock time that is re-estimated at
+    most every `update_period` seconds. Differences between the mapping
+    and the wall clock are corrected by changing the rate of the mapping
+    (slewing) so converted times never jump, unless the difference is
+    greater than `step_threshold` seconds, e.g. after system suspension,
+    in which case the mapping is stepped. All values are kept as integer
+    nanoseconds.
+
+    '''
+
+    update_period = 1.0
+    '''Minimum time in seconds between mapping re-estimations.'''
+    slew_period = 10.0
+    '''Time in seconds in which an offset error is corrected.'''
+    max_slew = 0.0005
+    '''Maximum rate correction as a fraction (500 ppm like ntpd).'''
+    step_threshold = 0.5
+    '''Offset error in seconds from which the mapping is stepped.'''
+
+    _HISTORY = 8
+    _SAMPLES = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._init_ns = time.monotonic_ns()
+        mono, wall = self._sample()
+        elapsed = mono - self._init_ns
+        # Segments are (elapsed_ns, wall_ns, rate_ppb) tuples, newest last.
+        # The tuple is replaced, not mutated, readers don't need the lock.
+        self._segments = ((elapsed, wall, 0),)
+        self._last_sample = (elapsed, wall)
+        self._freq_ppb = 0
+        self._next_update = elapsed + int(self.update_period * _NS)
+
+    def elapsed_ns(self):
+        '''Return physical time since initialization in nanoseconds.'''
+        return time.monotonic_ns() - self._init_ns
+
+    def elapsed_time(self):
+        '''Return physical time since initialization in seconds.'''
+        return (time.monotonic_ns() - self._init_ns) / _NS
+
+    def _sample(self):
+        # Pair monotonic and wall time, keep the tightest reading.
+        best = None
+        for _ in range(self._SAMPLES):
+            t0 = time.monotonic_ns()
+            wall = time.time_ns()
+            t1 = time.monotonic_ns()
+            if best is None or t1 - t0 < best[0]:
+                best = (t1 - t0, (t0 + t1) // 2, wall)
+        return best[1], best[2]
+
+    def _update(self, now):
+        with self._lock:
+            if now < self._next_update:
+                return
+            mono, wall = self._sample()
+            elapsed = mono - self._init_ns
+            mapped = self._forward(self._segments[-1], elapsed)
+            error = wall - mapped
+            prev_elapsed, prev_wall = self._last_sample
+            interval = elapsed - prev_elapsed
+            if abs(error) > self.step_threshold * _NS:
+                segment = (elapsed, wall, self._freq_ppb)
+            else:
+                max_slew = int(self.max_slew * _NS)
+                if interval > 0:
+                    # Exponential average of the measured frequency offset,
+                    # bounded because offset steps are not frequency.
+                    freq = (wall - prev_wall - interval) * _NS // interval
+                    freq = max(-max_slew, min(max_slew, freq))
+                    self._freq_ppb += (freq - self._freq_ppb) // 8
+                # The total rate correction is bounded by max_slew.
+                slew = error * _NS // int(self.slew_period * _NS)
+                rate = max(-max_slew, min(max_slew, self._freq_ppb + slew))
+                segment = (elapsed, mapped, rate)
+            self._segments = (self._segments + (segment,))[-self._HISTORY:]
+            self._last_sample = (elapsed, wall)
+            self._next_update = elapsed + int(self.update_period * _NS)
+
+    @staticmethod
+    def _forward(segment, elapsed):
+        base_elapsed, base_wall, rate = segment
+        delta = elapsed - base_elapsed
+        return base_wall + delta + delta * rate // _NS
+
+    @classmethod
+    def _inverse(cls, segment, wall):
+        # Smallest elapsed that maps to wall or later.
+        base_elapsed, base_wall, rate = segment
+        delta = (wall - base_wall) * _NS // (_NS + rate)
+        for candidate in range(delta - 1, delta + 2):
+            if cls._forward(segment, base_elapsed + candidate) >= wall:
+                return base_elapsed + candidate
+        return base_elapsed + delta + 2
+
+    def elapsed_to_wall_ns(self, elapsed_ns):
+        '''Map elapsed nanoseconds to wall clock nanoseconds since epoch.'''
+        now = time.monotonic_ns() - self._init_ns
+        if now >= self._next_update:
+            self._update(now)
+        segments = self._segments
+        for segment in reversed(segments):
+            if segment[0] <= elapsed_ns:
+                return self._forward(segment, elapsed_ns)
+        return self._forward(segments[0], elapsed_ns)
+
+    def wall_to_elapsed_ns(self, wall_ns):
+        '''Map wall clock nanoseconds since epoch to elapsed nanoseconds.'''
+        segments = self._segments
+        for segment in reversed(segments):
+            if segment[1] <= wall_ns:
+                return self._inverse(segment, wall_ns)
+        return self._inverse(segments[0], wall_ns)
+
+    def elapsed_to_osc(self, elapsed):
+        '''Convert elapsed time in seconds to OSC timetag format.'''
+        ntp = self.elapsed_to_wall_ns(round(elapsed * _NS)) + _NTP_OFFSET_NS
+        return ((ntp << 32) + _NS // 2) // _NS
+
+    def osc_to_elapsed(self, osctime):
+        '''Convert time in OSC timetag format to elapsed time in seconds.'''
+        wall = ((osctime * _NS + (1 << 31)) >> 32) - _NTP_OFFSET_NS
+        return self.wall_to_elapsed_ns(wall) / _NS
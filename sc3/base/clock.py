@@ -2,6 +2,8 @@
 
 import logging
 import threading
+import time
+import bisect
 import weakref
 import typing
 
@@ -12,11 +14,14 @@ from . import functions as fn
 from . import systemactions as sac
 from . import model as mdl
 from . import _taskq as tsq
+from . import _inbound as inb
+from . import _outbound as obd
 from . import stream as stm
 
 
 __all__ = [
-    'SystemClock', 'AppClock', 'Quant', 'TempoClock', 'defer']
+    'SystemClock', 'AppClock', 'Quant', 'TempoClock', 'WakeupPolicy',
+    'defer']
 
 
 _logger = logging.getLogger(__name__)
@@ -30,6 +35,150 @@ class ClockNotRunning(ClockError):
     pass
 
 
+### Wakeup policy and lateness ###
+
+
+class _WakeupPolicy(typing.NamedTuple):
+    guard: float = 0.0
+    mode: str = 'wait'
+
+
+class WakeupPolicy(_WakeupPolicy):
+    '''Wakeup strategy used by real time clocks to wait for the next task.
+
+    With the default `mode` 'wait' the clock thread blocks on a condition
+    variable until the scheduled time, which depending on system load may
+    overshoot by some milliseconds. With modes 'spin' or 'yield' the thread
+    blocks until `guard` seconds before the scheduled time and then keeps
+    checking the time, releasing the lock in between, either busy waiting
+    or yielding the processor with `time.sleep(0)`.
+
+    Parameters
+    ----------
+    guard : float
+        Interval in seconds before the scheduled time from which the
+        clock stops blocking.
+    mode : str
+        One of 'wait', 'spin' or 'yield'.
+
+    Notes
+    -----
+    Spinning increases CPU usage, a guard interval close to the measured
+    lateness (see `LatenessHistogram`) is usually enough.
+    ::
+
+      SystemClock.wakeup_policy = WakeupPolicy(0.002, 'spin')
+
+    '''
+
+    __slots__ = ()
+
+    MODES = ('wait', 'spin', 'yield')
+
+    def __new__(cls, guard=0.0, mode='wait'):
+        if mode not in cls.MODES:
+            raise ValueError(f"invalid wakeup mode '{mode}'")
+        if not isinstance(guard, (int, float)) or isinstance(guard, bool)\
+        or not guard >= 0:
+            raise ValueError(f'invalid wakeup guard interval: {guard!r}')
+        return super().__new__(cls, float(guard), mode)
+
+    @classmethod
+    def _make(cls, iterable):  # Also used by _replace.
+        return cls(*iterable)
+
+    def _wait(self, cond, timeout):
+        # Call with acquired lock, may return before timeout.
+        if self.mode == 'wait':
+            cond.wait(timeout)
+        elif timeout > self.guard:
+            cond.wait(timeout - self.guard)
+        elif self.mode == 'spin':
+            cond.release()
+            cond.acquire()
+        else:  # 'yield'
+            cond.release()
+            try:
+                time.sleep(0)
+            finally:
+                cond.acquire()
+
+
+class LatenessHistogram():
+    '''Histogram of the time in seconds between a task scheduled time and
+    its actual dispatch time.
+
+    The `bins` attribute holds the upper edges of each bin, values greater
+    than the last edge are counted in an extra bin. Values are recorded by
+    the clock thread and can be read at any time.
+
+    '''
+
+    BINS = (
+        0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+        0.002, 0.005, 0.01, 0.02, 0.05)
+
+    def __init__(self, bins=None):
+        self.bins = tuple(bins or self.BINS)
+        self.reset()
+
+    def reset(self):
+        '''Clear all recorded values.'''
+        self._counts = [0] * (len(self.bins) + 1)
+        self._total = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def _add(self, lateness):
+        self._counts[bisect.bisect_left(self.bins, lateness)] += 1
+        self._total += 1
+        self._sum += lateness
+        if lateness > self._max:
+            self._max = lateness
+
+    @property
+    def counts(self):
+        '''List of counts per bin, the last one counts overflows.'''
+        return self._counts[:]
+
+    @property
+    def total(self):
+        '''Number of recorded values.'''
+        return self._total
+
+    @property
+    def mean(self):
+        '''Mean lateness in seconds.'''
+        return self._sum / self._total if self._total else 0.0
+
+    @property
+    def max(self):
+        '''Maximum lateness in seconds.'''
+        return self._max
+
+    def percentile(self, p):
+        '''Return the upper edge of the bin that contains the `p` percentile.
+
+        If the percentile is in the overflow bin return the maximum value.
+
+        '''
+
+        if not self._total:
+            return 0.0
+        limit = self._total * p / 100
+        acc = 0
+        for edge, count in zip(self.bins, self._counts):
+            acc += count
+            if acc >= limit:
+                return edge
+        return self._max
+
+    def __repr__(self):
+        return (
+            f'{type(self).__name__}(total={self._total}, '
+            f'mean={self.mean:.6f}, max={self._max:.6f})')
+
+
 ### Clocks for timing threads ###
 
 
@@ -122,7 +271,7 @@ class MetaSystemClock(MetaClock):
                     _libsc3.main._atexitprio.CLOCKS, cls._sched_stop)
             else:
                 cls._pure_nrt = True
-                cls._elapsed_osc_offset = 0.0
+                cls._timebase = None
 
         clb.ClassLibrary.add(cls, init_func)
 
@@ -145,28 +294,43 @@ class SystemClock(Clock, metaclass=MetaSystemClock):
 
     '''
 
-    _SECONDS_FROM_1900_TO_1970 = 2208988800  # 17 leap years
     _SECONDS_TO_OSC = pow(2, 32) / 1
     _OSC_TO_SECONDS = 1 / pow(2, 32)
 
+    wakeup_policy = WakeupPolicy()
+    '''WakeupPolicy used by the scheduling thread.'''
+
+    lateness = LatenessHistogram()
+    '''LatenessHistogram of dispatched tasks.'''
+
+    inbound = inb.InboundQueue()
+    '''InboundQueue of incoming network messages.'''
+
+    inbound_batch = 256
+    '''Maximum number of incoming messages evaluated between task
+    dispatches.'''
+
     def __new__(cls):
         return cls
 
     @classmethod
     def _sched_init(cls):
-        # _init_time was moved to main because rt/nrt clock switch.
-        offset = (_libsc3.main._init_time + cls._SECONDS_FROM_1900_TO_1970)
-        cls._elapsed_osc_offset = int(offset * cls._SECONDS_TO_OSC)
+        # The time base was moved to main because rt/nrt clock switch.
+        cls._timebase = _libsc3.main._timebase
 
     @classmethod
     def elapsed_time_to_osc(cls, elapsed: float) -> int:  # int64
         '''Convert elapsed time in seconds to OSC timetag format.'''
-        return int(elapsed * cls._SECONDS_TO_OSC) + cls._elapsed_osc_offset
+        if cls._timebase is None:
+            return int(elapsed * cls._SECONDS_TO_OSC)
+        return cls._timebase.elapsed_to_osc(elapsed)
 
     @classmethod
     def osc_to_elapsed_time(cls, osctime: int) -> float:
         '''Convert time in OSC timetag format to elapsed time in seconds.'''
-        return float(osctime - cls._elapsed_osc_offset) * cls._OSC_TO_SECONDS
+        if cls._timebase is None:
+            return float(osctime) * cls._OSC_TO_SECONDS
+        return cls._timebase.osc_to_elapsed(osctime)
 
     @classmethod
     def osc_time(cls) -> int:
@@ -192,31 +356,68 @@ class SystemClock(Clock, metaclass=MetaSystemClock):
             cls._task_queue.clear()
             cls._run_sched = False
             cls._sched_cond.notify_all()
+        cls.inbound._close()
         cls._thread.join()
 
+    @classmethod
+    def _inbound_put(cls, entries):
+        # Called from network threads.
+        cls.inbound._put(entries, cls._inbound_notify)
+        cls._inbound_notify()
+
+    @classmethod
+    def _inbound_notify(cls):
+        with cls._sched_cond:
+            cls._sched_cond.notify_all()
+
+    @classmethod
+    def _inbound_drain(cls, max_count=None):
+        # Call with acquired lock.
+        entries = cls.inbound._drain(max_count)
+        if not entries:
+            return
+        _libsc3.main._update_logical_time(_libsc3.main.elapsed_time())
+        _libsc3.main._in_awake_call = True
+        try:
+            for func, args in entries:
+                try:
+                    func(*args)
+                except Exception:
+                    # Always recover.
+                    _logger.error(
+                        '%s inbound on SystemClock',
+                        func.__qualname__, exc_info=1)
+        finally:
+            obd.flush()
+            _libsc3.main._in_awake_call = False
+
     @classmethod
     def _run(cls):
         cls._run_sched = True
 
         with cls._sched_cond:
             while True:
+                # Incoming messages are not scheduled, at most
+                # inbound_batch are evaluated before due tasks.
+                cls._inbound_drain(cls.inbound_batch)
+
                 # // wait until there is something in scheduler
-                while cls._task_queue.empty():
+                while cls._task_queue.empty() and not cls.inbound:
                     cls._sched_cond.wait()
                     if not cls._run_sched:
                         return
 
                 # // wait until an event is ready
-                now = 0
-                while not cls._task_queue.empty():
-                    now = _libsc3.main.elapsed_time()
+                now = _libsc3.main.elapsed_time()
+                while not cls._task_queue.empty() and not cls.inbound:
                     sched_secs = cls._task_queue.peek()[0]
                     if now >= sched_secs:
                         break
                     # cls._sched_cond.wait(sched_point - now)
-                    cls._sched_cond.wait(sched_secs - now)
+                    cls.wakeup_policy._wait(cls._sched_cond, sched_secs - now)
                     if not cls._run_sched:
                         return
+                    now = _libsc3.main.elapsed_time()
 
                 # // perform all events that are ready
                 while not cls._task_queue.empty()\
@@ -224,6 +425,8 @@ class SystemClock(Clock, metaclass=MetaSystemClock):
                     item = cls._task_queue.pop()
                     sched_time = item[0]
                     task = item[1]
+                    cls.lateness._add(
+                        _libsc3.main.elapsed_time() - sched_time)
                     try:
                         _libsc3.main._update_logical_time(sched_time)
                         _libsc3.main._in_awake_call = True
@@ -241,6 +444,7 @@ class SystemClock(Clock, metaclass=MetaSystemClock):
                             type(task).__name__, task.func.__qualname__,
                             exc_info=1)
                     finally:
+                        obd.flush()
                         _libsc3.main._in_awake_call = False
 
     @classmethod
@@ -328,6 +532,7 @@ class Scheduler():
                 '%s(%s) scheduled on AppClock',
                 type(item).__name__, item.func.__qualname__, exc_info=1)
         finally:
+            obd.flush()
             _libsc3.main._in_awake_call = False
 
     def play(self, task, quant=None):
@@ -666,6 +871,93 @@ class Quant(typing.NamedTuple):
 # */
 
 
+class _TempoClockDispatcher():
+    # Single scheduling thread shared by multiplexed TempoClocks. Clocks
+    # are queued by the time in seconds of their next task and updated
+    # each time the head of their queue or their tempo changes.
+
+    _instance = None
+
+    @classmethod
+    def _get(cls):
+        with _libsc3.main._main_lock:
+            if cls._instance is None or not cls._instance._run_sched:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self._clock_queue = tsq.TaskQueue()
+        self._sched_cond = threading.Condition(_libsc3.main._main_lock)
+        self._run_sched = True
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'{type(self).__name__} id: {id(self)}',
+            daemon=True)
+        self._thread.start()
+        _libsc3.main._atexitq.add(
+            _libsc3.main._atexitprio.CLOCKS + 2, self._stop)
+
+    def _update(self, clock):
+        # Call with acquired lock.
+        if clock._task_queue.empty():
+            self._clock_queue.remove(clock)
+            return
+        if self._clock_queue.empty():
+            prev_time = -1e10
+        else:
+            prev_time = self._clock_queue.peek()[0]
+        self._clock_queue.add(
+            clock.beats2secs(clock._task_queue.peek()[0]), clock)
+        if self._clock_queue.peek()[0] != prev_time:
+            self._sched_cond.notify()
+
+    def _remove(self, clock):
+        # Call with acquired lock.
+        self._clock_queue.remove(clock)
+        self._sched_cond.notify()
+
+    def _stop(self):
+        if not self._run_sched:
+            return
+        with self._sched_cond:
+            self._clock_queue.clear()
+            self._run_sched = False
+            self._sched_cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        with self._sched_cond:
+            while True:
+                # // wait until there is something in scheduler
+                while self._clock_queue.empty():
+                    self._sched_cond.wait()
+                    if not self._run_sched:
+                        return
+
+                # // wait until an event is ready
+                now = 0
+                while not self._clock_queue.empty():
+                    now = _libsc3.main.elapsed_time()
+                    sched_secs = self._clock_queue.peek()[0]
+                    if now >= sched_secs:
+                        break
+                    TempoClock.wakeup_policy._wait(
+                        self._sched_cond, sched_secs - now)
+                    if not self._run_sched:
+                        return
+
+                # // perform all events that are ready
+                while not self._clock_queue.empty()\
+                and now >= self._clock_queue.peek()[0]:
+                    clock = self._clock_queue.pop()[1]
+                    # Beats may round below the queued time in seconds.
+                    elapsed_beats = max(
+                        clock.secs2beats(now), clock._task_queue.peek()[0])
+                    clock._perform(elapsed_beats)
+                    if clock._run_sched:
+                        self._update(clock)
+
+
 class MetaTempoClock(MetaClock):
     def __init__(cls, *_):
         cls._all = weakref.WeakSet()
@@ -754,6 +1046,30 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
     the difference is that sclang updates the base time only once per
     intepreter call which is not possible to do in a Python library.
 
+    By default, in real time mode, each instance runs its own scheduling
+    thread. If the class attribute `multiplexed` is set to True, instances
+    created afterwards are scheduled by a single thread shared by all of
+    them, which makes creating and stopping clocks cheap when many are
+    needed.
+    ::
+
+      TempoClock.multiplexed = True
+      clocks = [TempoClock(tempo) for tempo in (1, 1.5, 2)]
+
+    Each instance records the lateness of its dispatched tasks in the
+    `lateness` attribute, a `LatenessHistogram`, and the wait strategy of
+    the scheduling thread can be changed with `wakeup_policy`.
+
+    '''
+
+    multiplexed = False
+    '''If True new instances share a single scheduling thread.'''
+
+    wakeup_policy = WakeupPolicy()
+    '''WakeupPolicy used by the scheduling thread, can be set per instance.
+
+    Multiplexed clocks use the value of the class attribute.
+
     '''
 
     def __init__(self, tempo=None, beats=None, seconds=None):
@@ -774,11 +1090,20 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
         self._base_bar_beat = 0.0
         self._base_bar = 0.0
         self.permanent = False
+        self.lateness = LatenessHistogram()
         type(self)._all.add(self)
 
-        if _libsc3.main is _libsc3.RtMain:
+        if _libsc3.main is _libsc3.RtMain and type(self).multiplexed:
+            self._pure_nrt = False
+            self._task_queue = tsq.TaskQueue()
+            self._dispatcher = _TempoClockDispatcher._get()
+            self._sched_cond = self._dispatcher._sched_cond
+            self._thread = self._dispatcher._thread
+            self._run_sched = True
+        elif _libsc3.main is _libsc3.RtMain:
             self._pure_nrt = False
             self._task_queue = tsq.TaskQueue()
+            self._dispatcher = None
             self._sched_cond = threading.Condition(_libsc3.main._main_lock)
             self._thread = threading.Thread(
                 target=self._run,
@@ -819,35 +1144,42 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
                     if elapsed_beats >= qpeek[0]:
                         break
                     sched_secs = self.beats2secs(qpeek[0])
-                    self._sched_cond.wait(
+                    self.wakeup_policy._wait(
+                        self._sched_cond,
                         sched_secs - _libsc3.main.elapsed_time())
                     if not self._run_sched:
                         return
 
                 # // perform all events that are ready
-                while not self._task_queue.empty()\
-                and elapsed_beats >= self._task_queue.peek()[0]:
-                    item = self._task_queue.pop()
-                    self._beats = item[0]
-                    task = item[1]
-                    try:
-                        _libsc3.main._update_logical_time(
-                            self.beats2secs(self._beats))
-                        _libsc3.main._in_awake_call = True
-                        delta = task.__awake__(self)
-                        if isinstance(delta, (int, float))\
-                        and not isinstance(delta, bool):
-                            time = self._beats + delta
-                            self._sched_add(time, task)
-                    except stm.StopStream:
-                        pass
-                    except Exception:
-                        _logger.error(
-                            '%s(%s) scheduled on TempoClock id %s',
-                            type(task).__name__, task.func.__qualname__,
-                            id(self), exc_info=1)
-                    finally:
-                        _libsc3.main._in_awake_call = False
+                self._perform(elapsed_beats)
+
+    def _perform(self, elapsed_beats):
+        # Call with acquired lock.
+        while not self._task_queue.empty()\
+        and elapsed_beats >= self._task_queue.peek()[0]:
+            item = self._task_queue.pop()
+            self._beats = item[0]
+            task = item[1]
+            sched_secs = self.beats2secs(self._beats)
+            self.lateness._add(_libsc3.main.elapsed_time() - sched_secs)
+            try:
+                _libsc3.main._update_logical_time(sched_secs)
+                _libsc3.main._in_awake_call = True
+                delta = task.__awake__(self)
+                if isinstance(delta, (int, float))\
+                and not isinstance(delta, bool):
+                    time = self._beats + delta
+                    self._sched_add(time, task)
+            except stm.StopStream:
+                pass
+            except Exception:
+                _logger.error(
+                    '%s(%s) scheduled on TempoClock id %s',
+                    type(task).__name__, task.func.__qualname__,
+                    id(self), exc_info=1)
+            finally:
+                obd.flush()
+                _libsc3.main._in_awake_call = False
 
     def stop(self):
         '''Stop the clock's scheduling thread.
@@ -863,6 +1195,9 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
         if not self.running():
             _logger.debug(f'{self} is not running')
             return
+        if self._dispatcher is not None:
+            self._stop()
+            return
         stop_thread = threading.Thread(
             target=self._stop,
             name=f'{type(self).__name__}.stop_thread id: {id(self)}',
@@ -873,6 +1208,14 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
     def _stop(self):
         if not self._run_sched:
             return
+        if self._dispatcher is not None:
+            with self._sched_cond:
+                self._task_queue.clear()
+                type(self)._all.discard(self)
+                self._run_sched = False
+                self._dispatcher._remove(self)
+                self._thread = None
+            return
         with self._sched_cond:
             self._task_queue.clear()
             type(self)._all.remove(self)
@@ -952,7 +1295,7 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
             return
         else:
             with self._sched_cond:
-                self._sched_cond.notify()  # NOTE: is notify_one in C++.
+                self._notify_sched()
 
     def etempo(self, value):
         '''Set the current tempo at the current `elapsed time`.
@@ -981,7 +1324,7 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
             return
         else:
             with self._sched_cond:
-                self._sched_cond.notify()  # NOTE: is notify_one in C++.
+                self._notify_sched()
 
     @property
     def beat_dur(self):
@@ -1039,7 +1382,7 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
             return
         else:
             with self._sched_cond:
-                self._sched_cond.notify()  # NOTE: is notify_one in C++
+                self._notify_sched()
 
     @property
     def seconds(self):
@@ -1054,7 +1397,14 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
             prev_beat = self._task_queue.peek()[0]
         self._task_queue.add(beats, task)
         if self._task_queue.peek()[0] != prev_beat:
-            self._sched_cond.notify()
+            self._notify_sched()
+
+    def _notify_sched(self):
+        # Call with acquired lock.
+        if self._dispatcher is None:
+            self._sched_cond.notify()  # NOTE: is notify_one in C++.
+        else:
+            self._dispatcher._update(self)
 
     def _sched_add_nrt(self, beats, task):
         ClockTask(beats, self, task, _libsc3.main._clock_scheduler)
@@ -1116,7 +1466,7 @@ class TempoClock(Clock, metaclass=MetaTempoClock):
             with self._sched_cond:
                 while not self._task_queue.empty():
                     self._task_queue.pop()
-                self._sched_cond.notify()  # NOTE: is notify_one in C++.
+                self._notify_sched()
 
     @property
     def beats_per_bar(self):
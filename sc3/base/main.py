@@ -1,6 +1,7 @@
 """Kernel.sc & Main.sc"""
 
 import enum
+import contextvars
 import threading
 import atexit
 import pathlib
@@ -11,6 +12,7 @@ import socket
 
 import sc3
 from . import _taskq as tsq
+from . import _timebase as tmb
 from . import platform as plf
 from . import systemactions as sac
 from . import stream as stm
@@ -19,7 +21,7 @@ from . import _midiinterface as mii
 from . import classlibrary as clb
 from . import clock as clk
 from . import builtins as bi
-from . import responders as rpd
+from . import _replies as rpl
 
 
 __all__ = ['main', 'RtMain', 'NrtMain']
@@ -28,6 +30,10 @@ __all__ = ['main', 'RtMain', 'NrtMain']
 main = None
 '''Default main class global variable set by sc3.init().'''
 
+# SynthDef graph under construction, independent for each thread (and
+# asyncio task) so definitions can be built concurrently.
+_current_synthdef = contextvars.ContextVar('current_synthdef', default=None)
+
 
 ### Kernel.sc ###
 
@@ -55,10 +61,6 @@ class Process(type):
         # Main TimeThread random generator.
         cls._m_rgen = random.Random()
 
-        # SynthDef graph build's global state.
-        cls._current_synthdef = None
-        cls._def_build_lock = threading.Lock()
-
         cls._init_platform()
         atexit.register(cls._shutdown)
 
@@ -101,6 +103,14 @@ class Process(type):
                 cls._atexitq.pop()[1]()
         atexit.unregister(cls._shutdown)
 
+    @property
+    def _current_synthdef(cls):
+        return _current_synthdef.get()
+
+    @_current_synthdef.setter
+    def _current_synthdef(cls, value):
+        _current_synthdef.set(value)
+
     @property
     def _rgen(cls):
         return cls.current_tt._rgen
@@ -115,7 +125,7 @@ class Process(type):
             local_addr = (socket.gethostbyname('localhost'), port)
             if local_addr in osci.OscInterface._local_endpoints:
                 return
-            interface = osci.OscUdpInterface(port)
+            interface = type(cls._osc_interface)(port)
             interface.start()
 
     def close_udp_port(cls, port):
@@ -147,16 +157,18 @@ class Process(type):
 class RtMain(metaclass=Process):
     @classmethod
     def _init(cls):
-        # time.monotonic() will not work, it can stop if the system is
-        # suspended and will need to resync _elapsed_osc_offset which, if done
-        # periodically, generates jitter/jumps in logical time. Also, it can't
-        # avoid the glitches produced by the system's ntp synchronization
-        # because that affects the wake up time of the threads at system level.
-        cls._init_time = time.time()  # time_since_epoch
+        # Elapsed time is monotonic, OSC timetags are mapped to wall clock
+        # time by the time base that slews differences produced by ntp
+        # synchronization or steps if the system was suspended.
+        cls._timebase = tmb.TimeBase()
         cls.main_tt = stm._MainTimeThread()
         cls.current_tt = cls.main_tt
 
-        cls._osc_interface = osci.OscUdpInterface(
+        if sc3.LIB_OSC_BACKEND == 'asyncio':
+            interface_class = osci.OscAsyncioInterface
+        else:
+            interface_class = osci.OscUdpInterface
+        cls._osc_interface = interface_class(
             sc3.LIB_PORT, sc3.LIB_PORT_RANGE)
         cls._osc_interface.start()
 
@@ -182,7 +194,7 @@ class RtMain(metaclass=Process):
     @classmethod
     def elapsed_time(cls):
         '''Physical time since library initialization.'''
-        return time.time() - cls._init_time
+        return cls._timebase.elapsed_time()
 
     @classmethod
     def _update_logical_time(cls, seconds):
@@ -306,20 +318,22 @@ class RtMain(metaclass=Process):
 
         id = bi.uid()
 
-        def resp_func(msg, *_):
-            if msg[1] == id:
-                resp.free()
-                with cls._wait_cond:
-                    cls._wait_cond.notify()
+        def resp_func(*_):
+            with cls._wait_cond:
+                cls._wait_cond.notify()
 
-        resp = rpd.OscFunc(resp_func, '/synced', server.addr)
+        request = rpl.ReplyTable.get(server.addr).add(
+            '/synced', [id], resp_func)
 
         with cls._wait_cond:
             server.addr.send_msg('/sync', id)
             try:
-                return cls._wait_cond.wait(timeout)
+                if cls._wait_cond.wait(timeout):
+                    return True
+                request.cancel()
+                return False
             except KeyboardInterrupt:
-                resp.free()
+                request.cancel()
 
 
 class NrtMain(metaclass=Process):
@@ -6,8 +6,10 @@ import socket
 from . import stream as stm
 from . import main as _libsc3
 from . import builtins as bi
-from . import responders as rpd
 from . import _oscinterface as osci
+from . import _osclib as oli
+from . import _replies as rpl
+from . import _outbound as obd
 
 
 __all__ = ['NetAddr', 'BundleNetAddr']
@@ -52,6 +54,7 @@ class NetAddr():
         self._port = port
         self._target = (hostname, port)
         self._osc_interface = _libsc3.main._osc_interface
+        self._outbound = None
 
     @property
     def hostname(self):
@@ -121,7 +124,10 @@ class NetAddr():
             if self._osc_interface.proto == 'tcp'\
             and self._osc_interface.is_connected:
                 self.disconnect()
-            self._osc_interface = osci.OscTcpInterface(
+            tcp_interface_class = getattr(
+                _libsc3.main._osc_interface, '_tcp_interface_class',
+                osci.OscTcpInterface)
+            self._osc_interface = tcp_interface_class(
                 local_port or self.lang_port() + 1, 100)
             self._osc_interface.bind()
             self._osc_interface.try_connect(
@@ -165,6 +171,10 @@ class NetAddr():
           addr.send_msg('/osc_addr', p1, p2, ...)
         '''
 
+        if self._outbound is not None and self._in_awake_call():
+            self._outbound.add(
+                _libsc3.main.current_tt._seconds, None, [list(args)])
+            return
         self._osc_interface.send_msg(self._target, *args)
 
     def send_bundle(self, time, *elements):
@@ -189,20 +199,167 @@ class NetAddr():
           addr.send_bundle(1, ['/msg', ...], [1.2, ['/bndl', ...], ...], ...)
         '''
 
+        if self._outbound is not None and self._in_awake_call():
+            self._outbound.add(
+                _libsc3.main.current_tt._seconds, time, elements)
+            return
         self._osc_interface.send_bundle(self._target, time, *elements)
 
+    @staticmethod
+    def send_msg_many(targets, *args, threaded=False):
+        '''Send the same OSC message to many addresses.
+
+        The message is encoded once and written to each address.
+
+        Parameters
+        ----------
+        targets: iterable
+            NetAddr objects.
+        *args: items
+            OSC address followed by zero or more values that compose the
+            message.
+        threaded: bool
+            If True the message is written from a sender thread and this
+            method returns after encoding. Messages sent afterwards
+            without the thread may arrive first.
+
+        Notes
+        -----
+        Invoked as::
+
+          NetAddr.send_msg_many([s1.addr, s2.addr], '/osc_addr', p1, ...)
+        '''
+
+        def build(iface, send_time):
+            return iface._build_msg(send_time, list(args))
+
+        def fallback(addr):
+            addr.send_msg(*args)
+
+        NetAddr._send_many(targets, build, fallback, threaded)
+
+    @staticmethod
+    def send_bundle_many(targets, time, *elements, threaded=False):
+        '''Send the same OSC bundle to many addresses.
+
+        The bundle is encoded once with the timetag of `time` latency and
+        written to each address.
+
+        Parameters
+        ----------
+        targets: iterable
+            NetAddr objects.
+        time: int | float | None
+            Latency time from now as in ``send_bundle``.
+        *elements: lists
+            Each element is a list in the form of an OSC message or bundle.
+        threaded: bool
+            If True the bundle is written from a sender thread and this
+            method returns after encoding. Messages sent afterwards
+            without the thread may arrive first.
+        '''
+
+        def build(iface, send_time):
+            return iface._build_bundle(send_time, [time, *elements])
+
+        def fallback(addr):
+            addr.send_bundle(time, *elements)
+
+        NetAddr._send_many(targets, build, fallback, threaded)
+
+    @staticmethod
+    def _send_many(targets, build, fallback, threaded):
+        # Bundle proxies, aggregated addresses and NRT use their own send
+        # methods, the packet is built once for the others.
+        destinations = []
+        for addr in targets:
+            if addr.has_bundle()\
+            or isinstance(addr._osc_interface, osci.OscNrtInterface)\
+            or (addr._outbound is not None and addr._in_awake_call()):
+                fallback(addr)
+            else:
+                destinations.append((addr._osc_interface, addr._target))
+        if not destinations:
+            return
+        send_time = _libsc3.main.current_tt._seconds
+        msg = build(destinations[0][0], send_time)
+        if threaded:
+            obd.FanOutSender.get().put(msg, destinations)
+        else:
+            for iface, target in destinations:
+                iface._send(msg, target)
+
+    @property
+    def aggregate(self):
+        '''Collect messages sent within clock wakeups into bundles.
+
+        When True, messages and bundles sent from a routine or function
+        evaluated by a clock, or from a responder, are not sent right away.
+        They are collected by timetag and sent at the end of the awake call
+        as one bundle per timetag, split into many if larger than a UDP
+        datagram. Messages sent outside clocks are not affected.
+
+        Notes
+        -----
+        Messages sent with ``send_msg`` are executed by the server as an
+        immediate bundle, which could change ordering with respect to other
+        addresses or local endpoints. Set it for server addresses only, as
+        in ``s.addr.aggregate = True``.
+        '''
+
+        return self._outbound is not None
+
+    @aggregate.setter
+    def aggregate(self, value):
+        if value:
+            if self._outbound is None:
+                self._outbound = obd.OutboundBundler(self)
+        elif self._outbound is not None:
+            self._outbound.flush()
+            self._outbound = None
+
+    @property
+    def outbound(self):
+        '''The OutboundBundler of the address or None if not aggregated.'''
+        return self._outbound
+
+    @staticmethod
+    def _in_awake_call():
+        return getattr(_libsc3.main, '_in_awake_call', False)
+
+    def _send_group(self, send_time, time, elements):
+        # Send elements collected by OutboundBundler as sent at send_time
+        # logical time, return the number of datagrams.
+        iface = self._osc_interface
+        if time is None and len(elements) == 1\
+        and isinstance(elements[0][0], str):
+            iface._send(iface._build_msg(send_time, elements[0]), self._target)
+            return 1
+        clumps = self._clump_bundle(send_time, time, elements)
+        for item in clumps:
+            self._send_clump(send_time, time, item)
+            if time is not None:
+                time += 1e-9  # One nanosecond later each.
+        return len(clumps)
+
     def send_clumped_bundles(self, time, *elements):
         '''
         This method is used to send bundles larger than UDP datagram size
         as successive sub-clumped packages.
         '''
-        if self._calc_bndl_dgram_size(elements) > self._MAX_UDP_DGRAM_SIZE:
-            for item in self._clump_bundle(elements):
-                if time is not None:
-                    time += 1e-9  # One nanosecond later each.
-                self.send_bundle(time, *item)
-        else:
+        if isinstance(self._osc_interface, osci.OscNrtInterface):
+            # NRT scores have no datagram size limit.
             self.send_bundle(time, *elements)
+            return
+        send_time = _libsc3.main.current_tt._seconds
+        clumps = self._clump_bundle(send_time, time, elements)
+        if len(clumps) == 1:
+            self._send_clump(send_time, time, clumps[0])
+            return
+        for item in clumps:
+            if time is not None:
+                time += 1e-9  # One nanosecond later each.
+            self._send_clump(send_time, time, item)
 
     def send_status_msg(self):
         '''Send '/status' message to the server.
@@ -237,60 +394,94 @@ class NetAddr():
             self.send_bundle(latency, ['/sync', id])
             yield from condition.wait()
         else:
-            sync_size = self._SYNC_BNDL_DGRAM_SIZE
-            max_size = self._MAX_UDP_DGRAM_SIZE - sync_size
-            if self._calc_bndl_dgram_size(elements) > max_size:
-                for item in self._clump_bundle(elements, max_size):
-                    id = self._make_sync_responder(condition)
-                    item.append(['/sync', id])
-                    self.send_bundle(latency, *item)
-                    if latency is not None:
-                        latency += 1e-9  # One nanosecond later each.
-                    yield from condition.wait()
-            else:
+            send_time = _libsc3.main.current_tt._seconds
+            for item in self._clump_bundle(
+                    send_time, latency, elements, self._SYNC_BNDL_DGRAM_SIZE):
                 id = self._make_sync_responder(condition)
-                elements = list(elements)
-                elements.append(['/sync', id])
-                self.send_bundle(latency, *elements)
+                item.append(self._sync_dgram(id))
+                self._send_clump(send_time, latency, item)
+                if latency is not None:
+                    latency += 1e-9  # One nanosecond later each.
                 yield from condition.wait()
 
-    def _make_sync_responder(self, condition):
-        id = bi.uid()
+    async def async_sync(self, latency=None, elements=None):
+        '''
+        Coroutine counterpart of ``sync``, awaits the server's '/synced'
+        replies. The reply is correlated by id in the address ReplyTable
+        without creating a responder per request.
+
+        Parameters
+        ----------
+        latency: int | float
+            Bundle's latency as in ``send_bundle``.
+        elements: list
+            A list of lists as OSC messages which will be sent
+            before the '/sync' message.
+        '''
 
-        def resp_func(msg, *_):
-            if msg[1] == id:
-                resp.free()
-                condition.test = True
-                condition.signal()
+        table = rpl.ReplyTable.get(self)
+        send_time = _libsc3.main.current_tt._seconds
+        if elements is None:
+            clumps = [[]]
+        else:
+            clumps = self._clump_bundle(
+                send_time, latency, elements, self._SYNC_BNDL_DGRAM_SIZE)
+        for item in clumps:
+            id = bi.uid()
+            future = table.expect('/synced', [id])
+            item.append(self._sync_dgram(id))
+            self._send_clump(send_time, latency, item)
+            if latency is not None:
+                latency += 1e-9  # One nanosecond later each.
+            await future
 
-        resp = rpd.OscFunc(resp_func, '/synced', self)
+    def _make_sync_responder(self, condition):
+        id = bi.uid()
+        rpl.ReplyTable.get(self).add('/synced', [id], condition)
         return id
 
-    def _clump_bundle(self, elements, size=8192):
-        elist = []
+    @staticmethod
+    def _sync_dgram(id):
+        return oli.encode_numeric_message('/sync', [id])
+
+    def _clump_bundle(self, send_time, time, elements, reserve=0):
+        # Encode each element once and pack the datagrams in order into
+        # lists that fit in a bundle of _MAX_UDP_DGRAM_SIZE - reserve bytes.
+        # An element bigger than that is sent alone. Returns at least one,
+        # maybe empty, list.
+        iface = self._osc_interface
+        max_size = self._MAX_UDP_DGRAM_SIZE - reserve
+        res = []
+        clump = []
+        acc_size = 16  # Bundle prefix + Timetag bytes.
         for e in elements:
             if isinstance(e[0], str):
-                elist.append((self._calc_msg_dgram_size(e), e))
-            elif isinstance(e[0], (int, float)):  # bundle
-                elist.append((self._calc_bndl_dgram_size(e[1:]), e))
+                dgram = iface._build_msg(send_time, e).dgram
+            elif isinstance(e[0], (int, float, type(None))):  # bundle
+                iface._check_subtime(time, e[0])
+                dgram = iface._build_bundle(send_time, e).dgram
             else:
                 raise ValueError(
                     'elements within bundles must be valid OSC '
                     f'messages or bundles, received: {e}')
-        res = []
-        clump = []
-        acc_size = 16  # Bundle prefix + Timetag bytes.
-        for s, e in elist:
-            if acc_size + s >= size:
+            size = len(dgram) + 4  # Element size bytes.
+            if clump and acc_size + size > max_size:
                 res.append(clump)
                 clump = []
-                acc_size = 16  # Bundle prefix + Timetag bytes.
-            acc_size += s
-            clump.append(e)
-        if clump:
-            res.append(clump)
+                acc_size = 16
+            acc_size += size
+            clump.append(dgram)
+        res.append(clump)
         return res
 
+    def _send_clump(self, send_time, time, dgrams):
+        if self._outbound is not None:
+            self._outbound.flush()  # Keep order with aggregated messages.
+        iface = self._osc_interface
+        dgram = oli.encode_bundle(
+            iface._get_timetag(send_time, time), dgrams)
+        iface._send(oli.OscBundle(dgram, parse=False), self._target)
+
     def _calc_bndl_dgram_size(self, elements):
         # Argument elements is the content without Timetag: [[], [], ...].
         res = 16  # Bundle prefix + Timetag bytes.
@@ -387,6 +578,13 @@ class BundleNetAddr(NetAddr):
         self._last_sync = len(self._bundle)
         self._bundle.append([self._SYNC_FLAG, latency, elements])
 
+    async def async_sync(self, latency=None, elements=None):
+        if self._send:
+            self._send_last_bundle()
+            await self._save_addr.async_sync(latency, elements)
+        self._last_sync = len(self._bundle)
+        self._bundle.append([self._SYNC_FLAG, latency, elements])
+
     def _send_last_bundle(self):
         time = self._server.latency if self._server else None
         bundle = self._bundle[self._last_sync+1:]
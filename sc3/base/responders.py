@@ -1,6 +1,7 @@
 """ResponseDefs.sc"""
 
 from abc import ABC, abstractmethod
+import heapq
 import logging
 
 from ..synth import server as srv
@@ -9,7 +10,7 @@ from . import systemactions as sac
 from . import model as mdl
 from . import main as _libsc3
 from . import utils as utl
-from ._oscmatch import osc_rematch_pattern as _match_osc_address_pattern
+from . import _oscmatch as omt
 
 
 __all__ = ['OscFunc', 'MidiFunc', 'oscfunc', 'midifunc']
@@ -344,11 +345,94 @@ class OscArgsMatcher(AbstractMessageMatcher):
         fn.value(self.func, msg, time, addr, recv_port)
 
 
+_NOT_INDEXED = object()
+
+
 # // The default dispatchers below store by the 'most significant'
 # // message argument for fast lookup. These are for use when more
 # // than just the 'most significant' argument needs to be matched.
 
 class OscMessageDispatcher(AbstractWrappingDispatcher):
+    # Functions whose arg_template starts with a literal value are indexed
+    # by that value for each path, the others are evaluated in order.
+    # Entries are (sequence number, function) so both groups can be merged
+    # in registration order.
+
+    def __init__(self):
+        super().__init__()
+        self._arg_index = dict()
+        self._unindexed = dict()
+        self._seqs = dict()
+        self._next_seq = 0
+
+    def add(self, func_proxy):
+        super().add(func_proxy)
+        self._seqs[func_proxy] = self._next_seq
+        self._next_seq += 1
+        self._index_func(func_proxy, self.wrapped_funcs[func_proxy])
+
+    def remove(self, func_proxy):
+        func = self.wrapped_funcs[func_proxy]
+        super().remove(func_proxy)
+        self._unindex_func(func_proxy, func)
+        del self._seqs[func_proxy]
+
+    def update_func_for_func_proxy(self, func_proxy):
+        old_func = self.wrapped_funcs[func_proxy]
+        super().update_func_for_func_proxy(func_proxy)
+        self._unindex_func(func_proxy, old_func)
+        self._index_func(func_proxy, self.wrapped_funcs[func_proxy])
+
+    @staticmethod
+    def _index_key(func_proxy):
+        arg_template = getattr(func_proxy, 'arg_template', None)
+        if arg_template is None:
+            return _NOT_INDEXED
+        arg_template = utl.as_list(arg_template)
+        if not arg_template:
+            return _NOT_INDEXED
+        item = arg_template[0]
+        if item is None or callable(item):
+            return _NOT_INDEXED
+        try:
+            hash(item)
+        except TypeError:
+            return _NOT_INDEXED
+        return item
+
+    def _index_func(self, func_proxy, func):
+        arg = self._index_key(func_proxy)
+        entry = (self._seqs[func_proxy], func)
+        for key in self.get_keys_for_func_proxy(func_proxy):
+            if arg is _NOT_INDEXED:
+                entries = self._unindexed.setdefault(key, [])
+            else:
+                entries = self._arg_index.setdefault(
+                    key, dict()).setdefault(arg, [])
+            # Updated functions keep their place.
+            if entries and entries[-1][0] > entry[0]:
+                i = next(i for i, e in enumerate(entries) if e[0] > entry[0])
+                entries.insert(i, entry)
+            else:
+                entries.append(entry)
+
+    def _unindex_func(self, func_proxy, func):
+        arg = self._index_key(func_proxy)
+        entry = (self._seqs[func_proxy], func)
+        for key in self.get_keys_for_func_proxy(func_proxy):
+            if arg is _NOT_INDEXED:
+                entries = self._unindexed[key]
+                entries.remove(entry)
+                if not entries:
+                    del self._unindexed[key]
+            else:
+                index = self._arg_index[key]
+                index[arg].remove(entry)
+                if not index[arg]:
+                    del index[arg]
+                    if not index:
+                        del self._arg_index[key]
+
     def wrap_func(self, func_proxy):
         func = func_proxy.func
         src_id = func_proxy.src_id
@@ -369,9 +453,26 @@ class OscMessageDispatcher(AbstractWrappingDispatcher):
         return [func_proxy.path]
 
     def __call__(self, msg, time, addr, recv_port):
-        if msg[0] in self.active:
-            for func in self.active[msg[0]]:
-                fn.value(func, msg, time, addr, recv_port)
+        path = msg[0]
+        if path not in self.active:
+            return
+        indexed = None
+        index = self._arg_index.get(path)
+        if index is not None and len(msg) > 1:
+            try:
+                indexed = index.get(msg[1])
+            except TypeError:
+                pass  # Unhashable argument, e.g. an array.
+        unindexed = self._unindexed.get(path)
+        if indexed and unindexed:
+            entries = tuple(heapq.merge(indexed, unindexed))
+        else:
+            entries = tuple(indexed or unindexed or ())
+        for _, func in entries:
+            fn.value(func, msg, time, addr, recv_port)
+
+    def matches_address(self, address):
+        return address in self.active
 
     def register(self):
         _libsc3.main.add_osc_recv_func(self) # thisProcess.addOSCRecvFunc(this)
@@ -386,12 +487,31 @@ class OscMessageDispatcher(AbstractWrappingDispatcher):
 
 
 class OscMessagePatternDispatcher(OscMessageDispatcher):
+    # Active paths are indexed by segment, incoming patterns are compiled
+    # once and only the branches that match are visited.
+
+    def __init__(self):
+        super().__init__()
+        self._trie = omt.AddressTrie()
+
+    def add(self, func_proxy):
+        super().add(func_proxy)
+        for key in self.get_keys_for_func_proxy(func_proxy):
+            self._trie.add(key)
+
+    def remove(self, func_proxy):
+        super().remove(func_proxy)
+        for key in self.get_keys_for_func_proxy(func_proxy):
+            if key not in self.active:
+                self._trie.remove(key)
+
     def __call__(self, msg, time, addr, recv_port):
-        pattern = msg[0]
-        for key, funcs in self.active.copy().items():
-            if _match_osc_address_pattern(pattern, key):
-                for func in funcs:
-                    fn.value(func, msg, time, addr, recv_port)
+        for key in list(self._trie.match(msg[0])):
+            for func in self.active.get(key, ()):
+                fn.value(func, msg, time, addr, recv_port)
+
+    def matches_address(self, address):
+        return next(self._trie.match(address), None) is not None
 
     def type_key(self):
         return 'OSC matched'
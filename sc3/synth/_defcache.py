@@ -0,0 +1,353 @@
+"""Persistent cache of compiled SynthDefs."""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import struct
+import sys
+import sysconfig
+import tempfile
+import threading
+import types
+
+import sc3
+
+
+__all__ = ['SynthDefCache']
+
+
+_logger = logging.getLogger(__name__)
+
+_MAGIC = b'SC3DEFC1'
+# Entry header after magic: metadata size, definition size.
+_HEADER = struct.Struct('<II')
+_SUFFIX = 'scdefc'
+
+_SCALARS = (bool, int, float, complex, str, bytes, type(None))
+_STDLIB_DIR = sysconfig.get_paths()['stdlib']
+# Class attributes that don't define behavior.
+_SKIP_ATTRS = {
+    '__dict__', '__weakref__', '__module__', '__doc__', '_abc_impl'}
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _stable_module(name):
+    # Library, builtin and standard library modules are identified by name,
+    # their code is assumed to change only with the versions in the key.
+    top = name.partition('.')[0]
+    if top in ('sc3', 'builtins') or top in sys.builtin_module_names:
+        return True
+    if hasattr(sys, 'stdlib_module_names'):
+        return top in sys.stdlib_module_names
+    path = getattr(sys.modules.get(top), '__file__', None)
+    return path is not None and path.startswith(_STDLIB_DIR)\
+        and 'site-packages' not in path
+
+
+def _plain_instance(obj):
+    # Instances of Python classes whose whole state is in __dict__.
+    cls = type(obj)
+    if not hasattr(obj, '__dict__') or isinstance(obj, type):
+        return False
+    for base in cls.__mro__[:-1]:
+        if base.__module__ == 'builtins' or '__slots__' in vars(base):
+            return False
+    return True
+
+
+class _KeyHasher():
+    # Feeds a canonical representation of the objects that determine the
+    # result of a graph function. Functions are hashed by their code, default
+    # values, annotations, closure contents and the global names they refer
+    # to. Classes and modules outside the library and the standard library
+    # are hashed by their content (class attributes and module source) so
+    # editing a helper changes the key, modules without source file raise
+    # _Uncacheable. Instances are hashed by their class and __dict__, other
+    # objects raise _Uncacheable because their repr may not show all their
+    # state.
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._seen = dict()
+
+    def _write(self, tag, data=b''):
+        if isinstance(data, str):
+            data = data.encode('utf-8', 'surrogatepass')
+        self._hash.update(tag + len(data).to_bytes(8, 'little') + data)
+
+    def feed(self, obj):
+        if isinstance(obj, _SCALARS):
+            self._write(b'S', f'{type(obj).__name__}:{obj!r}')
+        elif isinstance(obj, (list, tuple)):
+            self._write(b'L', type(obj).__name__)
+            for item in obj:
+                self.feed(item)
+            self._write(b'E')
+        elif isinstance(obj, dict):
+            self._write(b'D')
+            for key, value in sorted(obj.items(), key=lambda i: repr(i[0])):
+                self.feed(key)
+                self.feed(value)
+            self._write(b'E')
+        elif isinstance(obj, types.FunctionType):
+            self._feed_function(obj)
+        elif isinstance(obj, types.CodeType):
+            self._feed_code(obj)
+        elif isinstance(obj, types.ModuleType):
+            if _stable_module(obj.__name__):
+                self._write(b'N', obj.__name__)
+            else:
+                self._feed_module(obj)
+        elif isinstance(obj, type):
+            if _stable_module(obj.__module__ or ''):
+                self._write(b'N', f'{obj.__module__}.{obj.__qualname__}')
+            else:
+                self._feed_class(obj)
+        elif isinstance(obj, types.BuiltinFunctionType):
+            module = obj.__module__ or ''
+            self._write(b'N', f'{module}.{obj.__qualname__}')
+        elif isinstance(obj, (classmethod, staticmethod)):
+            self._write(b'M', type(obj).__name__)
+            self.feed(obj.__func__)
+        elif isinstance(obj, property):
+            self._write(b'P')
+            self.feed((obj.fget, obj.fset, obj.fdel))
+        elif _plain_instance(obj):
+            self._feed_instance(obj)
+        else:
+            raise _Uncacheable(
+                f'{type(obj).__qualname__} object has no content to hash')
+
+    def _feed_instance(self, obj):
+        if id(obj) in self._seen:
+            self._write(b'R', str(self._seen[id(obj)]))
+            return
+        self._seen[id(obj)] = len(self._seen)
+        self._write(b'O')
+        self.feed(type(obj))
+        self.feed(vars(obj))
+
+    def _feed_class(self, cls):
+        if id(cls) in self._seen:
+            self._write(b'R', str(self._seen[id(cls)]))
+            return
+        self._seen[id(cls)] = len(self._seen)
+        self._write(b'T', f'{cls.__module__}.{cls.__qualname__}')
+        self.feed(cls.__bases__)
+        for name, value in sorted(vars(cls).items()):
+            if name not in _SKIP_ATTRS:
+                self._write(b'A', name)
+                self.feed(value)
+        self._write(b'E')
+
+    def _feed_module(self, module):
+        path = getattr(module, '__file__', None)
+        if path is None:
+            raise _Uncacheable(f'module {module.__name__} has no source file')
+        try:
+            with open(path, 'rb') as file:
+                self._write(b'U', file.read())
+        except OSError as e:
+            raise _Uncacheable(f'could not read {path}') from e
+
+    def _feed_function(self, func):
+        if id(func) in self._seen:
+            self._write(b'R', str(self._seen[id(func)]))
+            return
+        self._seen[id(func)] = len(self._seen)
+        self._write(b'F')
+        self._feed_code(func.__code__)
+        self.feed(func.__defaults__)
+        self.feed(func.__kwdefaults__)
+        self.feed(func.__annotations__)
+        cells = []
+        for cell in func.__closure__ or ():
+            try:
+                cells.append(cell.cell_contents)
+            except ValueError:  # Empty cell.
+                cells.append(None)
+        self.feed(cells)
+        names = set()
+        self._code_names(func.__code__, names)
+        for name in sorted(names):
+            if name in func.__globals__:
+                self._write(b'G', name)
+                self.feed(func.__globals__[name])
+
+    def _feed_code(self, code):
+        self._write(b'C', code.co_code)
+        self.feed(code.co_names)
+        self.feed(code.co_varnames)
+        self.feed(code.co_freevars)
+        self.feed(code.co_cellvars)
+        self.feed((code.co_argcount, code.co_kwonlyargcount, code.co_flags))
+        self.feed(code.co_consts)
+
+    def _code_names(self, code, names):
+        names.update(code.co_names)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                self._code_names(const, names)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+class SynthDefCache():
+    '''Content addressed disk cache of compiled SynthDefs.
+
+    Each entry stores the binary definition and the description of a
+    SynthDef, it's keyed by a hash of the graph function (code, default
+    values, closure and referenced globals), the constructor parameters
+    and the versions of the library and Python. When the total size of the
+    entries exceeds ``max_size`` the least recently used are removed.
+
+    Parameters
+    ----------
+    dir: str | pathlib.Path
+        Directory of the cache, it's created if doesn't exist.
+    max_size: int
+        Maximum size in bytes of all entries.
+
+    '''
+
+    def __init__(self, dir, max_size=64 * 1024 * 1024):
+        self._dir = pathlib.Path(dir)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._total = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def dir(self):
+        '''Cache directory.'''
+        return self._dir
+
+    @property
+    def size(self):
+        '''Total size of the entries in bytes.'''
+        with self._lock:
+            return self._scan()
+
+    @staticmethod
+    def key(name, func, rates, prepend, variants, metadata, options=()):
+        '''Return the key of a definition as a hex string or None if
+        the graph function refers to objects that can't be hashed by
+        content.'''
+        hasher = _KeyHasher()
+        hasher.feed((sc3.__version__, sys.version_info[:2]))
+        try:
+            hasher.feed((name, rates, prepend, variants, metadata, options))
+            hasher.feed(func)
+        except _Uncacheable as e:
+            _logger.debug(f'SynthDef {name!r} not cacheable: {e}')
+            return None
+        return hasher.hexdigest()
+
+    def _path(self, key):
+        return self._dir / f'{key}.{_SUFFIX}'
+
+    def _scan(self):
+        if self._total is None:
+            self._total = sum(
+                p.stat().st_size for p in self._dir.glob(f'*.{_SUFFIX}'))
+        return self._total
+
+    def get(self, key):
+        '''Return ``(bytes, desc_data)`` for key or None if not found,
+        a None key is counted as a miss.'''
+        if key is None:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            if data[:8] != _MAGIC:
+                raise ValueError('bad magic')
+            md_size, def_size = _HEADER.unpack_from(data, 8)
+            start = 8 + _HEADER.size
+            desc_data = json.loads(data[start:start + md_size])
+            start += md_size
+            def_bytes = data[start:start + def_size]
+            if len(def_bytes) != def_size:
+                raise ValueError('truncated entry')
+            os.utime(path)  # Recently used.
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (ValueError, struct.error) as e:
+            _logger.warning(f'removing invalid cache entry {path}: {e}')
+            with self._lock:
+                self._remove(path)
+                self._total = None
+            self.misses += 1
+            return None
+        self.hits += 1
+        return def_bytes, desc_data
+
+    def put(self, key, def_bytes, desc_data):
+        '''Store the binary definition and the description data.'''
+        md = json.dumps(desc_data).encode()
+        entry = b''.join((
+            _MAGIC, _HEADER.pack(len(md), len(def_bytes)), md, def_bytes))
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self._dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(entry)
+            with self._lock:
+                self._scan()
+                try:
+                    self._total -= path.stat().st_size
+                except FileNotFoundError:
+                    pass
+                os.replace(tmp, path)
+                self._total += len(entry)
+                self._evict()
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _evict(self):
+        if self._total <= self.max_size:
+            return
+        entries = []
+        for path in self._dir.glob(f'*.{_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        self._total = sum(e[1] for e in entries)
+        for _, size, path in entries:
+            if self._total <= self.max_size:
+                break
+            self._remove(path)
+            self._total -= size
+
+    def _remove(self, path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        '''Remove all entries.'''
+        with self._lock:
+            for path in self._dir.glob(f'*.{_SUFFIX}'):
+                self._remove(path)
+            self._total = 0
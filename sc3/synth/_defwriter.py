@@ -0,0 +1,215 @@
+"""Bulk writer for the SynthDef binary format (SCgf)."""
+
+import array
+import functools
+import io
+import logging
+import struct
+import sys
+
+from ..base import utils as utl
+from . import ugen as ugn
+from . import _graphparam as gpp
+from .ugens import inout as iou
+
+
+_logger = logging.getLogger(__name__)
+
+# Magic, file version and number of defs in file.
+_FILE_HEADER = struct.Struct('>4sih')
+# Rate, number of inputs, number of outputs and special index.
+_UGEN_HEADER = struct.Struct('>biih')
+_U8 = struct.Struct('B')
+_I16 = struct.Struct('>h')
+_I32 = struct.Struct('>i')
+_SWAP = sys.byteorder == 'little'
+
+# Default methods, ugens that override them are written by themselves.
+_WRITE_DEF = ugn.SynthObject._write_def
+_WRITE_INPUT_SPEC = ugn.SynthObject._write_input_spec
+_WRITE_OUTPUT_SPECS = ugn.SynthObject._write_output_specs
+_MULTIOUT_WRITE_OUTPUT_SPECS = ugn.MultiOutUGen._write_output_specs
+
+
+@functools.lru_cache(maxsize=None)
+def _ugen_record(name_size, num_specs, num_outputs):
+    # Pascal name, header, input specs and output rates of a ugen.
+    return struct.Struct(
+        f'>B{name_size}sbiih{num_specs}i{num_outputs}b')
+
+
+def _f32_bytes(values):
+    arr = array.array('f', values)
+    if _SWAP:
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _pascal_bytes(string):
+    return _U8.pack(len(string)) + bytes(string, 'ascii')
+
+
+class _DefWriter():
+    # Packs the parts of each definition with precompiled structs, whole
+    # ugen specs with a single record, and float lists as arrays, then
+    # copies them into a single preallocated bytearray.
+    # UGens that override the output specs or the whole ugen spec, and
+    # input types other than ugens and numbers, are written through their
+    # own _write_* methods into a temporary stream.
+
+    def __init__(self):
+        self._parts = []
+        self._size = 0
+
+    def _add(self, data):
+        self._parts.append(data)
+        self._size += len(data)
+
+    def add_header(self, count):
+        self._add(_FILE_HEADER.pack(b'SCgf', 2, count))
+
+    def add_def(self, synthdef):
+        try:
+            self._add_def(synthdef)
+        except Exception as e:
+            raise Exception('SynthDef: could not write def') from e
+
+    def _add_def(self, synthdef):
+        self._add(_pascal_bytes(synthdef._name))
+
+        constants = synthdef._constants
+        arr = [None] * len(constants)
+        for value, index in constants.items():
+            arr[index] = value
+        self._add(_I32.pack(len(arr)))
+        self._add(_f32_bytes(arr))
+
+        # // Controls have been added by the Control UGens.
+        self._add(_I32.pack(len(synthdef._controls)))
+        self._add(_f32_bytes(synthdef._controls))
+
+        allcns_tmp = [
+            x for x in synthdef._all_control_names if x.rate != 'noncontrol']
+        self._add(_I32.pack(len(allcns_tmp)))
+        for item in allcns_tmp:
+            if not isinstance(item, iou.ControlName):
+                raise Exception(
+                    'SynthDef self._all_control_names '
+                    'has non ControlName object')
+            elif not item.name:
+                raise Exception(
+                    'SynthDef self._all_control_names has '
+                    f'empty ControlName object = {item.name}')
+            self._add(_pascal_bytes(item.name))
+            self._add(_I32.pack(item.index))
+
+        self._add(_I32.pack(len(synthdef._children)))
+        for ugen in synthdef._children:
+            self._add_ugen(ugen, synthdef, constants)
+
+        self._add(_I16.pack(len(synthdef._variants)))
+        if synthdef._variants:
+            self._add_variants(synthdef, allcns_tmp)
+
+    def _add_ugen(self, ugen, synthdef, constants):
+        cls = type(ugen)
+        if cls._write_def is not _WRITE_DEF:
+            stream = io.BytesIO()
+            ugen._write_def(stream)
+            self._add(stream.getvalue())
+            return
+        try:
+            name = bytes(ugen.name, 'ascii')
+            rate = ugen._rate_number()
+            values = [
+                len(name), name, rate, ugen._num_inputs(),
+                ugen._num_outputs(), ugen._special_index]
+            # // write wire spec indices.
+            for input in ugen.inputs:
+                if isinstance(input, ugn.SynthObject) and type(
+                        input)._write_input_spec is _WRITE_INPUT_SPEC:
+                    values.append(input._synth_index)
+                    values.append(input._output_index)
+                elif isinstance(input, (int, float)):
+                    try:
+                        const_index = constants[float(input)]
+                    except KeyError as e:
+                        raise Exception(
+                            '_write_input_spec constant not found: '
+                            f'{float(input)}') from e
+                    values.append(-1)
+                    values.append(const_index)
+                else:
+                    stream = io.BytesIO()
+                    gpp.ugen_param(input)._write_input_spec(stream, synthdef)
+                    data = stream.getvalue()
+                    values.extend(struct.unpack(f'>{len(data) // 4}i', data))
+            num_specs = len(values) - 6
+            output_specs = None
+            if cls._write_output_specs is _WRITE_OUTPUT_SPECS:
+                values.append(rate)
+            elif cls._write_output_specs is _MULTIOUT_WRITE_OUTPUT_SPECS:
+                values.extend(o._rate_number() for o in ugen._channels)
+            else:
+                stream = io.BytesIO()
+                ugen._write_output_specs(stream)
+                output_specs = stream.getvalue()
+            record = _ugen_record(
+                len(name), num_specs, len(values) - num_specs - 6)
+            self._add(record.pack(*values))
+            if output_specs:
+                self._add(output_specs)
+        except Exception as e:
+            raise Exception('SynthDef: could not write def') from e
+
+    def _add_variants(self, synthdef, allcns_tmp):
+        allcns_map = {cn.name: cn for cn in allcns_tmp}
+        for varname, pairs in synthdef._variants.items():
+            varname = synthdef._name + '.' + varname
+            if len(varname) > 32:
+                _logger.warning(
+                    f"variant '{varname}' name too log, "
+                    "not writing more variants")
+                return
+
+            varcontrols = synthdef._controls[:]
+            for cname, values in pairs.items():
+                if cname not in allcns_map:
+                    _logger.warning(
+                        f"control '{cname}' of variant '{varname}' "
+                        "not found, not writing more variants")
+                    return
+
+                cn = allcns_map[cname]
+                values = utl.as_list(values)
+                if len(values) > len(utl.as_list(cn.default_value)):
+                    _logger.warning(
+                        f"control: '{cname}' of variant: '{varname}' "
+                        "size mismatch, not writing more variants")
+                    return
+
+                index = cn.index
+                for i, val in enumerate(values):
+                    varcontrols[index + i] = val
+
+            self._add(_pascal_bytes(varname))
+            self._add(_f32_bytes(varcontrols))
+
+    def pack(self):
+        buf = bytearray(self._size)
+        offset = 0
+        for data in self._parts:
+            size = len(data)
+            buf[offset:offset + size] = data
+            offset += size
+        return buf
+
+
+def write_def_list(lst):
+    '''Return a bytearray with the binary definition of the SynthDefs
+    in lst, same as writing them one by one with SynthDef._write_def.'''
+    writer = _DefWriter()
+    writer.add_header(len(lst))
+    for synthdef in lst:
+        writer.add_def(synthdef)
+    return writer.pack()
@@ -0,0 +1,451 @@
+"""Paced bulk transfer of values to and from the server."""
+
+import array
+import logging
+import socket
+import sys
+import threading
+import time
+
+from ..base import main as _libsc3
+from ..base import builtins as bi
+from ..base import _osclib as oli
+from ..base import _replies as rpl
+
+
+__all__ = ['BulkTransfer', 'BulkDownload']
+
+
+_logger = logging.getLogger(__name__)
+
+
+class BulkTransfer():
+    '''
+    Transfer of a large list of values with '/b_setn' or '/c_setn'
+    commands paced by the server acknowledgements.
+
+    Values are split in chunks as large as the datagram limit of the
+    address allows. Each chunk is sent in a bundle followed by a '/sync'
+    message and at most `window` chunks are waiting for their '/synced'
+    reply, so a lost datagram is detected by its missing reply and the
+    chunk is sent again after `timeout`. The send buffer of the socket is
+    enlarged to hold a window if needed.
+
+    Parameters
+    ----------
+    addr: NetAddr
+        Server address.
+    cmd: str
+        Either '/b_setn' or '/c_setn'.
+    prefix: list
+        Arguments before the start index of each chunk, e.g. the bufnum
+        of '/b_setn'.
+    values: list | array.array
+        Values to send, are cast to 32 bit floats.
+    start: int
+        Start index of the first value.
+    window: int
+        Maximum number of chunks waiting for acknowledgement.
+    timeout: float
+        Time in seconds to wait for the acknowledgement of a chunk.
+    retries: int
+        Maximum number of times a chunk is sent again.
+    progress: function
+        Optional function evaluated with the transfer object after each
+        acknowledgement.
+    action: function
+        Optional function evaluated with the transfer object when all
+        values were acknowledged.
+    on_failure: function
+        Optional function evaluated with the transfer object if a chunk
+        exceeded the number of retries.
+    max_dgram_size: int
+        Maximum datagram size, defaults to the limit of the address.
+
+    '''
+
+    _headers = dict()
+
+    def __init__(self, addr, cmd, prefix, values, start=0, window=16,
+                 timeout=0.5, retries=5, progress=None, action=None,
+                 on_failure=None, max_dgram_size=None):
+        self._addr = addr
+        self._cmd = cmd
+        self._prefix = list(prefix)
+        self._start = start
+        self.window = max(1, window)
+        self.timeout = timeout
+        self.retries = retries
+        self.progress = progress
+        self.action = action
+        self.on_failure = on_failure
+        data = array.array('f', values)  # Type check & cast.
+        self._size = len(data)
+        if sys.byteorder == 'little':
+            data.byteswap()
+        self._data = data.tobytes()
+        self._chunk_size = self.max_values(
+            cmd, len(self._prefix),
+            max_dgram_size or addr._MAX_UDP_DGRAM_SIZE)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._in_flight = dict()  # Chunk start: (request, retries).
+        self._acknowledged = 0
+        self.retransmits = 0
+        self._start_time = None
+        self._end_time = None
+        self._failed = False
+
+    @staticmethod
+    def can_pace(addr):
+        '''Return True if a transfer can be paced through addr, it must
+        have a transport protocol and not be collecting a bundle.'''
+        return addr.proto is not None and not addr.has_bundle()
+
+    @classmethod
+    def max_values(cls, cmd, prefix_size, dgram_size):
+        '''Return the number of values of the largest chunk whose bundle
+        fits in dgram_size bytes.'''
+        # Bundle prefix, timetag and two element sizes plus the sync message.
+        available = dgram_size - 16 - 8 - 16
+        address = len(oli._address_dgram(cmd))
+        ints = prefix_size + 2
+        n = (available - address - 4 * ints) // 5
+        while n > 0:
+            tags = (ints + n + 2 + 3) // 4 * 4  # Comma and null, pad4.
+            if address + tags + 4 * ints + 4 * n <= available:
+                return n
+            n -= 1
+        raise ValueError(f'dgram_size {dgram_size} is too small')
+
+    @property
+    def size(self):
+        '''Number of values to transfer.'''
+        return self._size
+
+    @property
+    def acknowledged(self):
+        '''Number of values acknowledged by the server.'''
+        return self._acknowledged
+
+    @property
+    def done(self):
+        '''True if all values were acknowledged.'''
+        return self._acknowledged == self._size
+
+    @property
+    def failed(self):
+        '''True if a chunk exceeded the number of retries.'''
+        return self._failed
+
+    @property
+    def elapsed_time(self):
+        '''Seconds since the transfer started.'''
+        if self._start_time is None:
+            return 0.0
+        end = self._end_time or time.perf_counter()
+        return end - self._start_time
+
+    @property
+    def throughput(self):
+        '''Acknowledged values per second.'''
+        elapsed = self.elapsed_time
+        return self._acknowledged / elapsed if elapsed > 0 else 0.0
+
+    def start(self):
+        '''Start sending the first window of chunks.'''
+        if self._start_time is not None:
+            return self
+        self._start_time = time.perf_counter()
+        if not self._size:
+            self._end_time = self._start_time
+            if self.action is not None:
+                self.action(self)
+            return self
+        self._tune_send_buffer()
+        # Replies are processed in SystemClock with the main lock.
+        with _libsc3.main._main_lock:
+            with self._lock:
+                while len(self._in_flight) < self.window\
+                and self._next < self._size:
+                    self._send_chunk(self._next, 0)
+                    self._next += self._chunk_size
+        return self
+
+    def _tune_send_buffer(self):
+        sock = self._addr._osc_interface.socket
+        if self._addr.proto != 'udp' or sock is None:
+            return
+        wanted = self.window * (self._chunk_size * 4 + 256)
+        try:
+            if sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) < wanted:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, wanted)
+        except OSError:
+            pass
+
+    def _encode_chunk(self, start):
+        n = min(self._chunk_size, self._size - start)
+        key = (self._cmd, len(self._prefix), n)
+        try:
+            header = self._headers[key]
+        except KeyError:
+            header = self._headers[key] = oli._header_dgram(
+                self._cmd, ',' + 'i' * (len(self._prefix) + 2) + 'f' * n)
+            if len(self._headers) > 64:
+                self._headers.clear()
+        ints = array.array('i', [*self._prefix, self._start + start, n])
+        if sys.byteorder == 'little':
+            ints.byteswap()
+        return b''.join((
+            header, ints.tobytes(), self._data[start * 4:(start + n) * 4]))
+
+    def _send_chunk(self, start, retries):
+        # Call with acquired lock.
+        id = bi.uid()
+        request = rpl.ReplyTable.get(self._addr).add(
+            '/synced', [id], lambda *_: self._acknowledge(start),
+            self.timeout, lambda: self._expire(start))
+        self._in_flight[start] = (request, retries)
+        self._addr._send_clump(
+            0.0, None, [self._encode_chunk(start), self._addr._sync_dgram(id)])
+
+    def _acknowledge(self, start):
+        with self._lock:
+            if self._in_flight.pop(start, None) is None:
+                return
+            self._acknowledged += min(self._chunk_size, self._size - start)
+            if self._next < self._size:
+                self._send_chunk(self._next, 0)
+                self._next += self._chunk_size
+            finished = not self._in_flight
+            if finished:
+                self._end_time = time.perf_counter()
+        if self.progress is not None:
+            self.progress(self)
+        if finished and self.action is not None:
+            self.action(self)
+
+    def _expire(self, start):
+        with self._lock:
+            try:
+                _, retries = self._in_flight[start]
+            except KeyError:
+                return
+            if retries < self.retries:
+                self.retransmits += 1
+                self._send_chunk(start, retries + 1)
+                return
+            self._failed = True
+            for request, _ in self._in_flight.values():
+                request.cancel()
+            self._in_flight.clear()
+            self._next = self._size
+            self._end_time = time.perf_counter()
+        _logger.warning(
+            'bulk transfer of %s to %s failed at index %s',
+            self._cmd, self._addr, self._start + start)
+        if self.on_failure is not None:
+            self.on_failure(self)
+
+
+class BulkDownload():
+    '''
+    Pipelined download of a large range of values with '/b_getn' or
+    '/c_getn' commands.
+
+    The result array is allocated before the requests are sent. At most
+    `window` requests of `chunk_size` values are waiting for their reply,
+    each reply is correlated by its start index and its values are written
+    in place, so replies can arrive in any order. A request whose reply
+    doesn't arrive within `timeout`, or doesn't have the requested number
+    of values, is sent again.
+
+    Parameters
+    ----------
+    addr: NetAddr
+        Server address.
+    cmd: str
+        Either '/b_getn' or '/c_getn'.
+    prefix: list
+        Arguments before the start index of each request, e.g. the bufnum
+        of '/b_getn'.
+    start: int
+        Start index of the first value.
+    count: int
+        Number of values.
+    chunk_size: int
+        Number of values requested by each message.
+    window: int
+        Maximum number of requests waiting for their reply.
+    timeout: float
+        Time in seconds to wait for the reply of a request.
+    retries: int
+        Maximum number of times a request is sent again.
+    progress: function
+        Optional function evaluated with the download object after each
+        reply.
+    action: function
+        Optional function evaluated with the download object when all
+        values were received.
+    on_failure: function
+        Optional function evaluated with the download object if a request
+        exceeded the number of retries.
+
+    '''
+
+    _reply_paths = {'/b_getn': '/b_setn', '/c_getn': '/c_setn'}
+
+    def __init__(self, addr, cmd, prefix, start, count, chunk_size=1633,
+                 window=16, timeout=0.5, retries=5, progress=None,
+                 action=None, on_failure=None):
+        self._addr = addr
+        self._cmd = cmd
+        self._reply_path = self._reply_paths[cmd]
+        self._prefix = list(prefix)
+        self._offset = len(self._prefix) + 3  # Path, prefix, start, count.
+        self._start = start
+        self._count = count
+        self._chunk_size = max(1, chunk_size)
+        self.window = max(1, window)
+        self.timeout = timeout
+        self.retries = retries
+        self.progress = progress
+        self.action = action
+        self.on_failure = on_failure
+        self._data = array.array('f', bytes(4 * count))
+        self._lock = threading.Lock()
+        self._next = 0
+        self._in_flight = dict()  # Chunk start: (request, retries, count).
+        self._received = 0
+        self.retransmits = 0
+        self._start_time = None
+        self._end_time = None
+        self._failed = False
+
+    @property
+    def data(self):
+        '''Result array, its values are valid when done.'''
+        return self._data
+
+    @property
+    def result(self):
+        '''A memoryview of the result array.'''
+        return memoryview(self._data)
+
+    @property
+    def size(self):
+        '''Number of values to receive.'''
+        return self._count
+
+    @property
+    def received(self):
+        '''Number of values received.'''
+        return self._received
+
+    @property
+    def done(self):
+        '''True if all values were received.'''
+        return self._received == self._count
+
+    @property
+    def failed(self):
+        '''True if a request exceeded the number of retries.'''
+        return self._failed
+
+    @property
+    def elapsed_time(self):
+        '''Seconds since the download started.'''
+        if self._start_time is None:
+            return 0.0
+        end = self._end_time or time.perf_counter()
+        return end - self._start_time
+
+    @property
+    def throughput(self):
+        '''Received values per second.'''
+        elapsed = self.elapsed_time
+        return self._received / elapsed if elapsed > 0 else 0.0
+
+    def start(self):
+        '''Start sending the first window of requests.'''
+        if self._start_time is not None:
+            return self
+        self._start_time = time.perf_counter()
+        if not self._count:
+            self._end_time = self._start_time
+            if self.action is not None:
+                self.action(self)
+            return self
+        # Replies are processed in SystemClock with the main lock.
+        with _libsc3.main._main_lock:
+            with self._lock:
+                while len(self._in_flight) < self.window\
+                and self._next < self._count:
+                    self._send_request(self._next, 0)
+                    self._next += self._chunk_size
+        return self
+
+    def _send_request(self, start, retries):
+        # Call with acquired lock.
+        n = min(self._chunk_size, self._count - start)
+        index = self._start + start
+        request = rpl.ReplyTable.get(self._addr).add(
+            self._reply_path, [*self._prefix, index],
+            lambda msg, *_: self._receive(start, msg),
+            self.timeout, lambda: self._retry(start))
+        self._in_flight[start] = (request, retries, n)
+        self._addr.send_msg(self._cmd, *self._prefix, index, n)
+
+    def _receive(self, start, msg):
+        values = msg[self._offset:]
+        with self._lock:
+            try:
+                _, _, n = self._in_flight[start]
+            except KeyError:
+                return
+            # The reply must echo the requested count and have its values.
+            valid = len(values) == n and msg[self._offset - 1] == n
+            if valid:
+                del self._in_flight[start]
+                self._data[start:start + n] = array.array('f', values)
+                self._received += n
+                if self._next < self._count:
+                    self._send_request(self._next, 0)
+                    self._next += self._chunk_size
+                finished = not self._in_flight
+                if finished:
+                    self._end_time = time.perf_counter()
+        if not valid:
+            _logger.warning(
+                'bulk download of %s from %s received %s values '
+                'at index %s, %s requested',
+                self._cmd, self._addr, len(values), self._start + start, n)
+            self._retry(start)
+            return
+        if self.progress is not None:
+            self.progress(self)
+        if finished and self.action is not None:
+            self.action(self)
+
+    def _retry(self, start):
+        # Request the chunk again or fail if out of retries.
+        with self._lock:
+            try:
+                _, retries, _ = self._in_flight[start]
+            except KeyError:
+                return
+            if retries < self.retries:
+                self.retransmits += 1
+                self._send_request(start, retries + 1)
+                return
+            self._failed = True
+            for request, _, _ in self._in_flight.values():
+                request.cancel()
+            self._in_flight.clear()
+            self._next = self._count
+            self._end_time = time.perf_counter()
+        _logger.warning(
+            'bulk download of %s from %s failed at index %s',
+            self._cmd, self._addr, self._start + start)
+        if self.on_failure is not None:
+            self.on_failure(self)
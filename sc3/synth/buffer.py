@@ -50,17 +50,19 @@ import pathlib
 import time
 import array
 import uuid
+import warnings
 
 from ..base import responders as rpd
+from ..base import _replies as rpl
 from ..base import model as mdl
 from ..base import functions as fn
 from ..base import platform as plf
 from ..base import builtins as bi
 from ..base import utils as utl
 from ..base import stream as stm
-from ..base import clock as clk
 from . import _graphparam as gpp
 from . import server as srv
+from . import _transfer as trf
 
 
 __all__ = ['Buffer']
@@ -397,7 +399,7 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
         '''
 
         server = server or srv.Server.default
-        lst = list(array.array('f', lst))  # Type check & cast.
+        lst = array.array('f', lst)  # Type check & cast.
         buffer = cls(
             bi.ceil(len(lst) / channels), channels, server, alloc=False)
         # It was forkIfNeeded, can't be implemented in Python because
@@ -660,9 +662,8 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
         def resp_func(msg, *_):
             fn.value(action, *msg)
 
-        rpd.OscFunc(
-            resp_func, '/b_info', self._server.addr,
-            arg_template=[self._bufnum]).one_shot()
+        rpl.ReplyTable.get(self._server.addr).add(
+            '/b_info', [self._bufnum], resp_func)
         self._server.addr.send_msg('/b_query', self._bufnum)
 
     def update_info(self, action=None):
@@ -734,7 +735,7 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
             _logger.warning("cannot call 'load' with a non-local Server")
 
     def send_list(self, lst, start_frame=0, wait=-1, action=None):  # Was send_collection
-        lst = list(array.array('f', lst))  # Type check & cast.
+        lst = array.array('f', lst)  # Type check & cast.
         size = len(lst)
         if size > (self._frames - start_frame) * self._channels:
             _logger.warning('lst is larger than available number of frames')
@@ -742,6 +743,15 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
             lst, size, start_frame * self._channels, float(wait), action)
 
     def _stream_list(self, lst, size, start_frame, wait, action):  # Was streamCollection
+        addr = self._server.addr
+        if wait < 0 and trf.BulkTransfer.can_pace(addr):
+            # Chunks are paced by the server acknowledgements
+            # instead of a roundtrip after each one.
+            trf.BulkTransfer(
+                addr, '/b_setn', [self._bufnum], lst, start_frame,
+                action=lambda _: fn.value(action, self)).start()
+            return
+
         def stream_func():
             # // wait = -1 allows an OSC roundtrip between packets.
             # // wait = 0 might not be safe in a high traffic situation.
@@ -773,9 +783,8 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
             # // which is at index 3.
             fn.value(action, msg[3])
 
-        rpd.OscFunc(
-            resp_func, '/b_set', self._server.addr,
-            arg_template=[self._bufnum, index]).one_shot()
+        rpl.ReplyTable.get(self._server.addr).add(
+            '/b_set', [self._bufnum, index], resp_func)
 
         self._server.addr.send_msg('/b_get', self._bufnum, index)
 
@@ -789,12 +798,39 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
             # // We want the sample values, which start at index 4.
             fn.value(action, msg[4:])
 
-        rpd.OscFunc(
-            resp_func, '/b_setn', self._server.addr,
-            arg_template=[self._bufnum, index]).one_shot()
+        rpl.ReplyTable.get(self._server.addr).add(
+            '/b_setn', [self._bufnum, index], resp_func)
 
         self._server.addr.send_msg('/b_getn', self._bufnum, index, count)
 
+    async def aget(self, index):
+        '''Coroutine counterpart of ``get``, return the sample value
+        at index.
+
+        '''
+
+        if self._bufnum is None:
+            raise BufferAlreadyFreed('aget')
+        future = rpl.ReplyTable.get(self._server.addr).expect(
+            '/b_set', [self._bufnum, index])
+        self._server.addr.send_msg('/b_get', self._bufnum, index)
+        # // [/b_set, bufnum, index, value].
+        return (await future)[3]
+
+    async def agetn(self, index, count):
+        '''Coroutine counterpart of ``getn``, return a list of
+        count sample values from index.
+
+        '''
+
+        if self._bufnum is None:
+            raise BufferAlreadyFreed('agetn')
+        future = rpl.ReplyTable.get(self._server.addr).expect(
+            '/b_setn', [self._bufnum, index])
+        self._server.addr.send_msg('/b_getn', self._bufnum, index, count)
+        # // [/b_setn, bufnum, starting index, length, ...sample values].
+        return (await future)[4:]
+
     # // these next two get the data and put it in a float array
     # // which is passed to action
 
@@ -813,53 +849,107 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
 
         stm.Routine.run(load_fork)
 
-    def get_to_list(self, action, index=0, count=None, wait=0.01, timeout=3):
-        # // risky without wait
-        max_udp_size = 1633  # // Max size for getn under udp.
-        pos = index = int(index)
-        if count is None:
-            count = int(self._frames * self._channels)
-        array = []  # [0.0] * count
-        ref_count = int(bi.roundup(count / max_udp_size))
-        count += pos
-        done = False
+    def get_to_list(self, action, index=0, count=None, wait=None, timeout=3,
+                    on_failure=None):
+        '''
+        Download the buffer samples into a list.
 
-        def resp_func(msg, *_):
-            nonlocal done, ref_count
-            if msg[1] == self._bufnum:
-                array.extend(msg[4:])
-                ref_count -= 1
-                if ref_count <= 0:
-                    done = True
-                    resp.free()  # *** BUG: clear() ???
-                    fn.value(action, array)  #, self)  # *** NOTE: CHANGEG: because get & getn don't pass self to action, only data
-
-        resp = rpd.OscFunc(resp_func, '/b_setn', self._server.addr)
-
-        def getn_func():
-            nonlocal pos
-            while pos < count:
-                getsize = bi.min(max_udp_size, count - pos)
-                self._server.addr.send_msg(
-                    '/b_getn', self._bufnum, pos, getsize)
-                pos += getsize
-                if wait >= 0:
-                    yield wait
-                else:
-                    yield from self._server.sync()
+        Parameters
+        ----------
+        action: function
+            A function to be evaluated with the list of values as argument.
+        index: int
+            Sample index to start from.
+        count: int
+            Number of samples, defaults to the rest of the buffer.
+        wait: float
+            Deprecated, has no effect. The values are requested by a
+            window of concurrent '/b_getn' messages paced by the replies.
+        timeout: float
+            Time in seconds to wait for the reply of each request before
+            it's sent again.
+        on_failure: function
+            Optional function evaluated with the buffer as argument if
+            the download fails, by default a warning is logged.
+
+        Returns
+        -------
+        BulkDownload
+            The download object, see `get_to_array`.
+        '''
+
+        if wait is not None:
+            warnings.warn(
+                'get_to_list wait parameter is deprecated and has no effect',
+                DeprecationWarning, stacklevel=2)
+
+        def list_action(lst):
+            fn.value(action, lst.tolist())
 
-        stm.Routine.run(getn_func)
+        return self._download(
+            'get_to_list', list_action, index, count, timeout, on_failure)
+
+    def get_to_array(self, action, index=0, count=None, timeout=3,
+                     on_failure=None):
+        '''
+        Download the buffer samples into an array.
 
-        # // Lose the responder if the network choked.
-        def timeout_func():
-            if not done:
-                resp.free()
+        Parameters
+        ----------
+        action: function
+            A function to be evaluated with a memoryview of an
+            ``array('f')`` with the values as argument.
+        index: int
+            Sample index to start from.
+        count: int
+            Number of samples, defaults to the rest of the buffer.
+        timeout: float
+            Time in seconds to wait for the reply of each request before
+            it's sent again.
+        on_failure: function
+            Optional function evaluated with the buffer as argument if
+            the download fails, by default a warning is logged.
+
+        Returns
+        -------
+        BulkDownload
+            The download object.
+        '''
+
+        return self._download(
+            'get_to_array', action, index, count, timeout, on_failure)
+
+    def _download(self, method, action, index, count, timeout, on_failure):
+        if self._bufnum is None:
+            raise BufferAlreadyFreed(method)
+        index = int(index)
+        size = None
+        if self._frames is not None:
+            size = int(self._frames * self._channels)
+        if count is None:
+            if size is None:
+                raise ValueError(f'{method}: unknown buffer size, set count')
+            count = size - index
+        count = int(count)
+        if index < 0 or count < 0\
+        or size is not None and index + count > size:
+            raise ValueError(
+                f'{method}: index {index} and count {count} '
+                f'out of range for buffer size {size}')
+
+        def failure(_):
+            if on_failure is None:
                 # Can fail for many reasons not only networking time,
-                # for example: 'FAILURE IN SERVER /b_getn index out of range'
-                # if the buffer wasn't allocated.
-                _logger.warning('get_to_list failed')
+                # for example: 'FAILURE IN SERVER /b_getn index out of
+                # range' if the buffer wasn't allocated.
+                _logger.warning(f'{method} failed')
+            else:
+                fn.value(on_failure, self)
 
-        clk.SystemClock.sched(timeout, timeout_func)
+        return trf.BulkDownload(
+            self._server.addr, '/b_getn', [self._bufnum], index, count,
+            timeout=timeout, action=lambda d: fn.value(action, d.result),
+            on_failure=failure).start()
 
 
     ### Gen commands ###
@@ -879,9 +969,8 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
                 # // [/done, /b_gen, bufnum]
                 fn.value(action, self)
 
-            rpd.OscFunc(
-                resp_func, '/done', self._server.addr,
-                arg_template=['/b_gen', self._bufnum]).one_shot()
+            rpl.ReplyTable.get(self._server.addr).add(
+                '/done', ['/b_gen', self._bufnum], resp_func)
 
     def _gen_oflags(self, normalize, as_wavetable, clear_first):
         flags = (int(normalize), int(as_wavetable) * 2, int(clear_first) * 4)
@@ -946,9 +1035,8 @@ class Buffer(gpp.UGenParameter, gpp.NodeParameter):
                 # // [/done, /b_gen, bufnum]
                 fn.value(action, self, dst_buffer)
 
-            rpd.OscFunc(
-                resp_func, '/done', self._server.addr,
-                arg_template=['/b_gen', self._bufnum]).one_shot()
+            rpl.ReplyTable.get(self._server.addr).add(
+                '/done', ['/b_gen', self._bufnum], resp_func)
 
         self._server.addr.send_msg(
             '/b_gen', dst_buffer.bufnum, 'copy', dst_start,
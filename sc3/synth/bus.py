@@ -4,8 +4,10 @@ import logging
 
 from . import _graphparam as gpp
 from . import server as srv
+from . import _transfer as trf
 from ..base import utils as utl
-from ..base import responders as rpd
+from ..base import functions as fn
+from ..base import _replies as rpl
 
 
 __all__ = ['AudioBus', 'ControlBus']
@@ -268,7 +270,7 @@ class ControlBus(Bus):
             *[[self._index + i, v] for i, v in enumerate(values)]]
         self._server.addr.send_msg(*utl.flat(msg))
 
-    def setn(self, values):
+    def setn(self, values, on_failure=None):
         '''Set the list of ``values`` to consecutive channels.
 
         This method uses '/c_setn' command that sets a list of values to a
@@ -276,12 +278,24 @@ class ControlBus(Bus):
         larger than the number of channels or it will override values set by
         other bus objects.
 
+        Values that don't fit in a datagram are sent in chunks paced by
+        the server acknowledgements, if a chunk can't be sent the optional
+        ``on_failure`` function is evaluated with the bus as argument.
+
         '''
 
         if self._index is None:
             raise BusAlreadyFreed('setn')
-        self._server.addr.send_msg(
-            '/c_setn', self._index, len(values), *values)
+        addr = self._server.addr
+        if trf.BulkTransfer.can_pace(addr)\
+        and len(values) > trf.BulkTransfer.max_values(
+                '/c_setn', 0, addr._MAX_UDP_DGRAM_SIZE):
+            # Larger than a datagram.
+            trf.BulkTransfer(
+                addr, '/c_setn', [], values, self._index,
+                on_failure=lambda _: fn.value(on_failure, self)).start()
+            return
+        addr.send_msg('/c_setn', self._index, len(values), *values)
 
     def set_at(self, offset, *values):
         '''Set the value of consecutive buses using '/c_set' command.
@@ -374,9 +388,8 @@ class ControlBus(Bus):
                 # // We want "value," which is at index 2.
                 action(msg[2])
 
-            rpd.OscFunc(
-                get_func, '/c_set', self._server.addr,
-                arg_template=[self._index]).one_shot()
+            rpl.ReplyTable.get(self._server.addr).add(
+                '/c_set', [self._index], get_func)
             self._server.addr.send_msg('/c_get', self._index)
         else:
             self.getn(self._channels, action)
@@ -405,16 +418,50 @@ class ControlBus(Bus):
             action = default_action_func
 
         def getn_func(msg, *_):
-            # // The response is of the form [/c_set, index, count, ...values].
+            # // The response is of the form [/c_setn, index, count, ...values].
             # // We want the values, which are at indexes 3 and above.
             action(msg[3:])
 
-        rpd.OscFunc(
-            getn_func, '/c_setn', self._server.addr,
-            arg_template=[self._index]).one_shot()
+        rpl.ReplyTable.get(self._server.addr).add(
+            '/c_setn', [self._index], getn_func)
+        if count is None:
+            count = self._channels
+        self._server.addr.send_msg('/c_getn', self._index, count)
+
+    async def aget(self):
+        '''Coroutine counterpart of ``get``, return the bus current value.
+
+        Multichannel buses return a list of values as ``agetn``.
+
+        '''
+
+        if self._index is None:
+            raise BusAlreadyFreed('aget')
+
+        if self._channels != 1:
+            return await self.agetn(self._channels)
+        future = rpl.ReplyTable.get(self._server.addr).expect(
+            '/c_set', [self._index])
+        self._server.addr.send_msg('/c_get', self._index)
+        # // The response is of the form [/c_set, index, value].
+        return (await future)[2]
+
+    async def agetn(self, count=None):
+        '''Coroutine counterpart of ``getn``, return a list of
+        consecutive channels' values from this bus index.
+
+        '''
+
+        if self._index is None:
+            raise BusAlreadyFreed('agetn')
+
         if count is None:
             count = self._channels
+        future = rpl.ReplyTable.get(self._server.addr).expect(
+            '/c_setn', [self._index])
         self._server.addr.send_msg('/c_getn', self._index, count)
+        # // The response is of the form [/c_setn, index, count, ...values].
+        return (await future)[3:]
 
     def fill(self, value, channels):
         '''Set contiguous buses from this bus index to a single value.
@@ -4,6 +4,7 @@ import logging
 
 from ..base import utils as utl
 from ..base import responders as rpd
+from ..base import _replies as rpl
 from ..base import functions as fn
 from ..base import model as mdl
 from ..base import stream as stm
@@ -439,10 +440,8 @@ class Node(gpp.NodeParameter):
                             f'\n   tail: {tail}')
                 print(msg)
 
-        rpd.OscFunc(
-            lambda msg, *_: action(*msg),
-            '/n_info', self.server.addr,
-            arg_template=[self.node_id]).one_shot()
+        rpl.ReplyTable.get(self.server.addr).add(
+            '/n_info', [self.node_id], lambda msg, *_: action(*msg))
         self.server.addr.send_msg('/n_query', self.node_id)
 
     def register(self, playing=True, running=True):
@@ -1078,9 +1077,8 @@ class Synth(Node):
             # // We want 'value' which is at index 3.
             fn.value(action, msg[3])
 
-        rpd.OscFunc(
-            resp_func, '/n_set', self.server.addr,
-            arg_template=[self.node_id, index]).one_shot()
+        rpl.ReplyTable.get(self.server.addr).add(
+            '/n_set', [self.node_id, index], resp_func)
 
         self.server.addr.send_msg('/s_get', self.node_id, index)  # 44
 
@@ -1106,9 +1104,8 @@ class Synth(Node):
             # // We want '*values' which are at indexes 4 and above.
             fn.value(action, msg[4:])
 
-        rpd.OscFunc(
-            resp_func, '/n_setn', self.server.addr,
-            arg_template=[self.node_id, index]).one_shot()
+        rpl.ReplyTable.get(self.server.addr).add(
+            '/n_setn', [self.node_id, index], resp_func)
 
         self.server.addr.send_msg('/s_getn', self.node_id, index, count)  # 45
 
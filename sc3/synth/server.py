@@ -603,14 +603,10 @@ class MetaServer(type):
 
         '''
 
-        if even_remote:
-            for server in cls.all:
-                if server._status_watcher.server_running:
-                    server.free_nodes()
-        else:
-            for server in cls.all:
-                if server._is_local and server._status_watcher.server_running:
-                    server.free_nodes()
+        cls._free_nodes_many(
+            server for server in cls.all
+            if (even_remote or server._is_local)
+            and server._status_watcher.server_running)
 
     def hard_free_all(cls, even_remote=False):
         '''Free nodes from all known local or remote servers.
@@ -622,13 +618,17 @@ class MetaServer(type):
 
         '''
 
-        if even_remote:
-            for server in cls.all:
-                server.free_nodes()
-        else:
-            for server in cls.all:
-                if server._is_local:
-                    server.free_nodes()
+        cls._free_nodes_many(
+            server for server in cls.all if even_remote or server._is_local)
+
+    def _free_nodes_many(cls, servers):
+        # Same as free_nodes, messages are encoded once for all servers.
+        servers = list(servers)
+        addrs = [server.addr for server in servers]
+        nad.NetAddr.send_msg_many(addrs, '/g_freeAll', 0)
+        nad.NetAddr.send_msg_many(addrs, '/clearSched')
+        for server in servers:
+            server._init_tree()
 
 
 class Server(gpp.NodeParameter, metaclass=MetaServer):
@@ -986,6 +986,18 @@ class Server(gpp.NodeParameter, metaclass=MetaServer):
         else:
             yield from self.addr.sync(condition, latency, elements)
 
+    async def async_sync(self, latency=None, elements=None):
+        '''Coroutine counterpart of ``sync``.
+
+        Use as ``await s.async_sync()`` from a coroutine, parameters are the
+        same as in ``sync``. Many coroutines can wait for their replies
+        concurrently in the same event loop.
+
+        '''
+
+        if _libsc3.main is not _libsc3.NrtMain:
+            await self.addr.async_sync(latency, elements)
+
     def bind(self):
         '''Return a BundleNetAddr context manager that collects generated
         messages into a bundle and send it to the server.
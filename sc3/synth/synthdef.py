@@ -2,22 +2,29 @@
 
 import inspect
 import logging
-import io
 import pathlib
+import multiprocessing
+import threading
+from concurrent import futures
 from collections.abc import Container
 
+import sc3
+
 from ..base import classlibrary as clb
 from ..base import utils as utl
 from ..base import platform as plf
 from ..base import systemactions as sac
 from ..base import functions as fn
 from ..base import main as _libsc3
+from ..base import netaddr as nad
 from . import ugen as ugn
 from . import server as srv
 from . import synthdesc as sdc
 from . import _fmtrw as frw
 from . import node as nod
 from . import synthdef as sdf
+from . import _defcache as dfc
+from . import _defwriter as dfw
 from .ugens import inout as iou
 from .ugens import fft
 
@@ -89,6 +96,16 @@ class SynthDef(metaclass=MetaSynthDef):
 
     _SUFFIX = 'scsyndef'
     _RATE_NAMES = ('ar', 'kr', 'ir', 'tr')
+    _cache = None
+    # Optional merge of duplicated pure ugens and folding of operators on
+    # constants, see optimization_report.
+    fold_and_merge = False
+    # Attributes of the graph built on demand for cached definitions.
+    _GRAPH_ATTRS = frozenset({
+        '_controls', '_control_names', '_all_control_names',
+        '_control_index', '_children', '_constants', '_constant_set',
+        '_max_local_bufs', '_available', '_width_first_ugens',
+        '_rewrite_in_progress', '_adjacency_stale', '_optimization_report'})
 
     @classmethod
     def _dummy(cls, name):
@@ -101,6 +118,9 @@ class SynthDef(metaclass=MetaSynthDef):
         obj._metadata = dict()
         # obj.desc = None
         obj._bytes = None
+        obj._desc_data = None
+        obj._fold_and_merge = False
+        obj._optimization_report = []
 
         obj._controls = None
         obj._control_names = []
@@ -115,6 +135,7 @@ class SynthDef(metaclass=MetaSynthDef):
         obj._available = []
         obj._width_first_ugens = []
         obj._rewrite_in_progress = False
+        obj._adjacency_stale = True
 
         return obj
 
@@ -126,7 +147,39 @@ class SynthDef(metaclass=MetaSynthDef):
         self._metadata = metadata or dict()
         # self.desc = None
         self._bytes = None
-
+        self._desc_data = None
+        self._fold_and_merge = type(self).fold_and_merge
+        rates = rates or []
+        prepend = prepend or []
+
+        cache = type(self)._cache
+        if cache is not None:
+            key = cache.key(
+                name, func, rates, prepend, self._variants, self._metadata,
+                (self._fold_and_merge,))
+            entry = cache.get(key)
+            if entry is not None:
+                self._set_compiled(func, rates, prepend, *entry)
+                return
+
+        self._init_graph()
+        self._build(func, rates, prepend)
+
+        if cache is not None and key is not None:
+            desc = sdc.SynthDesc.new_from(self, False)
+            self._desc_data = desc._cache_data()
+            cache.put(key, self.as_bytes(), self._desc_data)
+
+    def _set_compiled(self, func, rates, prepend, def_bytes, desc_data):
+        # The graph is built only if needed, see __getattr__.
+        self._bytes = def_bytes
+        self._desc_data = desc_data
+        self._func = func
+        self._callable_args = list(inspect.signature(func).parameters.keys())
+        self._build_lock = threading.Lock()
+        self._pending_build = (func, rates, prepend)
+
+    def _init_graph(self):
         # self._controls = None  # init_build, is set by ugens using _libsc3.main._current_synthdef
         self._control_names = []
         self._all_control_names = []
@@ -141,24 +194,51 @@ class SynthDef(metaclass=MetaSynthDef):
         self._available = []
         self._width_first_ugens = []
         self._rewrite_in_progress = False
+        self._adjacency_stale = True  # Set by rewrites after topo init.
 
         # callable interface
         # self._callable_args = None
 
-        self._build(func, rates or [], prepend or [])
+    def __getattr__(self, name):
+        # Cached definitions build the graph on first access.
+        if name in self._GRAPH_ATTRS and '_pending_build' in self.__dict__:
+            with self._build_lock:
+                # Built by another thread while waiting.
+                if '_pending_build' in self.__dict__:
+                    self._build_pending()
+            return getattr(self, name)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _build_pending(self):
+        # The graph is built in a copy and moved at once, so other threads
+        # don't find a partial graph among the attributes of self.
+        state = dict(self.__dict__)
+        func, rates, prepend = state.pop('_pending_build')
+        del state['_build_lock']
+        graph = type(self).__new__(type(self))
+        graph.__dict__.update(state)
+        graph._init_graph()
+        graph._build(func, rates, prepend)
+        for ugen in graph._children:
+            for obj in (ugen, *ugen._channels, *ugen.inputs):
+                if getattr(obj, '_synthdef', None) is graph:
+                    obj._synthdef = self
+        self.__dict__.update(graph.__dict__)
+        del self.__dict__['_pending_build']
 
     def _build(self, func, rates, prepend):
-        with _libsc3.main._def_build_lock:
-            try:
-                _libsc3.main._current_synthdef = self
-                self._init_build()
-                self._build_ugen_graph(func, rates, prepend)
-                self._finish_build()
-                self._func = func
-                _libsc3.main._current_synthdef = None
-            except Exception:
-                _libsc3.main._current_synthdef = None
-                raise
+        # The current synthdef is local to the thread, builds from
+        # different threads run concurrently.
+        previous = _libsc3.main._current_synthdef
+        try:
+            _libsc3.main._current_synthdef = self
+            self._init_build()
+            self._build_ugen_graph(func, rates, prepend)
+            self._finish_build()
+            self._func = func
+        finally:
+            _libsc3.main._current_synthdef = previous
 
     @property
     def name(self):
@@ -180,6 +260,103 @@ class SynthDef(metaclass=MetaSynthDef):
         '''SynthDef's metadata dict.'''
         return self._metadata
 
+    @classmethod
+    def build_many(cls, funcs, processes=None):
+        '''Build definitions in parallel processes.
+
+        Each function is compiled in a process pool, the binary definitions
+        and their descriptions are sent back and the graphs are built again
+        in this process only if they are inspected. Definitions found in
+        the cache, if enabled, are not compiled.
+
+        Parameters
+        ----------
+        funcs : dict | list
+            A dictionary of names and functions or a list of functions
+            named after their ``__name__``. Functions must be picklable,
+            i.e. defined at module level.
+        processes : int
+            Number of worker processes, by default the number of
+            processors.
+
+        Returns
+        -------
+        list
+            The SynthDef objects in the order of ``funcs``.
+
+        '''
+
+        if not isinstance(funcs, dict):
+            funcs = {func.__name__: func for func in funcs}
+        ret = []
+        pending = []
+        for name, func in funcs.items():
+            sdef = cls.__new__(cls)
+            sdef._name = name
+            sdef._variants = dict()
+            sdef._metadata = dict()
+            sdef._fold_and_merge = cls.fold_and_merge
+            key = entry = None
+            if cls._cache is not None:
+                key = cls._cache.key(
+                    name, func, [], [], dict(), dict(), (cls.fold_and_merge,))
+                entry = cls._cache.get(key)
+            if entry is not None:
+                sdef._set_compiled(func, [], [], *entry)
+            else:
+                pending.append((sdef, func, key))
+            ret.append(sdef)
+        if pending:
+            context = multiprocessing.get_context('spawn')
+            with futures.ProcessPoolExecutor(
+                    processes, context, _init_build_process) as executor:
+                results = executor.map(
+                    _compile, [p[0].name for p in pending],
+                    [p[1] for p in pending],
+                    [cls.fold_and_merge] * len(pending))
+                for (sdef, func, key), entry in zip(pending, results):
+                    sdef._set_compiled(func, [], [], *entry)
+                    if key is not None:
+                        cls._cache.put(key, *entry)
+        return ret
+
+    @classmethod
+    def enable_cache(cls, dir=None, max_size=64 * 1024 * 1024):
+        '''Keep compiled definitions in a persistent disk cache.
+
+        SynthDefs created afterwards are looked up by a hash of their
+        function and parameters, when found the binary definition and its
+        description are loaded from disk and the graph is not built unless
+        it's inspected (e.g. by ``dump_ugens``). Objects referred to by the
+        function are hashed by value, instances of Python classes by their
+        attributes. Functions that refer to other objects (e.g. with
+        ``__slots__`` or implemented in C) are not cached.
+
+        Parameters
+        ----------
+        dir : str | pathlib.Path
+            Cache directory, by default 'synthdef_cache' inside platform's
+            support directory.
+        max_size : int
+            Maximum size of the cache in bytes, least recently used
+            definitions are removed when exceeded.
+
+        Returns
+        -------
+        SynthDefCache
+            The cache object.
+
+        '''
+
+        dir = dir or plf.Platform.support_dir / 'synthdef_cache'
+        cls._cache = dfc.SynthDefCache(dir, max_size)
+        return cls._cache
+
+    @classmethod
+    def disable_cache(cls):
+        '''Stop using the persistent cache, the files are not removed.'''
+        cls._cache = None
+
     @classmethod
     def wrap(cls, func, rates=None, prepend=None):
         '''Wrap a function within another SynthDef function.
@@ -205,6 +382,7 @@ class SynthDef(metaclass=MetaSynthDef):
         self._controls = []
         self._control_index = 0
         self._max_local_bufs = None
+        self._optimization_report = []
 
     def _build_ugen_graph(self, func, rates, prepend):
         # // Save/restore controls in case of SynthDef.wrap.
@@ -429,6 +607,8 @@ class SynthDef(metaclass=MetaSynthDef):
 
     def _finish_build(self):
         self._add_copies_if_needed()  # ping, only for WidthFirstUGen ugens.
+        if self._fold_and_merge:
+            self._fold_and_merge_ugens()
         self._optimize_graph()
         self._collect_constants()
         self._check_inputs()  # // Will die on error.
@@ -445,6 +625,78 @@ class SynthDef(metaclass=MetaSynthDef):
                 child._add_copies_if_needed()  # pong
 
 
+    def _fold_and_merge_ugens(self):  # ping
+        # Children are in creation order, inputs are visited before the
+        # ugens that use them except for copies added by PV ugens which
+        # are only updated at the end.
+        replaced = dict()  # id(ugen or output proxy): replacement.
+        merge_keys = dict()
+
+        def update_inputs(ugen):
+            inputs = ugen._inputs
+            if any(id(x) in replaced for x in inputs
+                   if isinstance(x, ugn.SynthObject)):
+                inputs = list(inputs)
+                for i, x in enumerate(inputs):
+                    while isinstance(x, ugn.SynthObject) and id(x) in replaced:
+                        x = replaced[id(x)]
+                    inputs[i] = x
+                ugen._inputs = tuple(inputs)
+
+        for i, ugen in enumerate(self._children):
+            update_inputs(ugen)
+            value = ugen._constant_folding()  # pong
+            if value is not None:
+                replaced[id(ugen)] = value
+                self._children[i] = None
+                self._optimization_report.append(('folded', ugen, value))
+                continue
+            key = ugen._merge_key()  # pong
+            if key is None:
+                continue
+            kept = merge_keys.setdefault(key, ugen)
+            if kept is not ugen:
+                replaced[id(ugen)] = kept
+                for proxy, kept_proxy in zip(ugen._channels, kept._channels):
+                    replaced[id(proxy)] = kept_proxy
+                self._children[i] = None
+                self._optimization_report.append(('merged', ugen, kept))
+
+        if replaced:
+            self._children = [x for x in self._children if x is not None]
+            for ugen in self._children:
+                update_inputs(ugen)
+            self._index_ugens()
+
+    @property
+    def optimization_report(self):
+        '''List of units removed by the optional ``fold_and_merge`` stage.
+
+        Each item is a tuple ``(action, name, replacement)``. Action is
+        `'merged'` for pure ugens that compute the same as another and
+        `'folded'` for operators on constants. The replacement is the dump
+        name of the remaining ugen or the constant value. The stage runs if
+        the class attribute ``SynthDef.fold_and_merge`` is True when the
+        definition is created.
+
+        '''
+
+        report = []
+        children = {id(x) for x in self._children}
+        for action, ugen, replacement in self._optimization_report:
+            if isinstance(ugen, ugn.BasicOpUGen):
+                name = ugen.operator
+            else:
+                name = ugen.name
+            if isinstance(replacement, ugn.SynthObject):
+                if id(replacement) not in children:
+                    # Rewritten later by the graph optimization.
+                    replacement = replacement.name
+                else:
+                    replacement = replacement._dump_name()
+            report.append((action, name, replacement))
+        return report
+
     # OC: Multi channel expansion causes a non optimal breadth-wise
     # ordering of the graph. The topological sort below follows
     # branches in a depth first order, so that cache performance
@@ -465,6 +717,7 @@ class SynthDef(metaclass=MetaSynthDef):
             self._index_ugens()
 
     def _init_topo_sort(self):  # ping
+        self._adjacency_stale = False
         self._available = []
         for ugen in self._children:
             ugen._antecedents = set()
@@ -499,7 +752,10 @@ class SynthDef(metaclass=MetaSynthDef):
         return True  # Returns: None, bool, str (True or str is error).
 
     def _topological_sort(self):
-        self._init_topo_sort()
+        # The adjacency of the optimization pass is reused unless ugens
+        # were removed or replaced, rewrites don't keep it consistent.
+        if self._adjacency_stale:
+            self._init_topo_sort()
         ugen = None
         out_stack = []
         while len(self._available) > 0:
@@ -526,6 +782,7 @@ class SynthDef(metaclass=MetaSynthDef):
     def _remove_ugen(self, ugen):
         # // Lazy removal: clear entry and later remove all None entries.
         self._children[ugen._synth_index] = None
+        self._adjacency_stale = True
 
     def _replace_ugen(self, a, b):
         if not isinstance(b, ugn.SynthObject):
@@ -535,14 +792,17 @@ class SynthDef(metaclass=MetaSynthDef):
         b._descendants = a._descendants
         b._synth_index = a._synth_index
         self._children[a._synth_index] = b
+        self._adjacency_stale = True
 
-        for item in self._children:
-            if item is not None:
-                for i, input in enumerate(item.inputs):
-                    if input is a:
-                        aux = list(item.inputs)
-                        aux[i] = b
-                        item._inputs = tuple(aux)
+        # Only the descendants (use list) of a can have it as input.
+        if a._descendants is None:
+            consumers = self._children
+        else:
+            consumers = a._descendants
+        for item in consumers:
+            if item is not None and any(x is a for x in item._inputs):
+                item._inputs = tuple(
+                    b if x is a else x for x in item._inputs)
 
     def _add_constant(self, value):
         if value not in self._constant_set:
@@ -594,8 +854,26 @@ class SynthDef(metaclass=MetaSynthDef):
             lib = sdc.SynthDescLib.get_lib(libname)
             lib.add(desc)
             servers = lib.servers
-        for server in servers:
-            self._do_send(server, fn.value(completion_msg, server))
+        self._send_many(servers, completion_msg)
+
+    def _send_many(self, servers, completion_msg):
+        # The message is encoded once for all servers unless
+        # completion_msg is a function or the def is too big.
+        servers = list(servers)
+        if not servers:
+            return
+        if callable(completion_msg) or len(servers) == 1:
+            for server in servers:
+                self._do_send(server, fn.value(completion_msg, server))
+            return
+        msg = ['/d_recv', self.as_bytes(), completion_msg]
+        msg_size = servers[0].addr._calc_msg_dgram_size(msg)
+        if msg_size <= servers[0].addr._MAX_UDP_DGRAM_SIZE:
+            nad.NetAddr.send_msg_many(
+                [server.addr for server in servers], *msg)
+        else:
+            for server in servers:
+                self._do_send(server, completion_msg)
 
     def _do_send(self, server, completion_msg):
         msg = ['/d_recv', self.as_bytes(), completion_msg]
@@ -619,9 +897,7 @@ class SynthDef(metaclass=MetaSynthDef):
         '''Binary format of the synthesis definition.'''
 
         if self._bytes is None:
-            stream = io.BytesIO()
-            self._write_def_list([self], stream)
-            self._bytes = stream.getbuffer()
+            self._bytes = memoryview(dfw.write_def_list([self]))
         return self._bytes
 
     def _write_def_file(self, dir, overwrite=True, md_plugin=None):
@@ -649,7 +925,7 @@ class SynthDef(metaclass=MetaSynthDef):
         try:
             # Should write if file doesn't exists or overwrite is True.
             with open(path, mode) as file:
-                self._write_def_list([self], file)
+                file.write(self.as_bytes())
             desc = sdc.SynthDesc.new_from(self)
             sdc.SynthDesc.populate_metadata_func(desc)
             desc.write_metadata(dir, md_plugin)
@@ -660,12 +936,10 @@ class SynthDef(metaclass=MetaSynthDef):
     @staticmethod
     def _write_def_list(lst, file):
         # This method is Collection-writeDef in sclang, is the only one
-        # that creates the header. Called from as_bytes.
-        file.write(b'SCgf')  # putString 'a null terminated String'
-        frw.write_i32(file, 2)  # // file version
-        frw.write_i16(file, len(lst))  # // number of defs in file.
-        for synthdef in lst:
-            synthdef._write_def(file)
+        # that creates the header. The definitions are serialized in bulk
+        # by _defwriter, _write_def writes the same bytes one value at a
+        # time.
+        file.write(dfw.write_def_list(lst))
 
     def _write_def(self, file):
         try:
@@ -777,11 +1051,12 @@ class SynthDef(metaclass=MetaSynthDef):
                 _logger.warning(
                     f"Server '{server.name}' not running, "
                     "could not send SynthDef")
-            if self._metadata.get('reconstructed', False):
+        if self._metadata.get('reconstructed', False):
+            for server in servers:
                 self._load_reconstructed(
                     server, fn.value(completion_msg, server))
-            else:
-                self._do_send(server, fn.value(completion_msg, server))
+        else:
+            self._send_many(servers, completion_msg)
 
     def _load_reconstructed(self, server, completion_msg):
         # // This method warns and does not halt because
@@ -862,14 +1137,13 @@ class SynthDef(metaclass=MetaSynthDef):
         path = dir / f'{self._name}.{self._SUFFIX}'
         if not self._metadata.get('reconstructed', False):
             with open(path, 'wb') as file:
-                self._write_def_list([self], file)
+                file.write(self.as_bytes())
             desc = sdc.SynthDesc.new_from(self)
             desc.metadata = self._metadata
             sdc.SynthDesc.populate_metadata_func(desc)
             desc.write_metadata(dir, md_plugin)
             lib.add(desc)
-            for server in lib.servers:
-                self._do_send(server, fn.value(completion_msg, server))
+            self._send_many(lib.servers, completion_msg)
         else:
             lib.read(path)
             for server in lib.servers:
@@ -971,6 +1245,18 @@ class SynthDef(metaclass=MetaSynthDef):
             '/d_loadDir', dir, fn.value(completion_msg, server))
 
 
+### Process pool build ###
+
+def _init_build_process():
+    sc3.init('nrt', 'WARNING')
+
+def _compile(name, func, fold_and_merge):
+    SynthDef.fold_and_merge = fold_and_merge
+    sdef = SynthDef(name, func)
+    desc = sdc.SynthDesc.new_from(sdef, False)
+    return bytes(sdef.as_bytes()), desc._cache_data()
+
+
 ### Decorator syntax ###
 
 def _create_synthdef(func, **kwargs):
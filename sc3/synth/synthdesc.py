@@ -129,6 +129,12 @@ class SynthDesc():
 
     @classmethod
     def new_from(cls, synthdef, keep_def=True):
+        if synthdef._desc_data is not None:
+            desc = cls._from_cache_data(synthdef._desc_data)
+            desc.metadata = synthdef.metadata
+            if keep_def:
+                desc.sdef = synthdef
+            return desc
         stream = io.BytesIO(synthdef.as_bytes())
         stream.read(4)  # SCgf
         version = frw.read_i32(stream)
@@ -179,6 +185,52 @@ class SynthDesc():
                 desc.sdef.metadata = desc.metadata
         return ret
 
+    def _cache_data(self):
+        # JSON serializable data for SynthDefCache, IODesc starting
+        # channels that are not constants or controls are stored as '?'.
+        def io_data(iodesc):
+            channel = iodesc.starting_channel
+            if not isinstance(channel, (int, float, str)):
+                channel = '?'
+            return [iodesc.rate, iodesc.channels, channel,
+                    iodesc.type.__name__]
+
+        return {
+            'name': self.name,
+            'constants': list(self.constants),
+            'controls': [
+                [c.name, c.index, c.rate, c.default_value]
+                for c in self.controls],
+            'control_names': [
+                [n, self.control_dict[n].index] for n in self.control_names],
+            'inputs': [io_data(x) for x in self.inputs],
+            'outputs': [io_data(x) for x in self.outputs],
+            'has_gate': self.has_gate,
+            'has_array_args': self.has_array_args,
+            'has_variants': self.has_variants}
+
+    @classmethod
+    def _from_cache_data(cls, data):
+        desc = cls()
+        desc.name = data['name']
+        desc.constants = data['constants']
+        desc.controls = [
+            iou.ControlName(name, index, rate, default_value, None)
+            for name, index, rate, default_value in data['controls']]
+        desc.control_names = [n for n, _ in data['control_names']]
+        desc.control_dict = {
+            n: desc.controls[i] for n, i in data['control_names']}
+        desc.inputs = [
+            IODesc(rate, channels, channel, ugns.installed_ugens[name])
+            for rate, channels, channel, name in data['inputs']]
+        desc.outputs = [
+            IODesc(rate, channels, channel, ugns.installed_ugens[name])
+            for rate, channels, channel, name in data['outputs']]
+        desc.has_gate = data['has_gate']
+        desc.has_array_args = data['has_array_args']
+        desc.has_variants = data['has_variants']
+        return desc
+
     def _read_synthdef(self, stream, keep_def=False):  # TODO
         raise NotImplementedError(
             'read_synthdef format version 1 not implemented')
@@ -188,73 +240,73 @@ class SynthDesc():
             'read_ugen_spec format version 1 not implemented')
 
     def _read_synthdef2(self, stream, keep_def=False):
-        with _libsc3.main._def_build_lock:
-            try:
-                self.inputs = []
-                self.outputs = []
-                self.control_names = []
-                self.control_dict = dict()
-
-                self.name = frw.read_pascal_str(stream)
-
-                self.sdef = sdf.SynthDef._dummy(self.name)
-                _libsc3.main._current_synthdef = self.sdef
-
-                num_constants = frw.read_i32(stream)
-                self.constants = frw.read_f32_list(stream, num_constants)
-
-                num_controls = frw.read_i32(stream)
-                self.sdef._controls = frw.read_f32_list(stream, num_controls)
-                self.controls = [
-                    iou.ControlName('?', i, '?', self.sdef._controls[i], None)
-                    for i in range(num_controls)]
-
-                num_control_names = frw.read_i32(stream)
-                for _ in range(num_control_names):
-                    control_name = frw.read_pascal_str(stream)
-                    control_index = frw.read_i32(stream)
-                    self.controls[control_index].name = control_name
-                    self.control_names.append(control_name)
-                    self.control_dict[control_name] = \
-                        self.controls[control_index]
-
-                num_ugens = frw.read_i32(stream)
-                for _ in range(num_ugens):
-                    self._read_ugen_spec2(stream)
-
-                # Append all default values of each multichannel
-                # control to the fist ControlName default value.
-                aux_ctrl = None
-                for ctrl in self.controls:
-                    if ctrl.name == '?':
-                        default_value = utl.as_list(aux_ctrl.default_value)
-                        default_value.append(ctrl.default_value)
-                        aux_ctrl.default_value = default_value
-                    else:
-                        aux_ctrl = ctrl
-
-                self.sdef._control_names = [
-                    x for x in self.controls if x.name is not None]
-                self.has_array_args = any(
-                    cn.name == '?' for cn in self.controls)
-
-                num_variants = frw.read_i16(stream)
-                self.has_variants = num_variants > 0
-                # // maybe later, read in variant names and values
-                # // this is harder than it might seem at first
-
-                self.sdef._constants = dict()
-                for i, k in enumerate(self.constants):
-                    self.sdef._constants[k] = i
-
-                if not keep_def:
-                    # // throw away unneeded stuff
-                    self.sdef = None
-                    self.constats = None
-
-                self._check_synthdesc2()
-            finally:
-                _libsc3.main._current_synthdef = None
+        previous = _libsc3.main._current_synthdef
+        try:
+            self.inputs = []
+            self.outputs = []
+            self.control_names = []
+            self.control_dict = dict()
+
+            self.name = frw.read_pascal_str(stream)
+
+            self.sdef = sdf.SynthDef._dummy(self.name)
+            _libsc3.main._current_synthdef = self.sdef
+
+            num_constants = frw.read_i32(stream)
+            self.constants = frw.read_f32_list(stream, num_constants)
+
+            num_controls = frw.read_i32(stream)
+            self.sdef._controls = frw.read_f32_list(stream, num_controls)
+            self.controls = [
+                iou.ControlName('?', i, '?', self.sdef._controls[i], None)
+                for i in range(num_controls)]
+
+            num_control_names = frw.read_i32(stream)
+            for _ in range(num_control_names):
+                control_name = frw.read_pascal_str(stream)
+                control_index = frw.read_i32(stream)
+                self.controls[control_index].name = control_name
+                self.control_names.append(control_name)
+                self.control_dict[control_name] = \
+                    self.controls[control_index]
+
+            num_ugens = frw.read_i32(stream)
+            for _ in range(num_ugens):
+                self._read_ugen_spec2(stream)
+
+            # Append all default values of each multichannel
+            # control to the fist ControlName default value.
+            aux_ctrl = None
+            for ctrl in self.controls:
+                if ctrl.name == '?':
+                    default_value = utl.as_list(aux_ctrl.default_value)
+                    default_value.append(ctrl.default_value)
+                    aux_ctrl.default_value = default_value
+                else:
+                    aux_ctrl = ctrl
+
+            self.sdef._control_names = [
+                x for x in self.controls if x.name is not None]
+            self.has_array_args = any(
+                cn.name == '?' for cn in self.controls)
+
+            num_variants = frw.read_i16(stream)
+            self.has_variants = num_variants > 0
+            # // maybe later, read in variant names and values
+            # // this is harder than it might seem at first
+
+            self.sdef._constants = dict()
+            for i, k in enumerate(self.constants):
+                self.sdef._constants[k] = i
+
+            if not keep_def:
+                # // throw away unneeded stuff
+                self.sdef = None
+                self.constats = None
+
+            self._check_synthdesc2()
+        finally:
+            _libsc3.main._current_synthdef = previous
 
     def _read_ugen_spec2(self, stream):
         ugen_class = frw.read_pascal_str(stream)
@@ -451,12 +503,12 @@ class SynthDescLib(metaclass=MetaSynthDescLib):
         return self.synth_descs[name]  # KeyError, nil in sclang.
 
     def send(self, server=None, try_reconstructed=True):
-        server_list = utl.as_list(server) or self.servers
-        for s in server_list:
-            for desc in self.synth_descs.values():
-                if not desc.sdef.metadata.get('reconstructed', False):
-                    desc.send(s)
-                elif try_reconstructed:
+        server_list = utl.as_list(server) or list(self.servers)
+        for desc in self.synth_descs.values():
+            if not desc.sdef.metadata.get('reconstructed', False):
+                desc.send(server_list)  # Encoded once for all servers.
+            elif try_reconstructed:
+                for s in server_list:
                     desc.sdef._load_reconstructed(s)
 
     def read(self, path=None, keep_defs=True):
@@ -0,0 +1,674 @@
+"""Server stand-in for testing and benchmarks."""
+
+import array
+import collections
+import heapq
+import itertools
+import logging
+import random
+import selectors
+import socket
+import struct
+import threading
+import time
+
+from ..base import netaddr as nad
+from ..base import _osclib as oli
+
+
+__all__ = ['MockServer']
+
+
+_logger = logging.getLogger(__name__)
+
+
+_BLOB_TYPES = (bytes, memoryview)  # Parsed blobs are memoryviews.
+
+
+Received = collections.namedtuple(
+    typename='Received',
+    field_names=('time', 'addr', 'message'))
+
+
+class MockServer():
+    '''
+    Pure Python stand-in of scsynth that answers on a local port.
+
+    The server replies to a subset of the server command reference with the
+    same messages scsynth sends, node, buffer and control bus state is kept
+    in memory but no audio is processed. Bundles are performed as they
+    arrive regardless of their timetag.
+
+    Supported commands are ``'/status'``, ``'/version'``, ``'/sync'``,
+    ``'/notify'``, ``'/quit'``, ``'/d_recv'``, ``'/d_load'``,
+    ``'/d_loadDir'``, ``'/s_new'``, ``'/s_get'``, ``'/s_getn'``,
+    ``'/g_new'``, ``'/g_freeAll'``, ``'/g_deepFree'``, ``'/n_free'``,
+    ``'/n_set'``, ``'/n_query'``, ``'/b_alloc'``, ``'/b_free'``,
+    ``'/b_zero'``, ``'/b_query'``, ``'/b_set'``, ``'/b_setn'``,
+    ``'/b_fill'``, ``'/b_get'``, ``'/b_getn'``, ``'/c_set'``,
+    ``'/c_setn'``, ``'/c_fill'``, ``'/c_get'`` and ``'/c_getn'``. Other
+    commands are recorded and ignored.
+
+    Parameters
+    ----------
+    port: int
+        Port number to bind, 0 binds a free port.
+    protocol: str
+        Either ``'udp'`` or ``'tcp'``.
+    latency: float
+        Time in seconds before each reply is sent.
+    loss: float
+        Probability of dropping each received packet, between 0 and 1.
+    seed: int
+        Optional seed of the loss random generator.
+    record: bool | int
+        Record received messages, if an int it's the maximum number of
+        records kept.
+    host: str
+        Address to bind.
+    sample_rate: float
+        Sample rate reported by ``'/status'`` and ``'/b_info'``.
+    control_buses: int
+        Number of control buses.
+    max_logins: int
+        Maximum number of notified clients.
+
+    '''
+
+    def __init__(self, port=0, protocol='udp', latency=0.0, loss=0.0,
+                 seed=None, record=True, host='127.0.0.1',
+                 sample_rate=48000.0, control_buses=16384, max_logins=32):
+        if protocol not in ('udp', 'tcp'):
+            raise ValueError(f'invalid protocol: {protocol}')
+        self.protocol = protocol
+        self.latency = latency
+        self.loss = loss
+        self.sample_rate = float(sample_rate)
+        self.max_logins = max_logins
+        self._host = host
+        self._port = port
+        self._random = random.Random(seed)
+        if record is True:
+            self._traffic = collections.deque()
+        elif record:
+            self._traffic = collections.deque(maxlen=record)
+        else:
+            self._traffic = None
+        self._num_control_buses = control_buses
+        self._sock = None
+        self._thread = None
+        self._running = False
+        self._replies = []
+        self._replies_lock = threading.Lock()
+        self._seq = itertools.count()
+        self.reset()
+
+    def reset(self):
+        '''Clear the server state, the recorded traffic and counters.'''
+        self._nodes = {0: _Node(0, None, True)}
+        self._buffers = dict()
+        self._control_buses = array.array('f', bytes(
+            4 * self._num_control_buses))
+        self._num_synthdefs = 0
+        self._clients = dict()
+        self._auto_id = -1000
+        self.received = 0
+        self.dropped = 0
+        self.sent = 0
+        if self._traffic is not None:
+            self._traffic.clear()
+
+    @property
+    def port(self):
+        '''Bound port number.'''
+        return self._port
+
+    @property
+    def addr(self):
+        '''A NetAddr of the server.'''
+        return nad.NetAddr(self._host, self._port)
+
+    @property
+    def traffic(self):
+        '''List of received messages as (time, addr, message) tuples.'''
+        if self._traffic is None:
+            return []
+        return list(self._traffic)
+
+    @property
+    def running(self):
+        '''True while the server is serving.'''
+        return self._running
+
+    def start(self):
+        '''Bind the port and start serving in a daemon thread.'''
+        if self._running:
+            return
+        if self.protocol == 'udp':
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        else:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self._host, self._port))
+        self._port = self._sock.getsockname()[1]
+        if self.protocol == 'tcp':
+            self._sock.listen()
+        self._sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._sock, selectors.EVENT_READ)
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'{type(self).__name__} port: {self._port}',
+            daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''Stop serving and close the port.'''
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(1)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send(b'\0')
+        except OSError:
+            pass
+
+    ### Networking ###
+
+    def _run(self):
+        buffers = dict()
+        try:
+            while self._running:
+                timeout = self._send_due_replies()
+                for key, _ in self._selector.select(timeout):
+                    if key.fileobj is self._wakeup_r:
+                        try:
+                            self._wakeup_r.recv(4096)
+                        except BlockingIOError:
+                            pass
+                    elif key.fileobj is self._sock:
+                        if self.protocol == 'udp':
+                            self._recv_udp()
+                        else:
+                            conn, _ = self._sock.accept()
+                            conn.setblocking(False)
+                            buffers[conn] = bytearray()
+                            self._selector.register(
+                                conn, selectors.EVENT_READ)
+                    else:
+                        self._recv_tcp(key.fileobj, buffers)
+        finally:
+            for conn in buffers:
+                self._selector.unregister(conn)
+                conn.close()
+            self._selector.close()
+            self._sock.close()
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+
+    def _recv_udp(self):
+        while True:
+            try:
+                data, addr = self._sock.recvfrom(65536)
+            except BlockingIOError:
+                return
+            except OSError:
+                return  # ICMP errors of previous sends.
+            self._recv_packet(data, addr, addr)
+
+    def _recv_tcp(self, conn, buffers):
+        buf = buffers[conn]
+        try:
+            data = conn.recv(65536)
+        except BlockingIOError:
+            return
+        except ConnectionError:
+            data = b''
+        if not data:
+            self._selector.unregister(conn)
+            del buffers[conn]
+            conn.close()
+            return
+        buf.extend(data)
+        addr = conn.getpeername()
+        while len(buf) >= 4:
+            size = struct.unpack_from('>i', buf)[0]
+            if len(buf) < 4 + size:
+                break
+            packet = bytes(buf[4:4 + size])
+            del buf[:4 + size]
+            self._recv_packet(packet, conn, addr)
+
+    def _recv_packet(self, data, target, addr):
+        self.received += 1
+        if self.loss and self._random.random() < self.loss:
+            self.dropped += 1
+            return
+        try:
+            packet = oli.OscPacket(data)
+        except oli.OscParseError:
+            _logger.warning('%s: malformed packet from %s',
+                            type(self).__name__, addr)
+            return
+        now = time.monotonic()
+        for _, msg in packet.messages:
+            msg = [msg.address, *msg]
+            if self._traffic is not None:
+                self._traffic.append(Received(now, addr, msg))
+            self._perform(msg, target)
+
+    def _reply(self, target, address, *args):
+        dgram = oli.encode_message(address, args)
+        if self.latency > 0:
+            due = time.monotonic() + self.latency
+            with self._replies_lock:
+                heapq.heappush(
+                    self._replies, (due, next(self._seq), target, dgram))
+            if threading.current_thread() is not self._thread:
+                self._wakeup()
+        else:
+            self._send(target, dgram)
+
+    def _send_due_replies(self):
+        # Return the time to wait for the next reply, None if empty.
+        with self._replies_lock:
+            now = time.monotonic()
+            due = []
+            while self._replies and self._replies[0][0] <= now:
+                due.append(heapq.heappop(self._replies))
+            timeout = self._replies[0][0] - now if self._replies else None
+        for _, _, target, dgram in due:
+            self._send(target, dgram)
+        return timeout
+
+    def _send(self, target, dgram):
+        try:
+            if isinstance(target, socket.socket):
+                target.sendall(struct.pack('>i', len(dgram)) + dgram)
+            else:
+                self._sock.sendto(dgram, target)
+            self.sent += 1
+        except OSError as e:
+            _logger.warning('%s: %s', type(self).__name__, e)
+
+    def _notify(self, address, *args):
+        for target in list(self._clients):
+            self._reply(target, address, *args)
+
+    ### Commands ###
+
+    def _perform(self, msg, target):
+        cmd = self._commands.get(msg[0])
+        if cmd is None:
+            return
+        try:
+            cmd(self, msg, target)
+        except (IndexError, TypeError, ValueError) as e:
+            self._reply(target, '/fail', msg[0], str(e))
+
+    def _perform_completion(self, msg, index, target):
+        if len(msg) > index and isinstance(msg[index], _BLOB_TYPES):
+            try:
+                packet = oli.OscPacket(msg[index])
+            except oli.OscParseError:
+                return
+            for _, completion in packet.messages:
+                self._perform([completion.address, *completion], target)
+
+    def _cmd_status(self, msg, target):
+        num_synths = sum(1 for n in self._nodes.values() if not n.is_group)
+        num_groups = len(self._nodes) - num_synths
+        self._reply(
+            target, '/status.reply', 1, 0, num_synths, num_groups,
+            self._num_synthdefs, 0.1, 0.2, self.sample_rate,
+            self.sample_rate)
+
+    def _cmd_version(self, msg, target):
+        self._reply(
+            target, '/version.reply', 'scsynth', 3, 13, '.0', 'mock', 'none')
+
+    def _cmd_sync(self, msg, target):
+        self._reply(target, '/synced', msg[1])
+
+    def _cmd_notify(self, msg, target):
+        if msg[1]:
+            if target in self._clients:
+                self._reply(
+                    target, '/fail', '/notify', 'already registered',
+                    self._clients[target])
+                return
+            used = set(self._clients.values())
+            if len(used) >= self.max_logins:
+                self._reply(
+                    target, '/fail', '/notify', 'too many users')
+                return
+            client_id = msg[2] if len(msg) > 2 else -1
+            if client_id in used or not 0 <= client_id < self.max_logins:
+                client_id = min(set(range(self.max_logins)) - used)
+            self._clients[target] = client_id
+            self._reply(
+                target, '/done', '/notify', client_id, self.max_logins)
+        else:
+            self._clients.pop(target, None)
+            self._reply(target, '/done', '/notify')
+
+    def _cmd_quit(self, msg, target):
+        # Not delayed, the port is closed after the reply.
+        self._send(target, oli.encode_message('/done', ['/quit']))
+        self._running = False
+
+    def _cmd_d_recv(self, msg, target):
+        data = msg[1]
+        if bytes(data[:4]) != b'SCgf':
+            raise ValueError('invalid synthdef data')
+        self._num_synthdefs += struct.unpack_from('>h', data, 8)[0]
+        self._reply(target, '/done', msg[0])
+        self._perform_completion(msg, 2, target)
+
+    def _cmd_d_load(self, msg, target):
+        self._reply(target, '/done', msg[0])
+        self._perform_completion(msg, 2, target)
+
+    # Nodes.
+
+    def _node_info(self, node):
+        prev = next = -1
+        if node.parent is not None:
+            group = self._nodes[node.parent].children
+            i = group.index(node.id)
+            if i > 0:
+                prev = group[i - 1]
+            if i + 1 < len(group):
+                next = group[i + 1]
+        if node.is_group:
+            head = node.children[0] if node.children else -1
+            tail = node.children[-1] if node.children else -1
+            return (node.id, node.parent, prev, next, 1, head, tail)
+        return (node.id, node.parent, prev, next, 0)
+
+    def _add_node(self, node_id, add_action, target_id, is_group):
+        if node_id == -1:
+            node_id = self._auto_id
+            self._auto_id -= 1
+        if node_id in self._nodes:
+            raise ValueError(f'duplicate node ID {node_id}')
+        target = self._nodes[target_id]
+        if add_action in (0, 1):
+            if not target.is_group:
+                raise ValueError(f'node {target_id} is not a group')
+            parent = target
+            index = 0 if add_action == 0 else len(parent.children)
+        elif add_action in (2, 3, 4):
+            parent = self._nodes[target.parent]
+            index = parent.children.index(target_id) + (add_action == 3)
+        else:
+            raise ValueError(f'invalid add action {add_action}')
+        node = _Node(node_id, parent.id, is_group)
+        self._nodes[node_id] = node
+        parent.children.insert(index, node_id)
+        if add_action == 4:
+            self._free_node(target)
+        self._notify('/n_go', *self._node_info(node))
+        return node
+
+    def _free_node(self, node):
+        for child in list(node.children):
+            self._free_node(self._nodes[child])
+        self._notify('/n_end', *self._node_info(node))
+        self._nodes[node.parent].children.remove(node.id)
+        del self._nodes[node.id]
+
+    def _get_node(self, node_id):
+        try:
+            return self._nodes[node_id]
+        except KeyError:
+            raise ValueError(f'node {node_id} not found') from None
+
+    def _cmd_s_new(self, msg, target):
+        node_id = msg[2] if len(msg) > 2 else -1
+        add_action = msg[3] if len(msg) > 3 else 0
+        target_id = msg[4] if len(msg) > 4 else 0
+        if target_id not in self._nodes:
+            raise ValueError(f'node {target_id} not found')
+        node = self._add_node(node_id, add_action, target_id, False)
+        node.def_name = msg[1]
+        node.controls.update(zip(msg[5::2], msg[6::2]))
+
+    def _cmd_g_new(self, msg, target):
+        for i in range(1, len(msg), 3):
+            if msg[i + 2] not in self._nodes:
+                raise ValueError(f'node {msg[i + 2]} not found')
+            self._add_node(msg[i], msg[i + 1], msg[i + 2], True)
+
+    def _cmd_n_free(self, msg, target):
+        for node_id in msg[1:]:
+            node = self._nodes.get(node_id)
+            if node is not None and node_id != 0:
+                self._free_node(node)
+
+    def _cmd_g_free_all(self, msg, target):
+        for group_id in msg[1:]:
+            group = self._get_node(group_id)
+            for child in list(group.children):
+                self._free_node(self._nodes[child])
+
+    def _cmd_g_deep_free(self, msg, target):
+        def deep_free(group):
+            for child in list(group.children):
+                node = self._nodes[child]
+                if node.is_group:
+                    deep_free(node)
+                else:
+                    self._free_node(node)
+
+        for group_id in msg[1:]:
+            deep_free(self._get_node(group_id))
+
+    def _cmd_n_set(self, msg, target):
+        node = self._get_node(msg[1])
+        node.controls.update(zip(msg[2::2], msg[3::2]))
+
+    def _cmd_n_query(self, msg, target):
+        for node_id in msg[1:]:
+            self._reply(
+                target, '/n_info', *self._node_info(self._get_node(node_id)))
+
+    def _cmd_s_get(self, msg, target):
+        node = self._get_node(msg[1])
+        values = []
+        for control in msg[2:]:
+            values.extend((control, node.controls.get(control, 0.0)))
+        self._reply(target, '/n_set', node.id, *values)
+
+    def _cmd_s_getn(self, msg, target):
+        node = self._get_node(msg[1])
+        values = []
+        for control, count in zip(msg[2::2], msg[3::2]):
+            values.extend((control, count))
+            if isinstance(control, str):
+                values.append(node.controls.get(control, 0.0))
+                values.extend([0.0] * (count - 1))
+            else:
+                values.extend(
+                    node.controls.get(control + i, 0.0)
+                    for i in range(count))
+        self._reply(target, '/n_setn', node.id, *values)
+
+    # Buffers.
+
+    def _get_buffer(self, bufnum):
+        try:
+            return self._buffers[bufnum]
+        except KeyError:
+            raise ValueError(f'buffer {bufnum} not allocated') from None
+
+    def _cmd_b_alloc(self, msg, target):
+        bufnum, frames = msg[1], msg[2]
+        channels, completion = 1, 3
+        if len(msg) > 3 and not isinstance(msg[3], _BLOB_TYPES):
+            channels, completion = msg[3], 4
+        self._buffers[bufnum] = _Buffer(frames, channels)
+        self._reply(target, '/done', '/b_alloc', bufnum)
+        self._perform_completion(msg, completion, target)
+
+    def _cmd_b_free(self, msg, target):
+        self._buffers.pop(msg[1], None)
+        self._reply(target, '/done', '/b_free', msg[1])
+        self._perform_completion(msg, 2, target)
+
+    def _cmd_b_zero(self, msg, target):
+        buffer = self._get_buffer(msg[1])
+        buffer.data = array.array('f', bytes(4 * len(buffer.data)))
+        self._reply(target, '/done', '/b_zero', msg[1])
+        self._perform_completion(msg, 2, target)
+
+    def _cmd_b_query(self, msg, target):
+        values = []
+        for bufnum in msg[1:]:
+            buffer = self._buffers.get(bufnum)
+            if buffer is None:
+                values.extend((bufnum, 0, 0, 0.0))
+            else:
+                values.extend((
+                    bufnum, buffer.frames, buffer.channels,
+                    self.sample_rate))
+        self._reply(target, '/b_info', *values)
+
+    def _cmd_b_set(self, msg, target):
+        data = self._get_buffer(msg[1]).data
+        for index, value in zip(msg[2::2], msg[3::2]):
+            data[index] = value
+
+    def _cmd_b_setn(self, msg, target):
+        data = self._get_buffer(msg[1]).data
+        i = 2
+        while i + 1 < len(msg):
+            start, count = msg[i], msg[i + 1]
+            data[start:start + count] = array.array(
+                'f', msg[i + 2:i + 2 + count])
+            i += 2 + count
+
+    def _cmd_b_fill(self, msg, target):
+        data = self._get_buffer(msg[1]).data
+        for start, count, value in zip(msg[2::3], msg[3::3], msg[4::3]):
+            data[start:start + count] = array.array('f', [value] * count)
+
+    def _cmd_b_get(self, msg, target):
+        data = self._get_buffer(msg[1]).data
+        values = []
+        for index in msg[2:]:
+            values.extend((index, data[index]))
+        self._reply(target, '/b_set', msg[1], *values)
+
+    def _cmd_b_getn(self, msg, target):
+        data = self._get_buffer(msg[1]).data
+        values = []
+        for start, count in zip(msg[2::2], msg[3::2]):
+            if start < 0 or start + count > len(data):
+                raise ValueError('index out of range')
+            values.extend((start, count, *data[start:start + count]))
+        self._reply(target, '/b_setn', msg[1], *values)
+
+    # Control buses.
+
+    def _cmd_c_set(self, msg, target):
+        for index, value in zip(msg[1::2], msg[2::2]):
+            self._control_buses[index] = value
+
+    def _cmd_c_setn(self, msg, target):
+        i = 1
+        while i + 1 < len(msg):
+            start, count = msg[i], msg[i + 1]
+            self._control_buses[start:start + count] = array.array(
+                'f', msg[i + 2:i + 2 + count])
+            i += 2 + count
+
+    def _cmd_c_fill(self, msg, target):
+        for start, count, value in zip(msg[1::3], msg[2::3], msg[3::3]):
+            self._control_buses[start:start + count] = array.array(
+                'f', [value] * count)
+
+    def _cmd_c_get(self, msg, target):
+        values = []
+        for index in msg[1:]:
+            values.extend((index, self._control_buses[index]))
+        self._reply(target, '/c_set', *values)
+
+    def _cmd_c_getn(self, msg, target):
+        values = []
+        for start, count in zip(msg[1::2], msg[2::2]):
+            values.extend((
+                start, count, *self._control_buses[start:start + count]))
+        self._reply(target, '/c_setn', *values)
+
+    _commands = {
+        '/status': _cmd_status,
+        '/version': _cmd_version,
+        '/sync': _cmd_sync,
+        '/notify': _cmd_notify,
+        '/quit': _cmd_quit,
+        '/d_recv': _cmd_d_recv,
+        '/d_load': _cmd_d_load,
+        '/d_loadDir': _cmd_d_load,
+        '/s_new': _cmd_s_new,
+        '/s_get': _cmd_s_get,
+        '/s_getn': _cmd_s_getn,
+        '/g_new': _cmd_g_new,
+        '/g_freeAll': _cmd_g_free_all,
+        '/g_deepFree': _cmd_g_deep_free,
+        '/n_free': _cmd_n_free,
+        '/n_set': _cmd_n_set,
+        '/n_query': _cmd_n_query,
+        '/b_alloc': _cmd_b_alloc,
+        '/b_free': _cmd_b_free,
+        '/b_zero': _cmd_b_zero,
+        '/b_query': _cmd_b_query,
+        '/b_set': _cmd_b_set,
+        '/b_setn': _cmd_b_setn,
+        '/b_fill': _cmd_b_fill,
+        '/b_get': _cmd_b_get,
+        '/b_getn': _cmd_b_getn,
+        '/c_set': _cmd_c_set,
+        '/c_setn': _cmd_c_setn,
+        '/c_fill': _cmd_c_fill,
+        '/c_get': _cmd_c_get,
+        '/c_getn': _cmd_c_getn,
+    }
+
+
+class _Node():
+    __slots__ = ('id', 'parent', 'is_group', 'children', 'def_name',
+                 'controls')
+
+    def __init__(self, id, parent, is_group):
+        self.id = id
+        self.parent = parent
+        self.is_group = is_group
+        self.children = []
+        self.def_name = None
+        self.controls = dict()
+
+
+class _Buffer():
+    __slots__ = ('frames', 'channels', 'data')
+
+    def __init__(self, frames, channels):
+        self.frames = frames
+        self.channels = channels
+        self.data = array.array('f', bytes(4 * frames * channels))
@@ -8,6 +8,7 @@
 # instance of the same type.
 
 import inspect
+import math
 
 from ..base import _hooks as hks
 from ..base import utils as utl
@@ -523,6 +524,50 @@ class SynthObject(gpp.UGenParameter, metaclass=MetaSynthObject):
         return False
 
 
+    ### Common subexpression elimination and constant folding ###
+
+    def _merge_key(self):  # pong
+        '''
+        Return a hashable key of the computation of the ugen, ugens with the
+        same key output the same signal and can be merged. None if the ugen
+        has side effects or internal state that depends on randomness.
+        '''
+        return None
+
+    def _default_merge_key(self):
+        if self.rate == 'demand':
+            return None
+        key = []
+        for input in self._inputs:
+            if isinstance(input, OutputProxy):
+                key.append((id(input.source_ugen), input._output_index))
+            elif isinstance(input, SynthObject):
+                key.append((id(input), -1))
+            elif isinstance(input, (int, float)):
+                key.append(float(input))
+            else:
+                return None
+        return (type(self), self.rate, self._special_index,
+                len(self._channels), tuple(key))
+
+    def _commutative_merge_key(self):
+        # Inputs key is sorted so a * b and b * a are the same.
+        key = self._default_merge_key()
+        if key is None:
+            return None
+        return (*key[:-1], tuple(sorted(key[-1], key=repr)))
+
+    def _constant_folding(self):  # pong
+        '''Return the value if the ugen only operates on constants.'''
+        return None
+
+    def _constant_inputs(self):
+        for input in self._inputs:
+            if not isinstance(input, (int, float)):
+                return False
+        return True
+
+
     ### SynthDesc interface ###
 
     # def _writes_to_bus(self):
@@ -826,9 +871,16 @@ class UGen(SynthObject, aob.AbstractObject):
 class PureUGenMixin():
     # // UGen which has no side effect and can therefore be considered for
     # // a dead code elimination. Read access to buffers/busses are allowed.
+    _mergeable = True  # False if the ugen uses a random generator.
+
     def _optimize_graph(self):  # override
         self._perform_dead_code_elimination()
 
+    def _merge_key(self):  # override
+        if self._mergeable:
+            return self._default_merge_key()
+        return None
+
 
 class MultiOutUGen(UGen):
     @property
@@ -940,8 +992,41 @@ class PseudoUGen(SynthObject):
 
 ### BasicOpUGens.sc ###
 
+# Operators that output a different value for each instance.
+_random_operators = {
+    'rand', 'rand2', 'linrand', 'bilinrand', 'sum3rand', 'coin',
+    'rrand', 'exprand'}
+
+_commutative_operators = {'+', '*', 'min', 'max', '==', '!='}
+
+# Operators that can be evaluated in the language with the same result.
+_unary_folding = {
+    'neg': lambda a: -a,
+    'abs': abs,
+    'squared': bi.squared,
+    'cubed': bi.cubed,
+    'reciprocal': bi.reciprocal,
+    'midicps': bi.midicps,
+    'cpsmidi': bi.cpsmidi,
+    'midiratio': bi.midiratio,
+    'ratiomidi': bi.ratiomidi,
+    'dbamp': bi.dbamp,
+    'ampdb': bi.ampdb,
+    'octcps': bi.octcps,
+    'cpsoct': bi.cpsoct}
+
+_binary_folding = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b,
+    'min': min,
+    'max': max}
+
+
 class BasicOpUGen(UGen):
     _default_rate = None
+    _folding_operators = dict()
 
     def __init__(self):
         super().__init__()
@@ -1002,11 +1087,30 @@ class BasicOpUGen(UGen):
     def _dump_name(self):  # override
         return str(self._synth_index) + '_' + self.operator
 
+    def _merge_key(self):  # override
+        if self.operator in _random_operators:
+            return None
+        if self.operator in _commutative_operators:
+            return self._commutative_merge_key()
+        return self._default_merge_key()
+
+    def _constant_folding(self):  # override
+        func = self._folding_operators.get(self.operator)
+        if func is None or not self._constant_inputs():
+            return None
+        try:
+            value = float(func(*self._inputs))
+        except (ArithmeticError, ValueError):
+            return None
+        return value if math.isfinite(value) else None
+
     def __repr__(self):
         return f'{type(self).__name__}.new{self.operator, *self.inputs}'
 
 
 class UnaryOpUGen(BasicOpUGen):
+    _folding_operators = _unary_folding
+
     @classmethod
     def new(cls, selector, a):
         return cls._multi_new('audio', selector, a)
@@ -1029,6 +1133,8 @@ class UnaryOpUGen(BasicOpUGen):
 
 
 class BinaryOpUGen(BasicOpUGen):
+    _folding_operators = _binary_folding
+
     @classmethod
     def _new1(cls, rate, selector, a, b):  # override
         a_cmp = a if isinstance(a, (int, float)) else None
@@ -1259,8 +1365,6 @@ class BinaryOpUGen(BasicOpUGen):
                 input._descendants.discard(self)
                 input._descendants.discard(deleted_unit)
 
-    # def _constant_folding(self):  # Usage commented out in sclang.
-    #     ...
 
 
 class MulAdd(UGen):
@@ -1298,6 +1402,15 @@ class MulAdd(UGen):
         self._rate = gpp.ugen_param(self.inputs)._as_ugen_rate()
         return self  # Must return self.
 
+    def _merge_key(self):  # override
+        return self._default_merge_key()
+
+    def _constant_folding(self):  # override
+        if self._constant_inputs():
+            input, mul, add = self._inputs
+            return float(input * mul + add)
+        return None
+
     @classmethod
     def _can_be_muladd(cls, input, mul, add):
         # // see if these inputs satisfy the constraints of a MulAdd ugen.
@@ -1332,6 +1445,14 @@ class Sum3(UGen):
 
         return super()._new1(rate, *arg_list)
 
+    def _merge_key(self):  # override
+        return self._commutative_merge_key()
+
+    def _constant_folding(self):  # override
+        if self._constant_inputs():
+            return float(sum(self._inputs))
+        return None
+
 
 class Sum4(UGen):
     _default_rate = None
@@ -1356,3 +1477,11 @@ class Sum4(UGen):
         arg_list.sort(key=lambda x: gpp.ugen_param(x)._as_ugen_rate())  # NOTE: Why sort?
 
         return super()._new1(rate, *arg_list)
+
+    def _merge_key(self):  # override
+        return self._commutative_merge_key()
+
+    def _constant_folding(self):  # override
+        if self._constant_inputs():
+            return float(sum(self._inputs))
+        return None
@@ -386,6 +386,8 @@ class SelectXFocus(ugn.PseudoUGen):
 
 
 class Vibrato(ugn.PureUGenMixin, ugn.UGen):
+    _mergeable = False  # Rate and depth variations are random.
+
     @classmethod
     def ar(cls, freq=440.0, rate=6, depth=0.02, delay=0.0, onset=0.0,
            rate_variation=0.04, depth_variation=0.1, iphase=0.0, trig=0.0):
@@ -0,0 +1,136 @@
+
+import unittest
+import asyncio
+import socket
+import threading
+
+import sc3
+sc3.LIB_OSC_BACKEND = 'asyncio'
+sc3.init()
+
+from sc3.base.main import main
+from sc3.base.netaddr import NetAddr
+from sc3.base.responders import OscFunc
+from sc3.base._replies import ReplyTable
+from sc3.base import _oscinterface as osci
+
+
+class AsyncioInterfaceTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Stand-in for the server replies sent back to the language.
+        cls.addr = NetAddr('127.0.0.1', NetAddr.lang_port())
+        cls.stand_ins = [
+            OscFunc(lambda msg, *_: cls.addr.send_msg(
+                '/synced', msg[1]), '/sync'),
+            OscFunc(lambda msg, *_: cls.addr.send_msg(
+                '/c_set', msg[1], msg[1] * 0.5), '/c_get')]
+
+    @classmethod
+    def tearDownClass(cls):
+        for f in cls.stand_ins:
+            f.free()
+        ReplyTable.get(cls.addr).free()
+
+    def test_interface(self):
+        self.assertIsInstance(main._osc_interface, osci.OscAsyncioInterface)
+        done = threading.Event()
+        result = []
+
+        def func(msg, *_):
+            result.append(msg)
+            if len(result) == 100:
+                done.set()
+
+        f = OscFunc(func, '/aio')
+        for i in range(100):
+            self.addr.send_msg('/aio', i)
+        done.wait(2)
+        f.free()
+        self.assertEqual(result, [['/aio', i] for i in range(100)])
+
+    def test_async_sync(self):
+        async def test():
+            await asyncio.wait_for(asyncio.gather(
+                *[self.addr.async_sync() for _ in range(50)]), 2)
+            elements = [['/c_set', i, 0.0] for i in range(1000)]
+            await asyncio.wait_for(self.addr.async_sync(None, elements), 2)
+
+        asyncio.run(test())
+        self.assertEqual(ReplyTable.get(self.addr).num_pending, 0)
+
+    def test_async_sync_clumps(self):
+        elements = [['/c_set', i, 0.0] for i in range(5000)]
+        self.assertGreater(len(self.addr._clump_bundle(
+            0, None, elements, NetAddr._SYNC_BNDL_DGRAM_SIZE)), 1)
+
+        async def test():
+            await asyncio.wait_for(self.addr.async_sync(None, elements), 2)
+
+        asyncio.run(test())
+        self.assertEqual(ReplyTable.get(self.addr).num_pending, 0)
+
+    def test_reply_keys(self):
+        table = ReplyTable.get(self.addr)
+
+        async def get(index):
+            future = table.expect('/c_set', [index])
+            self.addr.send_msg('/c_get', index)
+            return (await future)[2]
+
+        async def test():
+            return await asyncio.wait_for(
+                asyncio.gather(*[get(i) for i in range(20)]), 2)
+
+        self.assertEqual(asyncio.run(test()), [i * 0.5 for i in range(20)])
+        self.assertEqual(table.num_pending, 0)
+
+    def test_reply_cancel(self):
+        table = ReplyTable.get(self.addr)
+
+        async def test():
+            future = table.expect('/never', [1])
+            self.assertEqual(table.num_pending, 1)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(future, 0.05)
+            await asyncio.sleep(0)
+
+        asyncio.run(test())
+        self.assertEqual(table.num_pending, 0)
+
+    def test_tcp_stream(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+
+        def echo():
+            conn, _ = server.accept()
+            while data := conn.recv(65536):
+                conn.sendall(data)
+            conn.close()
+
+        threading.Thread(target=echo, daemon=True).start()
+        addr = NetAddr(*server.getsockname())
+        addr._osc_interface = osci.OscAsyncioTcpInterface(57200, 100)
+        addr._osc_interface.bind()
+        addr._osc_interface.connect(addr._target)
+        done = threading.Event()
+        result = []
+
+        def func(msg, *_):
+            result.append(msg[1])
+            if len(result) == 500:
+                done.set()
+
+        f = OscFunc(func, '/tcp')
+        for i in range(500):
+            addr.send_msg('/tcp', i)
+        done.wait(2)
+        f.free()
+        addr._osc_interface.disconnect()
+        server.close()
+        self.assertEqual(result, list(range(500)))
+
+
+if __name__ == '__main__':
+    unittest.main()
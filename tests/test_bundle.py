@@ -29,10 +29,13 @@ class BundleTestCase(unittest.TestCase):
         ]
         expected_value = [
             oscaddr, 0, 1, 0, 0,
-            b'/msg\x00\x00\x00\x00,\x00\x00\x00',
-            b'#bundle\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00'
-            b'\x00\x00\x0c/msg\x00\x00\x00\x00,\x00\x00\x00',
-            [0.75, 'string', 1, 0, b'/msg\x00\x00\x00\x00,\x00\x00\x00'],
+            # Blobs are received as memoryview slices of the datagram.
+            memoryview(b'/msg\x00\x00\x00\x00,\x00\x00\x00'),
+            memoryview(
+                b'#bundle\x00\x00\x00\x00\x00\x00\x00\x00\x01\x00'
+                b'\x00\x00\x0c/msg\x00\x00\x00\x00,\x00\x00\x00'),
+            [0.75, 'string', 1, 0,
+             memoryview(b'/msg\x00\x00\x00\x00,\x00\x00\x00')],
         ]
         result = None
 
@@ -60,6 +63,41 @@ class BundleTestCase(unittest.TestCase):
             n._calc_bndl_dgram_size(test_data[1:]),
             len(n._osc_interface._build_bundle(0, test_data).dgram))
 
+    def test_clump_bundle(self):
+        n = NetAddr('127.0.0.1', NetAddr.lang_port())
+        elements = [['/c_set', i, 0.5, 'x' * (i % 7)] for i in range(5000)]
+        elements.append([None, ['/c_set', -1, 0.5]])
+        reserve = NetAddr._SYNC_BNDL_DGRAM_SIZE
+        clumps = n._clump_bundle(0, None, elements, reserve)
+        self.assertGreater(len(clumps), 1)
+        for item in clumps:
+            size = 16 + sum(len(d) + 4 for d in item)
+            self.assertLessEqual(size, NetAddr._MAX_UDP_DGRAM_SIZE - reserve)
+        self.assertEqual(
+            [d for item in clumps for d in item],
+            [n._osc_interface._build_msg(0, e).dgram for e in elements[:-1]]
+            + [n._osc_interface._build_bundle(0, elements[-1]).dgram])
+        self.assertEqual(n._clump_bundle(0, None, []), [[]])
+        self.assertRaises(
+            ValueError, n._clump_bundle, 0, 1, [[0.5, ['/msg', 2]]])
+
+    def test_send_clumped_bundles(self):
+        n = NetAddr('127.0.0.1', NetAddr.lang_port())
+        oscaddr = '/clumped'
+        result = []
+
+        def func(msg, *_):
+            result.append(msg[1])
+            if len(result) == 2000:
+                main.resume()
+
+        o = OscFunc(func, oscaddr)
+        n.send_clumped_bundles(
+            None, *[[oscaddr, i, 'x' * 40] for i in range(2000)])
+        main.wait()
+        self.assertEqual(result, list(range(2000)))
+        o.free()
+
     @unittest.skipIf(sys.platform.startswith('darwin'), "OSX's UDP packet size is known to be shorter")
     def test_max_dgram_size(self):
         oscaddr = '/'
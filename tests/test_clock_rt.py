@@ -1,12 +1,13 @@
 
 import unittest
 import math
+import threading
 
 import sc3
 sc3.init('rt')
 
 from sc3.base.main import main
-from sc3.base.clock import SystemClock, TempoClock
+from sc3.base.clock import SystemClock, TempoClock, WakeupPolicy
 from sc3.base.stream import routine
 from sc3.base.netaddr import NetAddr
 from sc3.base.responders import OscFunc
@@ -80,6 +81,85 @@ class ClockTestCase(unittest.TestCase):
         example.play()
         main.wait()
 
+    def test_multiplexed(self):
+        TempoClock.multiplexed = True
+        try:
+            clocks = [TempoClock(tempo) for tempo in (100, 200, 400)]
+        finally:
+            TempoClock.multiplexed = False
+        self.assertEqual(len({c._thread for c in clocks}), 1)
+        beats = {c: [] for c in clocks}
+
+        def r(clock):
+            @routine
+            def _():
+                for _ in range(10):
+                    beats[clock].append(clock.beats)
+                    yield 1
+                main.resume()
+            return _
+
+        for clock in clocks:
+            r(clock).play(clock)
+        clocks[1].tempo = 300  # Reschedule from main thread.
+        self.assertTrue(main.wait(2, tasks=len(clocks)), 'test time expired')
+        for clock in clocks:
+            with self.subTest(clock=clock):
+                self.assertEqual(len(beats[clock]), 10)
+                for i, (a, b) in enumerate(zip(beats[clock], beats[clock][1:])):
+                    self.assertTrue(math.isclose(b - a, 1))
+            clock.stop()
+            self.assertFalse(clock.running())
+
+    def test_wakeup_policy(self):
+        n = 20
+        for policy in (WakeupPolicy(0.005, 'spin'), WakeupPolicy(0.005, 'yield')):
+            SystemClock.wakeup_policy = policy
+            SystemClock.lateness.reset()
+
+            @routine
+            def r():
+                for _ in range(n):
+                    yield 0.001
+                main.resume()
+
+            r.play(SystemClock)
+            self.assertTrue(main.wait(2), 'test time expired')
+            with self.subTest(policy=policy):
+                self.assertEqual(SystemClock.lateness.total, n + 1)
+                self.assertEqual(sum(SystemClock.lateness.counts), n + 1)
+                self.assertGreaterEqual(SystemClock.lateness.max, 0.0)
+        SystemClock.wakeup_policy = WakeupPolicy()
+        with self.assertRaises(ValueError):
+            WakeupPolicy(0.001, 'sleep')
+        with self.assertRaises(ValueError):
+            WakeupPolicy(-0.001, 'spin')
+        with self.assertRaises(ValueError):
+            WakeupPolicy(0.001)._replace(mode='busy')
+        self.assertEqual(
+            WakeupPolicy(mode='spin')._replace(guard=1), (1.0, 'spin'))
+
+    def test_inbound_flood(self):
+        # Each incoming message queues another one, there are always
+        # messages pending when the clock checks for due tasks.
+        stop = threading.Event()
+
+        def message():
+            if not stop.is_set():
+                SystemClock._inbound_put([(message, ())])
+
+        times = []
+        done = threading.Event()
+        try:
+            SystemClock._inbound_put([(message, ())] * 8)
+            start = main.elapsed_time()
+            SystemClock.sched(0.05, lambda: (
+                times.append(main.elapsed_time()), done.set()))
+            self.assertTrue(done.wait(1), 'task not run during flood')
+        finally:
+            stop.set()
+        self.assertLess(times[0] - start, 0.5)
+
     def test_logical_and_bundle_time(self):
         ltime = []
         btime = []
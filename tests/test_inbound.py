@@ -0,0 +1,65 @@
+import unittest
+import threading
+
+from sc3.base._inbound import InboundQueue
+
+
+def noop():
+    pass
+
+
+class InboundQueueTestCase(unittest.TestCase):
+    def test_drop_oldest(self):
+        q = InboundQueue(4, 'drop_oldest')
+        q._put([(noop, (i,)) for i in range(10)], noop)
+        self.assertEqual(q.depth, 4)
+        self.assertEqual([e[1][0] for e in q._drain()], [6, 7, 8, 9])
+        self.assertEqual(q.received, 10)
+        self.assertEqual(q.drops, 6)
+        self.assertEqual(q.overflows, 6)
+        self.assertEqual(q.max_depth, 4)
+        self.assertFalse(q)
+
+    def test_count(self):
+        q = InboundQueue(4, 'count')
+        q._put([(noop, (i,)) for i in range(10)], noop)
+        self.assertEqual(q.depth, 10)
+        self.assertEqual(q.drops, 0)
+        self.assertEqual(q.overflows, 6)
+        self.assertEqual([e[1][0] for e in q._drain(3)], [0, 1, 2])
+        self.assertEqual(len(q._drain()), 7)
+        q.reset()
+        self.assertEqual(q.received, 0)
+
+    def test_block(self):
+        q = InboundQueue(2, 'block')
+        result = []
+        done = threading.Event()
+
+        def consume():
+            while not done.is_set() or q:
+                result.extend(e[1][0] for e in q._drain())
+
+        thread = threading.Thread(target=consume, daemon=True)
+        thread.start()
+        q._put([(noop, (i,)) for i in range(100)], noop)
+        done.set()
+        thread.join(2)
+        self.assertEqual(result, list(range(100)))
+        self.assertEqual(q.drops, 0)
+        self.assertLessEqual(q.max_depth, 2)
+
+    def test_closed(self):
+        q = InboundQueue(1, 'block')
+        q._close()
+        q._put([(noop, (i,)) for i in range(3)], noop)
+        self.assertEqual(q.depth, 1)
+        self.assertEqual(q.drops, 2)
+
+    def test_policy(self):
+        with self.assertRaises(ValueError):
+            InboundQueue(policy='drop_newest')
+
+
+if __name__ == '__main__':
+    unittest.main()
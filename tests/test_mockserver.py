@@ -0,0 +1,137 @@
+
+import unittest
+import socket
+import struct
+import threading
+
+import sc3
+sc3.init()
+
+from sc3.base.main import main
+from sc3.base._osclib import OscPacket, encode_message
+from sc3.synth.server import Server
+from sc3.synth.bus import ControlBus
+from sc3.synth.testing import MockServer
+
+
+class MockServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockServer()
+        self.mock.start()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(1)
+
+    def tearDown(self):
+        self.sock.close()
+        self.mock.stop()
+
+    def send(self, *msg):
+        self.sock.sendto(
+            encode_message(msg[0], msg[1:]), ('127.0.0.1', self.mock.port))
+
+    def receive(self):
+        msg = OscPacket(self.sock.recv(65536)).messages[0].message
+        return [msg.address, *msg]
+
+    def test_replies(self):
+        self.send('/status')
+        reply = self.receive()
+        self.assertEqual(reply[:6], ['/status.reply', 1, 0, 0, 1, 0])
+        self.send('/sync', 12)
+        self.assertEqual(self.receive(), ['/synced', 12])
+        self.send('/b_alloc', 3, 16, 2)
+        self.assertEqual(self.receive(), ['/done', '/b_alloc', 3])
+        self.send('/b_setn', 3, 4, 2, 0.5, 0.25)
+        self.send('/b_getn', 3, 3, 4)
+        self.assertEqual(
+            self.receive(), ['/b_setn', 3, 3, 4, 0.0, 0.5, 0.25, 0.0])
+        self.send('/b_query', 3)
+        self.assertEqual(self.receive(), ['/b_info', 3, 16, 2, 48000.0])
+        self.send('/c_set', 10, 0.5, 11, 1.5)
+        self.send('/c_getn', 10, 2)
+        self.assertEqual(self.receive(), ['/c_setn', 10, 2, 0.5, 1.5])
+        self.send('/b_getn', 4, 0, 1)
+        self.assertEqual(self.receive()[:2], ['/fail', '/b_getn'])
+
+    def test_nodes(self):
+        self.send('/notify', 1)
+        self.assertEqual(self.receive(), ['/done', '/notify', 0, 32])
+        self.send('/notify', 1)
+        self.assertEqual(
+            self.receive(), ['/fail', '/notify', 'already registered', 0])
+        self.send('/g_new', 1, 0, 0)
+        self.assertEqual(self.receive(), ['/n_go', 1, 0, -1, -1, 1, -1, -1])
+        self.send('/s_new', 'default', 1000, 0, 1, 'freq', 440.0)
+        self.assertEqual(self.receive(), ['/n_go', 1000, 1, -1, -1, 0])
+        self.send('/s_new', 'default', 1001, 3, 1000)
+        self.assertEqual(self.receive(), ['/n_go', 1001, 1, 1000, -1, 0])
+        self.send('/s_get', 1000, 'freq')
+        self.assertEqual(self.receive(), ['/n_set', 1000, 'freq', 440.0])
+        self.send('/g_freeAll', 1)
+        self.assertEqual(self.receive(), ['/n_end', 1000, 1, -1, 1001, 0])
+        self.assertEqual(self.receive(), ['/n_end', 1001, 1, -1, -1, 0])
+        self.send('/sync', 1)
+        self.assertEqual(self.receive(), ['/synced', 1])
+        self.assertEqual(
+            [r.message[0] for r in self.mock.traffic],
+            ['/notify', '/notify', '/g_new', '/s_new', '/s_new',
+             '/s_get', '/g_freeAll', '/sync'])
+
+    def test_completion(self):
+        completion = encode_message('/s_new', ['default', -1, 0, 0])
+        self.send('/notify', 1)
+        self.receive()
+        header = b'SCgf' + struct.pack('>ih', 2, 1)
+        self.send('/d_recv', header, completion)
+        self.assertEqual(self.receive(), ['/done', '/d_recv'])
+        self.assertEqual(self.receive(), ['/n_go', -1000, 0, -1, -1, 0])
+
+    def test_loss(self):
+        self.mock.loss = 0.5
+        for i in range(100):
+            self.send('/sync', i)
+        self.send('/status')  # Flush.
+        self.sock.settimeout(0.2)
+        replies = []
+        try:
+            while True:
+                replies.append(self.receive())
+        except socket.timeout:
+            pass
+        self.assertEqual(self.mock.received, 101)
+        self.assertEqual(len(replies), 101 - self.mock.dropped)
+        self.assertTrue(0 < self.mock.dropped < 101)
+
+
+class MockServerClientTestCase(unittest.TestCase):
+    def test_tcp(self):
+        with MockServer(protocol='tcp', latency=0.01) as mock:
+            sock = socket.create_connection(('127.0.0.1', mock.port), 1)
+            dgram = encode_message('/sync', [5])
+            sock.sendall(struct.pack('>i', len(dgram)) + dgram)
+            size = struct.unpack('>i', sock.recv(4))[0]
+            msg = OscPacket(sock.recv(size)).messages[0].message
+            self.assertEqual([msg.address, *msg], ['/synced', 5])
+            sock.close()
+
+    def test_server(self):
+        with MockServer(latency=0.001) as mock:
+            server = Server('mock', mock.addr)
+            done = threading.Event()
+            server.register(lambda _: done.set())
+            self.assertTrue(done.wait(2))
+            self.assertTrue(main.sync(server, 1))
+            bus = ControlBus(2, server)
+            bus.setn([0.5, 0.25])
+            result = []
+            done.clear()
+            bus.getn(2, lambda values: (result.append(values), done.set()))
+            self.assertTrue(done.wait(1))
+            self.assertEqual(result, [[0.5, 0.25]])
+            done.clear()
+            server.unregister(lambda _: done.set())
+            self.assertTrue(done.wait(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+
+import unittest
+import errno
+import os
+import tempfile
+import threading
+import time
+
+import sc3
+sc3.init()
+
+from sc3.base.main import main
+from sc3.base.netaddr import NetAddr
+from sc3.base.responders import OscFunc
+from sc3.base._osclib import OscPacket, encode_message
+from sc3.base import _osccapture as cpt
+from sc3.synth.testing import MockServer
+
+
+class OscCaptureTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'capture')
+
+    def tearDown(self):
+        main._osc_interface.stop_capture()
+        self.dir.cleanup()
+
+    def test_capture(self):
+        addr = NetAddr('127.0.0.1', NetAddr.lang_port())
+        done = threading.Event()
+        received = []
+
+        def func(msg, *_):
+            received.append(msg)
+            if len(received) == 10:
+                done.set()
+
+        f = OscFunc(func, '/capture')
+        capture = main._osc_interface.start_capture(self.path)
+        for i in range(10):
+            addr.send_msg('/capture', i)
+        done.wait(1)
+        f.free()
+        main._osc_interface.stop_capture()
+        self.assertIsNone(main._osc_interface._capture)
+        records = cpt.read_capture(self.path)
+        self.assertEqual(len(records), capture.records)
+        for direction in (cpt.OUT, cpt.IN):
+            messages = [
+                OscPacket(r.dgram).messages[0].message
+                for r in records if r.direction == direction]
+            self.assertEqual([list(m) for m in messages][:10],
+                             [[i] for i in range(10)])
+        outgoing = [r for r in records if r.direction == cpt.OUT]
+        self.assertEqual(outgoing[0].addr, ('127.0.0.1', addr.port))
+        times = [r.time for r in records]
+        self.assertEqual(times, sorted(times))
+
+    def test_write_error(self):
+        class FullDisk():
+            def write(self, data):
+                raise OSError(errno.ENOSPC, 'No space left on device')
+
+            def close(self):
+                raise OSError(errno.ENOSPC, 'No space left on device')
+
+        addr = NetAddr('127.0.0.1', NetAddr.lang_port())
+        done = threading.Event()
+        received = []
+
+        def func(msg, *_):
+            received.append(msg)
+            if len(received) == 10:
+                done.set()
+
+        f = OscFunc(func, '/capture')
+        capture = main._osc_interface.start_capture(self.path)
+        capture._file.close()
+        capture._file = FullDisk()
+        with self.assertLogs('sc3.base._osccapture', 'ERROR'):
+            for i in range(10):
+                addr.send_msg('/capture', i)
+            # Receiving is not interrupted either.
+            self.assertTrue(done.wait(1))
+        f.free()
+        self.assertEqual(len(received), 10)
+        self.assertEqual(capture.records, 0)
+        self.assertIsNone(capture._file)
+
+    def test_ring(self):
+        capture = cpt.OscRingCapture(self.path, 16384, 4)
+        for i in range(1000):
+            capture.write(cpt.OUT, ('127.0.0.1', 57110),
+                          encode_message('/n_set', [i, 'freq', 440.0]), i)
+        records = cpt.read_capture(self.path)  # While open.
+        capture.close()
+        self.assertEqual(records, cpt.read_capture(self.path))
+        indexes = [OscPacket(r.dgram).messages[0].message.params[0]
+                   for r in records]
+        self.assertEqual(indexes[-1], 999)
+        self.assertEqual(indexes, list(range(indexes[0], 1000)))
+        self.assertGreater(len(indexes), 100)  # Older segments kept.
+        self.assertEqual([r.time for r in records], indexes)
+
+    def test_replay(self):
+        records = [
+            cpt.CaptureRecord(
+                i * 0.02, cpt.OUT, ('127.0.0.1', 57110),
+                encode_message('/sync', [i]))
+            for i in range(10)]
+        records.append(cpt.CaptureRecord(
+            0.0, cpt.IN, ('127.0.0.1', 57110), encode_message('/status', [])))
+        with MockServer() as mock:
+            t0 = time.perf_counter()
+            self.assertEqual(cpt.replay(records, ('127.0.0.1', mock.port)), 10)
+            self.assertGreaterEqual(time.perf_counter() - t0, 0.18)
+            t0 = time.perf_counter()
+            cpt.replay(records, ('127.0.0.1', mock.port), None)
+            self.assertLess(time.perf_counter() - t0, 0.1)
+            time.sleep(0.1)
+            self.assertEqual(
+                [r.message for r in mock.traffic],
+                [['/sync', i] for i in range(10)] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -160,6 +160,66 @@ class OscFuncTestCase(unittest.TestCase):
         self.assertFalse(oscf.enabled)
         self.assertTrue(test_ok, 'test time expired')
 
+    def test_arg_template_index(self):
+        osc_addr = '/arg_index_msg'
+        dispatcher = OscFunc._default_dispatcher
+        addr = NetAddr(*NetAddr.lang_endpoints()[0][:2])
+        result = []
+
+        def make_func(i):
+            return lambda msg: result.append((i, msg[1]))
+
+        funcs = [
+            OscFunc(make_func(i), osc_addr, arg_template=[i, 'x'])
+            for i in range(1000)]
+        funcs.append(OscFunc(
+            make_func('any'), osc_addr, arg_template=[None, 'x']))
+        funcs.append(OscFunc(
+            make_func('odd'), osc_addr, arg_template=[lambda v: v % 2]))
+        self.assertEqual(len(dispatcher._arg_index[osc_addr]), 1000)
+        self.assertEqual(len(dispatcher._unindexed[osc_addr]), 2)
+
+        dispatcher([osc_addr, 7, 'x'], 0.0, addr, addr.port)
+        self.assertEqual(set(result), {(7, 7), ('any', 7), ('odd', 7)})
+        result.clear()
+        dispatcher([osc_addr, 8.0, 'y'], 0.0, addr, addr.port)
+        self.assertEqual(result, [])
+
+        funcs[7].free()
+        dispatcher([osc_addr, 7, 'x'], 0.0, addr, addr.port)
+        self.assertEqual(set(result), {('any', 7), ('odd', 7)})
+        self.assertNotIn(7, dispatcher._arg_index[osc_addr])
+        for f in funcs:
+            f.free()
+        self.assertNotIn(osc_addr, dispatcher._arg_index)
+        self.assertNotIn(osc_addr, dispatcher._unindexed)
+        self.assertNotIn(osc_addr, dispatcher.active)
+
+    def test_arg_template_order(self):
+        # Indexed and unindexed functions are evaluated in registration order.
+        osc_addr = '/arg_order_msg'
+        dispatcher = OscFunc._default_dispatcher
+        addr = NetAddr(*NetAddr.lang_endpoints()[0][:2])
+        result = []
+
+        def make_func(name):
+            return lambda msg: result.append(name)
+
+        funcs = [
+            OscFunc(make_func('a'), osc_addr),
+            OscFunc(make_func('b'), osc_addr, arg_template=[1]),
+            OscFunc(make_func('c'), osc_addr, arg_template=[None]),
+            OscFunc(make_func('d'), osc_addr, arg_template=[1])]
+
+        dispatcher([osc_addr, 1], 0.0, addr, addr.port)
+        self.assertEqual(result, ['a', 'b', 'c', 'd'])
+        result.clear()
+        funcs[1].func = make_func('B')
+        dispatcher([osc_addr, 1], 0.0, addr, addr.port)
+        self.assertEqual(result, ['a', 'B', 'c', 'd'])
+        for f in funcs:
+            f.free()
+
     # def test_trace(self):
     #     ...
 
@@ -0,0 +1,145 @@
+import unittest
+import enum
+import random
+
+from sc3.base import _osclib as oli
+
+
+def build(address, args):
+    builder = oli.OscMessageBuilder(address)
+    for arg in args:
+        builder.add_arg(arg)
+    return builder.build().dgram
+
+
+class OscEncoderTestCase(unittest.TestCase):
+    def test_same_as_builder(self):
+        cases = [
+            ['/'],
+            ['/status'],
+            ['/n_set', 1000, 'freq', 440.0, 'amp', 0.1],
+            ['/s_new', 'default', -1, 0, 1, 'freq', 220, 'pan', -0.5],
+            ['/b_setn', 0, 0, 4, 0.1, 0.2, 0.3, 0.4],
+            ['/d_recv', b'SCgf\x00\x00\x00\x02', 0],
+            ['/blob', b'x', bytearray(b'yz'), memoryview(b'abc'), b'abcd'],
+            ['/str', '', 'a', 'ab', 'abc', 'abcd', 'ñandú'],
+            ['/bool', True, False],
+            ['/midi', (1, 0x90, 60, 127)],
+            ['/array', [1, 2.5, 'x', [3, b'y']], 4],
+            ['/int', 2**31 - 1, -2**31],
+        ]
+        rnd = random.Random(0)
+        for _ in range(200):
+            args = [
+                rnd.choice([
+                    lambda: rnd.randint(-1000, 1000),
+                    lambda: rnd.random(),
+                    lambda: 'x' * rnd.randint(0, 9),
+                    lambda: b'y' * rnd.randint(1, 9)])()
+                for _ in range(rnd.randint(0, 12))]
+            cases.append(['/rnd' + 'z' * rnd.randint(0, 4), *args])
+        for i, case in enumerate(cases):
+            with self.subTest(case=i):
+                dgram = oli.encode_message(case[0], case[1:])
+                self.assertEqual(dgram, build(case[0], case[1:]))
+                msg = oli.OscMessage(dgram)
+                self.assertEqual(msg.address, case[0])
+
+    def test_numeric(self):
+        self.assertIsNone(oli.encode_numeric_message('/x', [1, 'a']))
+        self.assertIsNone(oli.encode_numeric_message('/x', [True]))
+        self.assertIsNone(oli.encode_numeric_message('/x', [None]))
+        self.assertEqual(oli.encode_message('/x', [None]), build('/x', [None]))
+        args = [1, 2.0, -3, 0.5]
+        dgram = oli.encode_numeric_message('/x', args)
+        self.assertEqual(dgram, build('/x', args))
+        self.assertEqual(oli.OscMessage(dgram).params, args)
+
+    def test_subclasses(self):
+        class Name(str, enum.Enum):
+            FREQ = 'freq'
+
+        class Id(enum.IntEnum):
+            NODE = 1000
+
+        class Amp(float):
+            pass
+
+        args = [Id.NODE, Name.FREQ, 440.0, 'amp', Amp(0.5), [Name.FREQ]]
+        dgram = oli.encode_message('/n_set', args)
+        self.assertEqual(dgram, build('/n_set', args))
+        self.assertEqual(
+            oli.OscMessage(dgram).params,
+            [1000, 'freq', 440.0, 'amp', 0.5, ['freq']])
+
+    def test_errors(self):
+        with self.assertRaises(oli.OscMessageBuildError):
+            oli.encode_message('', [1])
+        with self.assertRaises(oli.OscMessageBuildError):
+            oli.encode_message('/x', [2**32])
+        with self.assertRaises(oli.OscMessageBuildError):
+            oli.encode_message('/x', [b''])
+        with self.assertRaises(ValueError):
+            oli.encode_message('/x', [object()])
+
+
+class OscParserTestCase(unittest.TestCase):
+    def test_lazy_arguments(self):
+        dgram = build('/n_set', [1000, 'freq', 440.0, b'abc', [1, 'x']])
+        msg = oli.OscMessage(dgram)
+        self.assertEqual(msg.address, '/n_set')
+        self.assertIsNone(msg._parameters)
+        params = msg.params
+        self.assertEqual(params, [1000, 'freq', 440.0, b'abc', [1, 'x']])
+        self.assertIsInstance(params[3], memoryview)
+        self.assertIs(params[3].obj, dgram)
+
+    def test_same_as_get_functions(self):
+        cases = [
+            ['/'],
+            ['/str', '', 'a', 'ab', 'abc', 'abcd', 'ñandú'],
+            ['/blob', b'x', b'yz', b'abc', b'abcd', b'abcde'],
+            ['/num', 1, -2, 0.5, -0.25, True, False],
+            ['/midi', (1, 0x90, 60, 127)],
+        ]
+        for i, case in enumerate(cases):
+            with self.subTest(case=i):
+                msg = oli.OscMessage(build(case[0], case[1:]))
+                self.assertEqual(msg.params, case[1:])
+
+    def test_bundle_in_place(self):
+        builder = oli.OscBundleBuilder(2**32)
+        builder.add_content(oli.OscMessageBuilder('/a').build())
+        inner = oli.OscBundleBuilder(oli.IMMEDIATELY)
+        inner.add_content(oli.OscMessage(build('/b', [b'blob', 2])))
+        builder.add_content(inner.build())
+        dgram = builder.build().dgram
+        packet = oli.OscPacket(dgram)
+        self.assertEqual(
+            [(tm.time, tm.message.address) for tm in packet.messages],
+            [(oli.IMMEDIATELY, '/b'), (2**32, '/a')])
+        b = packet.messages[0].message
+        self.assertIs(b._dgram, dgram)
+        self.assertEqual(b.params, [b'blob', 2])
+        self.assertIs(b.params[0].obj, dgram)
+        self.assertEqual(b.dgram, build('/b', [b'blob', 2]))
+        # Blobs with packets can be parsed again.
+        outer = oli.OscMessage(build('/c', [dgram]))
+        self.assertEqual(len(oli.OscPacket(outer.params[0]).messages), 2)
+
+    def test_parse_errors(self):
+        dgram = build('/x', [1, 'abc', b'abcd'])
+        for end in (2, 8, 14, 18, len(dgram) - 1):
+            with self.subTest(end=end):
+                with self.assertRaises(oli.OscParseError):
+                    oli.OscMessage(dgram[:end]).params
+        with self.assertRaises(oli.OscBundleParseError):
+            oli.OscBundle(b'#bundle\x00\x00\x00')
+        bndl = oli.OscBundleBuilder(1)
+        bndl.add_content(oli.OscMessage(dgram))
+        with self.assertRaises(oli.OscBundleParseError):
+            oli.OscBundle(bndl.build().dgram[:-4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+
+import unittest
+
+from sc3.base import _oscmatch as omt
+
+
+class OscMatchTestCase(unittest.TestCase):
+    cases = [
+        ('/m?t{ch,Ch}[a-z]n[!a-f]_*', '/matChing_msg', True),
+        ('/synth/*/freq', '/synth/1000/freq', True),
+        ('/synth/*/freq', '/synth/1000/amp', False),
+        ('/synth/*', '/synth/1000/freq', False),
+        ('/*/*/freq', '/synth/1000/freq', True),
+        ('/b_set[nt]', '/b_setn', True),
+        ('/b_set[nt]', '/b_set', False),
+        ('/n_[a-z]', '/n_go', False),
+        ('/n_??', '/n_go', True),
+        ('/abc', '/abcd', False),
+        ('/a+b', '/a+b', True),
+        ('/a[', '/a[', False),
+    ]
+
+    def test_osc_match(self):
+        for pattern, address, result in self.cases:
+            with self.subTest(pattern=pattern, address=address):
+                self.assertIs(omt.osc_match(pattern, address), result)
+
+    def test_compile_cache(self):
+        compiled = omt.compile_pattern('/synth/*/freq')
+        self.assertIs(omt.compile_pattern('/synth/*/freq'), compiled)
+        self.assertEqual(compiled[:2], ('', 'synth'))
+        self.assertTrue(callable(compiled[2]))
+
+    def test_trie(self):
+        trie = omt.AddressTrie()
+        addresses = [
+            f'/synth/{i}/{p}' for i in range(100) for p in ('freq', 'amp')]
+        addresses.append('/synth')
+        for address in addresses:
+            trie.add(address)
+        trie.add('/synth')
+        self.assertEqual(len(trie), len(addresses))
+        self.assertIn('/synth/5/amp', trie)
+        self.assertNotIn('/synth/5', trie)
+        self.assertEqual(
+            sorted(trie.match('/synth/*/freq')),
+            sorted(a for a in addresses if a.endswith('/freq')))
+        self.assertEqual(list(trie.match('/synth/1[0-2]/amp')), [
+            '/synth/10/amp', '/synth/11/amp', '/synth/12/amp'])
+        self.assertEqual(list(trie.match('/synth')), ['/synth'])
+        for pattern, address, result in self.cases:
+            with self.subTest(pattern=pattern, address=address):
+                t = omt.AddressTrie()
+                t.add(address)
+                self.assertEqual(
+                    list(t.match(pattern)), [address] if result else [])
+
+    def test_trie_remove(self):
+        trie = omt.AddressTrie()
+        trie.add('/a/b/c')
+        trie.add('/a/b')
+        trie.remove('/a/b/c')
+        trie.remove('/a/x')
+        self.assertEqual(list(trie.match('/a/*')), ['/a/b'])
+        trie.remove('/a/b')
+        self.assertEqual(len(trie), 0)
+        self.assertEqual(trie._root, [dict(), False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+
+import unittest
+import socket
+import threading
+
+import sc3
+sc3.init()
+
+from sc3.base.main import main
+from sc3.base.netaddr import NetAddr, BundleNetAddr
+from sc3.base.clock import SystemClock, TempoClock
+from sc3.base._osclib import OscPacket
+
+
+class OutboundTestCase(unittest.TestCase):
+    def setUp(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(1)
+        self.addr = NetAddr(*self.sock.getsockname())
+        self.addr.aggregate = True
+
+    def tearDown(self):
+        self.addr.aggregate = False
+        self.sock.close()
+
+    def receive(self, n):
+        res = []
+        for _ in range(n):
+            res.append(OscPacket(self.sock.recv(65536)))
+        return res
+
+    def play(self, func, clock=SystemClock):
+        done = threading.Event()
+
+        def task():
+            func()
+            done.set()
+
+        clock.sched(0, task)
+        done.wait(1)
+        with main._main_lock:
+            pass  # Flushed within the awake call.
+
+    def test_group_by_timetag(self):
+        def func():
+            for i in range(20):
+                self.addr.send_bundle(0.2, ['/s_new', 'default', i])
+                self.addr.send_bundle(0.5, ['/n_set', i, 'gate', 0])
+                self.addr.send_msg('/n_run', i, 1)
+
+        self.play(func)
+        packets = self.receive(3)
+        self.assertEqual(
+            [m.message.address for m in packets[0].messages],
+            ['/s_new'] * 20)
+        self.assertEqual(
+            [list(m.message)[0] for m in packets[1].messages],
+            list(range(20)))
+        self.assertEqual(
+            [m.message.address for m in packets[2].messages],
+            ['/n_run'] * 20)
+        self.assertLess(packets[0].messages[0].time,
+                        packets[1].messages[0].time)
+        self.assertEqual(self.addr.outbound.elements, 60)
+        self.assertEqual(self.addr.outbound.datagrams, 3)
+
+    def test_single_message(self):
+        clock = TempoClock()
+        self.play(lambda: self.addr.send_msg('/status'), clock)
+        clock.stop()
+        timed_msg = self.receive(1)[0].messages[0]
+        self.assertIsNone(timed_msg.time)  # Not a bundle.
+        self.assertEqual(timed_msg.message.address, '/status')
+
+    def test_mtu_split(self):
+        def func():
+            for i in range(300):
+                self.addr.send_bundle(
+                    0.2, ['/b_setn', 0, i * 64, 64, *[0.5] * 64])
+
+        self.play(func)
+        packets = self.receive(2)
+        self.assertEqual(
+            sum(len(p.messages) for p in packets), 300)
+        self.assertEqual(self.addr.outbound.datagrams, 2)
+
+    def test_outside_clock(self):
+        self.addr.send_msg('/status')
+        self.assertEqual(
+            self.receive(1)[0].messages[0].message.address, '/status')
+        self.assertEqual(self.addr.outbound.elements, 0)
+
+
+
+class FanOutTestCase(unittest.TestCase):
+    def setUp(self):
+        self.socks = []
+        for _ in range(3):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(('127.0.0.1', 0))
+            sock.settimeout(1)
+            self.socks.append(sock)
+        self.addrs = [NetAddr(*sock.getsockname()) for sock in self.socks]
+
+    def tearDown(self):
+        for sock in self.socks:
+            sock.close()
+
+    def test_send_msg_many(self):
+        NetAddr.send_msg_many(self.addrs, '/g_freeAll', 0)
+        dgrams = [sock.recv(65536) for sock in self.socks]
+        self.assertEqual(dgrams, [dgrams[0]] * 3)
+        self.assertEqual(
+            OscPacket(dgrams[0]).messages[0].message.address, '/g_freeAll')
+
+    def test_send_bundle_many(self):
+        for threaded in (False, True):
+            with self.subTest(threaded=threaded):
+                NetAddr.send_bundle_many(
+                    self.addrs, 0.2, ['/n_set', 1, 'freq', 440.0],
+                    ['/n_set', 2, 'freq', 660.0], threaded=threaded)
+                dgrams = [sock.recv(65536) for sock in self.socks]
+                self.assertEqual(dgrams, [dgrams[0]] * 3)
+                self.assertEqual(len(OscPacket(dgrams[0]).messages), 2)
+
+    def test_fallback(self):
+        with BundleNetAddr(self.addrs[0]) as bndl:
+            NetAddr.send_msg_many([bndl, self.addrs[1]], '/status')
+        self.assertEqual(bndl.get_bundle(), [None, ['/status']])
+        self.assertEqual(
+            OscPacket(self.socks[1].recv(65536)).messages[0].message.address,
+            '/status')
+
+
+if __name__ == '__main__':
+    unittest.main()
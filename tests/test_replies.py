@@ -0,0 +1,146 @@
+
+import unittest
+import threading
+import time
+import types
+
+import sc3
+sc3.init()
+
+from sc3.base.main import main
+from sc3.base.clock import SystemClock
+from sc3.base.netaddr import NetAddr
+from sc3.base.responders import OscFunc
+from sc3.base.stream import Routine
+from sc3.base._replies import ReplyTable
+
+
+class ReplyTableTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Stand-in for the server replies sent back to the language.
+        cls.addr = NetAddr('127.0.0.1', NetAddr.lang_port())
+        cls.stand_ins = [
+            OscFunc(lambda msg, *_: cls.addr.send_msg(
+                '/synced', msg[1]), '/sync'),
+            OscFunc(lambda msg, *_: cls.addr.send_msg(
+                '/b_set', msg[1], msg[2], msg[1] + msg[2]), '/b_get')]
+
+    @classmethod
+    def tearDownClass(cls):
+        for f in cls.stand_ins:
+            f.free()
+        ReplyTable.get(cls.addr).free()
+
+    def test_callbacks(self):
+        table = ReplyTable.get(self.addr)
+        done = threading.Event()
+        result = []
+
+        def func(msg, *_):
+            result.append(msg[1:])
+            if len(result) == 30:
+                done.set()
+
+        for i in range(10):
+            table.add('/b_set', [0, i], func)
+        for i in range(10):
+            table.add('/b_set', [1], func)
+            table.add('/b_set', [2, i], func)
+        for i in range(10):
+            self.addr.send_msg('/b_get', 0, i)
+            self.addr.send_msg('/b_get', 1, i)
+            self.addr.send_msg('/b_get', 2, i)
+        done.wait(2)
+        self.assertEqual(
+            sorted(r for r in result if r[0] == 0),
+            [[0, i, i] for i in range(10)])
+        self.assertEqual(
+            [r for r in result if r[0] == 1],
+            [[1, i, 1 + i] for i in range(10)])  # Resolved in order.
+        self.assertEqual(len([r for r in result if r[0] == 2]), 10)
+        self.assertEqual(table.num_pending, 0)
+
+    def test_timeout(self):
+        table = ReplyTable.get(self.addr)
+        done = threading.Event()
+        result = []
+        table.add('/b_set', [100, 0], result.append, 5, done.set)
+        table.add('/b_set', [100, 1], result.append, 0.05, done.set)
+        request = table.add('/b_set', [100, 2], result.append, 0.01)
+        self.assertTrue(request.cancel())
+        self.assertFalse(request.cancel())
+        self.assertTrue(done.wait(1))
+        with main._main_lock:
+            self.assertEqual(table.num_pending, 1)
+        self.assertEqual(result, [])
+        table._clear()
+        self.assertEqual(table.num_pending, 0)
+
+    def test_clock_cleared(self):
+        table = ReplyTable.get(self.addr)
+        done = threading.Event()
+        result = []
+        table.add('/b_set', [101, 0], result.append, 0.02)
+        SystemClock.clear()  # The timer task is removed without CmdPeriod.
+        time.sleep(0.05)
+        table.add('/b_set', [101, 1], result.append, 0.02, done.set)
+        self.assertTrue(done.wait(1))
+        with main._main_lock:
+            self.assertEqual(table.num_pending, 0)
+        self.assertEqual(result, [])
+        self.assertRaises(TypeError, table.add, '/b_set', [101, 2], None)
+
+    def test_condition(self):
+        done = threading.Event()
+
+        def func():
+            yield from self.addr.sync()
+            yield from self.addr.sync(
+                None, None, [['/b_set', 0, i, 0.0] for i in range(2000)])
+            done.set()
+
+        Routine.run(func)
+        self.assertTrue(done.wait(2))
+        self.assertEqual(ReplyTable.get(self.addr).num_pending, 0)
+
+    def test_condition_clumps(self):
+        # All clumps and nested bundles share the time of the first clump.
+        done = threading.Event()
+        nested = threading.Event()
+        result = {}
+
+        def recv(msg, time, *_):
+            result[msg[1]] = time
+            if msg[1] == -1:
+                nested.set()
+
+        elements = [['/clumped', i, 'x' * 40] for i in range(1200)]
+        elements.append([0.3, ['/clumped', -1]])
+        self.assertGreater(len(self.addr._clump_bundle(
+            0, None, elements, NetAddr._SYNC_BNDL_DGRAM_SIZE)), 1)
+
+        def func():
+            yield from self.addr.sync(None, 0.2, elements)
+            done.set()
+
+        f = OscFunc(recv, '/clumped')
+        Routine.run(func)
+        self.assertTrue(done.wait(3))
+        self.assertTrue(nested.wait(1))
+        f.free()
+        self.assertEqual(len(result), 1201)
+        self.assertAlmostEqual(result[-1] - result[1199], 0.1, places=6)
+        self.assertEqual(ReplyTable.get(self.addr).num_pending, 0)
+
+    def test_main_sync(self):
+        server = types.SimpleNamespace(addr=self.addr)
+        self.assertTrue(main.sync(server, 1))
+        # Not replied.
+        server = types.SimpleNamespace(addr=NetAddr('127.0.0.1', 9))
+        self.assertFalse(main.sync(server, 0.05))
+        self.assertEqual(ReplyTable.get(server.addr).num_pending, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
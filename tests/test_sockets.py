@@ -1,6 +1,8 @@
 
 import unittest
 import shutil
+import socket
+import threading
 
 import sc3
 sc3.init()
@@ -9,6 +11,8 @@ from sc3.base.main import main
 from sc3.synth.server import s
 from sc3.base.netaddr import NetAddr
 from sc3.base.responders import OscFunc
+from sc3.base import _osclib as oli
+from sc3.base._oscinterface import OscInterface, OscTcpInterface
 
 
 class SocketsTestCase(unittest.TestCase):
@@ -71,6 +75,139 @@ class SocketsTestCase(unittest.TestCase):
         self.assertEqual(addr.port, change_port)
         main.close_udp_port(change_port)
 
+    def test_io_loop_batch(self):
+        lang_port = NetAddr.lang_port()
+        new_port = 57170
+        n = 200
+        count = 0
+        main.open_udp_port(new_port)
+        interfaces = [
+            OscInterface._local_endpoints[('127.0.0.1', port)]
+            for port in (lang_port, new_port)]
+        self.assertIs(interfaces[0]._io_loop, interfaces[1]._io_loop)
+
+        def func(*_):
+            nonlocal count
+            count += 1
+            if count == 2 * n:
+                main.resume()
+
+        f = OscFunc(func, '/batch')
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        dgram = oli.encode_message('/batch', [1, 2.0])
+        for _ in range(n):
+            sender.sendto(dgram, ('127.0.0.1', lang_port))
+            sender.sendto(dgram, ('127.0.0.1', new_port))
+        self.assertTrue(main.wait(2), 'test time expired')
+        self.assertEqual(count, 2 * n)
+        sender.close()
+        f.free()
+        main.close_udp_port(new_port)
+
+    def test_tcp_stream_framing(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        result = []
+        msgs = [['/tcp', i, 'x' * i] for i in range(10)]
+
+        def serve():
+            conn, _ = server.accept()
+            data = b''
+            for msg in msgs:
+                dgram = oli.encode_message(msg[0], msg[1:])
+                data += len(dgram).to_bytes(4, 'big') + dgram
+            for i in range(0, len(data), 7):  # Partial frames.
+                conn.sendall(data[i:i + 7])
+            conn.recv(1)
+            conn.close()
+
+        def func(msg, *_):
+            result.append(msg)
+            if len(result) == len(msgs):
+                main.resume()
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        f = OscFunc(func, '/tcp')
+        addr = NetAddr(*server.getsockname())
+        addr.connect(local_port=57180)
+        self.assertTrue(main.wait(3), 'test time expired')
+        self.assertEqual(result, msgs)
+        addr.disconnect()
+        f.free()
+        server.close()
+
+    def test_tcp_coalesced_writes(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        msgs = [['/echo', i] for i in range(500)]
+        msgs.append(['/echo', b'x' * 200_000])  # Many reads.
+        result = []
+
+        def echo():
+            conn, _ = server.accept()
+            while data := conn.recv(65536):
+                conn.sendall(data)
+            conn.close()
+
+        def func(msg, *_):
+            result.append(msg)
+            if len(result) == len(msgs):
+                main.resume()
+
+        thread = threading.Thread(target=echo, daemon=True)
+        thread.start()
+        f = OscFunc(func, '/echo')
+        addr = NetAddr(*server.getsockname())
+        addr.connect(lambda *_: main.resume(), local_port=57190)
+        self.assertTrue(main.wait(3), 'connection time expired')
+        sock = addr._osc_interface.socket
+        self.assertTrue(
+            sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        for msg in msgs:
+            addr.send_msg(*msg)
+        self.assertTrue(main.wait(3), 'test time expired')
+        self.assertEqual(result, msgs)
+        addr.disconnect()
+        f.free()
+        server.close()
+
+    def test_tcp_send_failure(self):
+        iface = OscTcpInterface(57200)
+        sending = threading.Event()
+        queued = threading.Event()
+
+        class BrokenSocket():
+            def sendall(self, data):
+                sending.set()
+                queued.wait(1)
+                raise ConnectionResetError('reset by peer')
+
+        iface._socket.close()
+        iface._socket = BrokenSocket()
+        errors = []
+
+        def send():
+            try:
+                iface._send(oli.OscMessage(oli.encode_message('/first', []), False))
+            except ConnectionResetError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=send)
+        thread.start()
+        self.assertTrue(sending.wait(1))
+        for i in range(3):
+            iface._send(oli.OscMessage(oli.encode_message('/queued', [i]), False))
+        with self.assertLogs('sc3.base._oscinterface', 'ERROR') as cm:
+            queued.set()
+            thread.join(1)
+        self.assertEqual(len(errors), 1)  # Only in the sending thread.
+        self.assertIn('dropped 3 queued messages', cm.output[0])
+        self.assertEqual(iface._send_buffer, b'')
+        self.assertFalse(iface._sending)
+
 
 if __name__ == '__main__':
     unittest.main()
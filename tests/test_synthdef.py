@@ -1,5 +1,11 @@
 
 import unittest
+import array
+import io
+import sys
+import tempfile
+import threading
+import types
 from typing import List
 
 import sc3
@@ -8,8 +14,15 @@ sc3.init()
 from sc3.synth.synthdef import SynthDef, synthdef, _logger
 from sc3.synth.ugens.line import DC
 from sc3.synth.ugens.inout import Out
+from sc3.synth.ugens.oscillators import SinOsc
+from sc3.synth.ugens.noise import WhiteNoise
+from sc3.synth.ugens.mix import Mix
+from sc3.synth.ugens.pan import Pan2
+from sc3.synth.ugens.trig import SendTrig
+from sc3.synth.ugen import UGen, OutputProxy, UnaryOpUGen, BinaryOpUGen
 from sc3.synth.spec import spec
-from sc3.synth.synthdesc import MdPlugin
+from sc3.synth.synthdesc import MdPlugin, SynthDesc
+from sc3.synth import _fmtrw as frw
 from sc3.base.platform import Platform
 
 
@@ -238,8 +251,39 @@ class SynthDefTestCase(unittest.TestCase):
     # def test_wrap(self):
     #     ...
 
-    # def test_as_bytes(self):
-    #     ...
+    def test_as_bytes(self):
+        def test(freq=440, amp:ir=0.1, pos=[0, 0.5]):
+            sig = Pan2.ar(SinOsc.ar([freq, freq * 2]), pos) * amp
+            SendTrig.kr(SinOsc.kr(1), 7, freq)
+            Out.ar(0, Mix.new(sig))
+
+        variants = {'low': {'freq': 220}, 'quiet': {'freq': 110, 'amp': 0}}
+        # SynthDesc doesn't read variants, must be the last def.
+        lst = [
+            SynthDef('test', test, rates=[0.1]),
+            SynthDef('test2', test, variants=variants)]
+        stream = io.BytesIO()
+        stream.write(b'SCgf')
+        frw.write_i32(stream, 2)
+        frw.write_i16(stream, len(lst))
+        for sd in lst:
+            sd._write_def(stream)
+        expected = stream.getvalue()
+        stream = io.BytesIO()
+        SynthDef._write_def_list(lst, stream)
+        self.assertEqual(stream.getvalue(), expected)
+        descs = SynthDesc._read_stream(io.BytesIO(expected), True)
+        self.assertEqual([d.name for d in descs], ['test', 'test2'])
+        for sd, desc in zip(lst, descs):
+            self.assertEqual(desc.control_names, ['freq', 'amp', 'pos'])
+            self.assertEqual(
+                [type(u).__name__ for u in desc.sdef._children],
+                [type(u).__name__ for u in sd._children])
+            self.assertEqual(
+                desc.sdef._controls, array.array('f', sd._controls).tolist())
+            self.assertEqual(
+                list(desc.sdef._constants),
+                array.array('f', sd._constants).tolist())
 
     def test_decorator(self):
         @synthdef
@@ -291,6 +335,246 @@ class SynthDefTestCase(unittest.TestCase):
     # def test_load(self):
     #     ...
 
+    def test_rewrite_order(self):
+        def test(freq=440, amp=0.1):
+            freqs = [freq * (i + 1) for i in range(20)]
+            sig = SinOsc.ar(freqs) * amp + SinOsc.ar(freqs)
+            sig = sig - (-SinOsc.ar(freqs))
+            Out.ar(0, sig[0] + sig[1] + sig[2] + sig[3] + sig[4])
+
+        sd = SynthDef('test', test)
+        children = set(sd._children)
+        names = {type(u).__name__ for u in sd._children}
+        self.assertTrue({'MulAdd', 'Sum3'} <= names)
+        for i, ugen in enumerate(sd._children):
+            self.assertEqual(ugen._synth_index, i)
+            for input in ugen.inputs:
+                if isinstance(input, OutputProxy):
+                    input = input.source_ugen
+                if isinstance(input, UGen):
+                    self.assertIn(input, children)
+                    self.assertLess(input._synth_index, i)
+
+    def test_fold_and_merge(self):
+        def test(freq=440):
+            lfo = Mix.new([SinOsc.kr(0.1) for _ in range(4)])
+            sig = Mix.new([SinOsc.ar(freq) * 0.5 for _ in range(3)])
+            amp = UnaryOpUGen.new('neg', BinaryOpUGen.new('*', 2, 3))
+            noise = WhiteNoise.ar() + WhiteNoise.ar()
+            Out.ar(0, lfo * sig * amp + noise)
+
+        sd = SynthDef('test', test)
+        self.assertEqual(sd.optimization_report, [])
+        try:
+            SynthDef.fold_and_merge = True
+            opt = SynthDef('test', test)
+        finally:
+            SynthDef.fold_and_merge = False
+        self.assertEqual(len(opt._children), len(sd._children) - 9)
+        names = [type(u).__name__ for u in opt._children]
+        self.assertEqual(names.count('SinOsc'), 2)
+        self.assertEqual(names.count('WhiteNoise'), 2)
+        self.assertEqual(names.count('UnaryOpUGen'), 0)
+        self.assertIn(-6.0, opt._constants)
+        report = opt.optimization_report
+        self.assertEqual(
+            sorted(r[:2] for r in report),
+            [('folded', '*'), ('folded', 'neg'), ('merged', '*'),
+             ('merged', '*'), *[('merged', 'SinOsc')] * 5])
+        self.assertIn(('folded', 'neg', -6.0), report)
+        desc = SynthDesc.new_from(opt)
+        self.assertEqual(desc.control_names, ['freq'])
+
+
+def graph_a(freq=440, amp=0.1):
+    Out.ar(0, DC.ar([freq, freq * 2]) * amp)
+
+def graph_b(freq=440, gate=1):
+    Out.ar(0, DC.ar(freq) * gate)
+
+
+class ConcurrentBuildTestCase(unittest.TestCase):
+    def test_threads(self):
+        expected = {
+            f: bytes(SynthDef('test', f).as_bytes())
+            for f in (graph_a, graph_b)}
+        results = [None] * 16
+
+        def build(i):
+            func = (graph_a, graph_b)[i % 2]
+            for _ in range(20):
+                sd = SynthDef('test', func)
+                if bytes(sd.as_bytes()) != expected[func]:
+                    return
+            results[i] = True
+
+        threads = [
+            threading.Thread(target=build, args=(i,)) for i in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(all(results))
+
+    def test_build_many(self):
+        defs = SynthDef.build_many([graph_a, graph_b], 2)
+        self.assertEqual([sd.name for sd in defs], ['graph_a', 'graph_b'])
+        for sd in defs:
+            self.assertIn('_pending_build', sd.__dict__)
+            built = SynthDef(sd.name, sd.func)
+            self.assertEqual(bytes(sd.as_bytes()), bytes(built.as_bytes()))
+            self.assertEqual(
+                str(SynthDesc.new_from(sd)), str(SynthDesc.new_from(built)))
+            self.assertEqual(len(sd._children), len(built._children))
+
+
+class SynthDefCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = SynthDef.enable_cache(self.dir.name)
+
+    def tearDown(self):
+        SynthDef.disable_cache()
+        self.dir.cleanup()
+
+    def test_cache(self):
+        def test(freq=440, amp:ir=0.1, gate=1):
+            Out.ar(0, DC.ar(freq) * amp * gate)
+
+        built = SynthDef('test', test, variants={'low': {'freq': 110}})
+        self.assertEqual(self.cache.misses, 1)
+        cached = SynthDef('test', test, variants={'low': {'freq': 110}})
+        self.assertEqual(self.cache.hits, 1)
+        self.assertIn('_pending_build', cached.__dict__)
+        self.assertEqual(bytes(cached.as_bytes()), bytes(built.as_bytes()))
+        self.assertEqual(
+            str(SynthDesc.new_from(cached)), str(SynthDesc.new_from(built)))
+        desc = SynthDesc.new_from(cached)
+        self.assertIs(desc.sdef, cached)
+        self.assertTrue(desc.has_gate)
+        self.assertEqual(desc.control_names, ['freq', 'amp', 'gate'])
+        self.assertEqual(desc.control_dict['freq'].rate, 'control')
+        self.assertIn('_pending_build', cached.__dict__)
+        self.assertEqual(len(cached._children), len(built._children))
+        self.assertNotIn('_pending_build', cached.__dict__)
+        self.assertEqual(cached._constants, built._constants)
+
+        SynthDef('test', test, variants={'low': {'freq': 220}})
+        SynthDef('test', test, rates=['ir'])
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_helpers(self):
+        class Helper():
+            def sig(self, freq):
+                return DC.ar(freq) * 2
+
+        helper = Helper()
+
+        def test(freq=440):
+            Out.ar(0, helper.sig(freq))
+
+        built = SynthDef('test', test)
+        SynthDef('test', test)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        Helper.sig = lambda self, freq: DC.ar(freq) * 3
+        edited = SynthDef('test', test)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+        self.assertNotEqual(
+            bytes(edited.as_bytes()), bytes(built.as_bytes()))
+        helper.offset = 1  # Instance state is part of the key.
+        SynthDef('test', test)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 3))
+
+        class Slotted():
+            __slots__ = ('scale',)
+
+            def __repr__(self):
+                return 'Slotted()'  # Doesn't show the state.
+
+        slotted = Slotted()
+        slotted.scale = 2
+
+        def test(freq=440):
+            Out.ar(0, DC.ar(freq) * slotted.scale)
+
+        self.assertIsNone(SynthDef._cache.key('test', test, [], [], {}, {}))
+
+        module = types.ModuleType('dynamic')
+        module.scale = 2
+
+        def test(freq=440):
+            Out.ar(0, DC.ar(freq) * module.scale)
+
+        self.assertIsNone(SynthDef._cache.key('test', test, [], [], {}, {}))
+        size = self.cache.size
+        SynthDef('test', test)
+        SynthDef('test', test)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 5))
+        self.assertEqual(self.cache.size, size)
+
+    def test_concurrent_build(self):
+        def test(freq=440, amp=0.1):
+            freqs = [freq * (i + 1) for i in range(100)]
+            Out.ar(0, Mix.new(SinOsc.ar(freqs) * amp))
+
+        built = SynthDef('test', test)
+        cached = SynthDef('test', test)
+        self.assertIn('_pending_build', cached.__dict__)
+        barrier = threading.Barrier(8)
+        result = []
+
+        def read():
+            barrier.wait()
+            result.append((len(cached._children), len(cached._constants)))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(
+            result, [(len(built._children), len(built._constants))] * 8)
+        self.assertTrue(all(u._synthdef is cached for u in cached._children))
+
+    def test_key(self):
+        key = SynthDef._cache.key
+        scale = 2
+
+        def test(freq=440):
+            Out.ar(0, DC.ar(freq) * scale)
+
+        def other(freq=440):
+            Out.ar(0, DC.ar(freq) * scale)
+
+        k = key('test', test, [], [], {}, {})
+        self.assertEqual(k, key('test', test, [], [], {}, {}))
+        self.assertEqual(k, key('test', other, [], [], {}, {}))
+        self.assertNotEqual(k, key('other', test, [], [], {}, {}))
+        scale = 3
+        self.assertNotEqual(k, key('test', test, [], [], {}, {}))
+        scale = 2
+        test.__defaults__ = (220,)
+        self.assertNotEqual(k, key('test', test, [], [], {}, {}))
+
+    def test_eviction(self):
+        def test(freq=440):
+            Out.ar(0, DC.ar(freq))
+
+        SynthDef('test0', test)
+        entry_size = self.cache.size
+        self.cache.max_size = entry_size * 3
+        for i in range(1, 6):
+            SynthDef(f'test{i}', test)
+        self.assertLessEqual(self.cache.size, self.cache.max_size)
+        self.assertEqual(len(list(self.cache.dir.iterdir())), 3)
+        self.cache.clear()
+        self.assertEqual(self.cache.size, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
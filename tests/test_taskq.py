@@ -0,0 +1,69 @@
+import unittest
+import random
+
+from sc3.base._taskq import TaskQueue
+
+
+class TaskQueueTestCase(unittest.TestCase):
+    def test_order(self):
+        q = TaskQueue()
+        rnd = random.Random(0)
+        items = [(rnd.random(), object()) for _ in range(500)]
+        for prio, task in items:
+            q.add(prio, task)
+        self.assertEqual(len(q), len(items))
+        self.assertEqual(q.peek(False)[0], max(p for p, _ in items))
+        self.assertEqual(list(q), sorted(items, key=lambda x: x[0]))
+        self.assertEqual(
+            list(reversed(q)), sorted(items, key=lambda x: x[0], reverse=True))
+        result = []
+        while not q.empty():
+            self.assertEqual(q.peek(), q.peek())
+            result.append(q.pop())
+        self.assertEqual(result, sorted(items, key=lambda x: x[0]))
+        with self.assertRaises(KeyError):
+            q.peek()
+        with self.assertRaises(KeyError):
+            q.pop()
+
+    def test_stable(self):
+        q = TaskQueue()
+        tasks = [object() for _ in range(10)]
+        for task in tasks:
+            q.add(1.0, task)
+        self.assertEqual([t for _, t in q], tasks)
+        self.assertIs(q.peek(False)[1], tasks[-1])
+
+    def test_remove(self):
+        q = TaskQueue()
+        tasks = [object() for _ in range(200)]
+        for i, task in enumerate(tasks):
+            q.add(i, task)
+        for task in tasks[:150]:
+            q.remove(task)
+        q.remove(object())  # Not found.
+        self.assertLess(len(q._queue), 200)  # Compacted.
+        self.assertEqual(len(q), 50)
+        self.assertEqual(q.peek(), (150, tasks[150]))
+        q.remove(tasks[-1])
+        self.assertEqual(q.peek(False), (198, tasks[-2]))
+        self.assertEqual([t for _, t in q], tasks[150:-1])
+
+    def test_update(self):
+        q = TaskQueue()
+        a, b = object(), object()
+        q.add(1, a)
+        q.add(2, b)
+        q.add(3, a)
+        self.assertEqual(len(q), 2)
+        self.assertEqual(q.peek(), (2, b))
+        self.assertEqual(q.peek(False), (3, a))
+        q.add(0, a)
+        self.assertEqual(q.peek(False), (2, b))
+        self.assertEqual(q.pop(), (0, a))
+        self.assertEqual(q.pop(), (2, b))
+        self.assertTrue(q.empty())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from sc3.base._timebase import TimeBase
+
+
+class OffsetTimeBase(TimeBase):
+    wall_offset = 0
+
+    def _sample(self):
+        mono, wall = super()._sample()
+        return mono, wall + self.wall_offset
+
+
+class TimeBaseTestCase(unittest.TestCase):
+    def test_osc_round_trip(self):
+        tb = TimeBase()
+        tb._segments += ((10**9, tb._segments[0][1] + 10**9, 123456),)
+        for i in range(1000):
+            elapsed = i * 0.0123456789
+            osc = tb.elapsed_to_osc(elapsed)
+            self.assertIsInstance(osc, int)
+            self.assertAlmostEqual(tb.osc_to_elapsed(osc), elapsed, delta=1e-9)
+
+    def test_monotonic(self):
+        tb = TimeBase()
+        prev = tb.elapsed_ns()
+        for _ in range(1000):
+            now = tb.elapsed_ns()
+            self.assertGreaterEqual(now, prev)
+            prev = now
+
+    def test_slew(self):
+        tb = OffsetTimeBase()
+        elapsed = tb.elapsed_ns()
+        before = tb.elapsed_to_wall_ns(elapsed)
+        tb.wall_offset = 10_000_000  # 10 ms, slewed.
+        tb._next_update = 0
+        tb._update(tb.elapsed_ns())
+        after = tb.elapsed_to_wall_ns(elapsed)
+        self.assertLess(abs(after - before), 1000)
+        self.assertGreater(tb._segments[-1][2], 0)
+        self.assertEqual(tb._segments[-1][2], tb.max_slew * 10**9)
+
+    def test_step(self):
+        tb = OffsetTimeBase()
+        tb._next_update = 0
+        tb.wall_offset = 10 * 10**9  # 10 s, stepped.
+        tb._update(tb.elapsed_ns())
+        elapsed = tb.elapsed_ns()
+        wall = tb._sample()[1]
+        self.assertLess(abs(tb.elapsed_to_wall_ns(elapsed) - wall), 10**7)
+
+
+if __name__ == '__main__':
+    unittest.main()
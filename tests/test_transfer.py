@@ -0,0 +1,222 @@
+
+import unittest
+import array
+import threading
+import time
+import types
+
+import sc3
+sc3.init()
+
+from sc3.base.main import main
+from sc3.base._osclib import encode_bundle
+from sc3.synth.server import Server
+from sc3.synth.buffer import Buffer
+from sc3.synth.bus import ControlBus
+from sc3.synth.testing import MockServer
+from sc3.synth._transfer import BulkTransfer, BulkDownload
+
+
+class BulkTransferTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mock = MockServer(record=False)
+        self.mock.start()
+        self.addr = self.mock.addr
+
+    def tearDown(self):
+        self.mock.stop()
+
+    def transfer(self, values, **kwargs):
+        done = threading.Event()
+        transfer = BulkTransfer(
+            self.addr, '/b_setn', [0], values, action=lambda _: done.set(),
+            on_failure=lambda _: done.set(), **kwargs)
+        transfer.start()
+        self.assertTrue(done.wait(5))
+        return transfer
+
+    def test_max_values(self):
+        for size in (65504, 8192, 1000):
+            n = BulkTransfer.max_values('/b_setn', 1, size)
+            transfer = BulkTransfer(
+                self.addr, '/b_setn', [0], [0.0] * (n + 4),
+                max_dgram_size=size)
+            dgrams = [transfer._encode_chunk(0), self.addr._sync_dgram(1)]
+            self.assertLessEqual(len(encode_bundle(1, dgrams)), size)
+            transfer._chunk_size += 4  # Next tags padding.
+            dgrams[0] = transfer._encode_chunk(0)
+            self.assertGreater(len(encode_bundle(1, dgrams)), size)
+
+    def test_transfer(self):
+        values = array.array('f', range(100000))
+        self.mock.reset()
+        self.addr.send_msg('/b_alloc', 0, len(values))
+        main.sync(types.SimpleNamespace(addr=self.addr), 1)
+        progress = []
+        transfer = self.transfer(
+            values, window=4, max_dgram_size=8192,
+            progress=lambda t: progress.append(t.acknowledged))
+        self.assertTrue(transfer.done)
+        self.assertEqual(self.mock._buffers[0].data, values)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(progress[-1], len(values))
+        self.assertGreater(transfer.throughput, 0)
+
+    def test_retransmit(self):
+        values = array.array('f', range(50000))
+        self.addr.send_msg('/b_alloc', 0, len(values))
+        main.sync(types.SimpleNamespace(addr=self.addr), 1)
+        self.mock.loss = 0.2
+        transfer = self.transfer(
+            values, window=8, timeout=0.05, retries=20,
+            max_dgram_size=4096)
+        self.assertTrue(transfer.done)
+        self.assertGreater(transfer.retransmits, 0)
+        self.assertEqual(self.mock._buffers[0].data, values)
+
+    def test_failure(self):
+        self.mock.loss = 1.0
+        transfer = self.transfer([0.5] * 10, timeout=0.01, retries=2)
+        self.assertTrue(transfer.failed)
+        self.assertFalse(transfer.done)
+        self.assertEqual(transfer.retransmits, 2)
+
+    def download(self, count, **kwargs):
+        done = threading.Event()
+        download = BulkDownload(
+            self.addr, '/b_getn', [0], 0, count, action=lambda _: done.set(),
+            on_failure=lambda _: done.set(), **kwargs)
+        download.start()
+        self.assertTrue(done.wait(5))
+        return download
+
+    def test_download(self):
+        values = array.array('f', range(50000))
+        self.mock.reset()
+        self.addr.send_msg('/b_alloc', 0, len(values))
+        main.sync(types.SimpleNamespace(addr=self.addr), 1)
+        self.mock._buffers[0].data = array.array('f', values)
+        download = self.download(len(values), chunk_size=1000, window=8)
+        self.assertTrue(download.done)
+        self.assertEqual(download.result, values)
+        self.assertEqual(download.result.obj, download.data)
+        self.mock.loss = 0.2
+        download = self.download(
+            len(values), chunk_size=500, timeout=0.05, retries=20)
+        self.assertTrue(download.done)
+        self.assertGreater(download.retransmits, 0)
+        self.assertEqual(download.data, values)
+
+    def test_download_invalid_reply(self):
+        self.mock.loss = 1.0  # Replies are simulated.
+        calls = []
+        download = BulkDownload(
+            self.addr, '/b_getn', [0], 0, 4, chunk_size=2, timeout=5,
+            retries=1, action=lambda _: calls.append('action'),
+            on_failure=lambda _: calls.append('failure'))
+        with main._main_lock:
+            download.start()
+            download._receive(0, ['/b_setn', 0, 0, 2, 1.0, 2.0, 3.0])
+            self.assertEqual(len(download.data), 4)
+            self.assertEqual(download.retransmits, 1)
+            download._receive(2, ['/b_setn', 0, 2, 2, 3.0, 4.0])
+            self.assertEqual(download.received, 2)
+            download._receive(0, ['/b_setn', 0, 0, 1, 1.0])
+        self.assertTrue(download.failed)
+        self.assertFalse(download.done)
+        self.assertEqual(len(download.data), 4)
+        self.assertEqual(calls, ['failure'])
+
+
+class ServerTransferTestCase(unittest.TestCase):
+    def test_send_list_and_setn(self):
+        with MockServer(record=False, control_buses=32768) as mock:
+            server = Server('mock', mock.addr)
+            done = threading.Event()
+            server.register(lambda _: done.set())
+            self.assertTrue(done.wait(2))
+            values = [i * 0.5 for i in range(50000)]
+            done.clear()
+            buffer = Buffer.new_send_list(
+                values, 1, server, action=lambda _: done.set())
+            self.assertTrue(done.wait(5))
+            self.assertEqual(
+                mock._buffers[buffer.bufnum].data, array.array('f', values))
+            result = []
+            done.clear()
+            buffer.get_to_list(
+                lambda lst: (result.append(lst), done.set()), 100)
+            self.assertTrue(done.wait(5))
+            self.assertEqual(result, [values[100:]])
+            done.clear()
+            with self.assertWarns(DeprecationWarning):
+                buffer.get_to_list(lambda _: done.set(), 0, 10, wait=0.01)
+            self.assertTrue(done.wait(5))
+            bus = ControlBus(20000, server, 0)  # Not allocated.
+            bus.setn(values[:20000])
+            self.assertTrue(main.sync(server, 1))
+            self.assertEqual(
+                mock._control_buses[bus.index:bus.index + 20000],
+                array.array('f', values[:20000]))
+            done.clear()
+            server.unregister(lambda _: done.set())
+            self.assertTrue(done.wait(2))
+
+    def test_setn_failure(self):
+        with MockServer(record=False, control_buses=32768) as mock:
+            server = Server('mock_failure', mock.addr)
+            done = threading.Event()
+            server.register(lambda _: done.set())
+            self.assertTrue(done.wait(2))
+            self.assertTrue(BulkTransfer.can_pace(server.addr))
+            mock.loss = 1.0
+            failed = []
+            done.clear()
+            bus = ControlBus(20000, server, 0)
+            bus.setn(
+                [0.5] * 20000,
+                on_failure=lambda b: (failed.append(b), done.set()))
+            self.assertTrue(done.wait(10))
+            self.assertEqual(failed, [bus])
+            mock.loss = 0.0
+            done.clear()
+            server.unregister(lambda _: done.set())
+            self.assertTrue(done.wait(2))
+
+    def test_get_to_array_failure(self):
+        with MockServer(record=False) as mock:
+            server = Server('mock_get_failure', mock.addr)
+            done = threading.Event()
+            server.register(lambda _: done.set())
+            self.assertTrue(done.wait(2))
+            done.clear()
+            buffer = Buffer.new_send_list(
+                [0.5] * 100, 1, server, action=lambda _: done.set())
+            self.assertTrue(done.wait(5))
+            self.assertRaises(ValueError, buffer.get_to_array, None, 0, -1)
+            self.assertRaises(ValueError, buffer.get_to_array, None, -1, 10)
+            self.assertRaises(ValueError, buffer.get_to_list, None, 90, 20)
+            mock.loss = 1.0
+            failed = []
+            done.clear()
+            buffer.get_to_array(
+                None, timeout=0.05,
+                on_failure=lambda b: (failed.append(b), done.set()))
+            self.assertTrue(done.wait(5))
+            self.assertEqual(failed, [buffer])
+            done.clear()
+            with self.assertLogs('sc3.synth.buffer', 'WARNING') as cm:
+                buffer.get_to_array(None, timeout=0.05)
+                deadline = time.monotonic() + 5
+                while not cm.output and time.monotonic() < deadline:
+                    time.sleep(0.05)
+            self.assertEqual(
+                cm.output, ['WARNING:sc3.synth.buffer:get_to_array failed'])
+            mock.loss = 0.0
+            done.clear()
+            server.unregister(lambda _: done.set())
+            self.assertTrue(done.wait(2))
+
+
+if __name__ == '__main__':
+    unittest.main()